@@ -0,0 +1,61 @@
+"""Benchmark ``read_entry_points`` against the configparser-based parser.
+
+Uses ``console_scripts``-heavy ``entry_points.txt`` files, as shipped by large
+distributions, with the ``conda`` group either first, last or missing.
+
+Run with ``python benchmarks/bench_entry_points.py``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import timeit
+from pathlib import Path
+
+from conda_self.package_info import CaseSensitiveConfigParser, read_entry_points
+
+
+def configparser_entry_points(path: Path) -> dict[str, dict[str, str]]:
+    config = CaseSensitiveConfigParser()
+    config.read(path)
+    return {section: dict(config[section]) for section in config.sections()}
+
+
+def entry_points_file(scripts: int, conda: str) -> str:
+    console_scripts = "[console_scripts]\n" + "".join(
+        f"command-{i} = package.cli.module_{i}:main\n" for i in range(scripts)
+    )
+    conda_group = "[conda]\nplugin = package.plugin\n"
+    return {
+        "first": conda_group + console_scripts,
+        "last": console_scripts + conda_group,
+        "missing": console_scripts,
+    }[conda]
+
+
+def best_of(func, number: int = 200) -> float:
+    """Best time per call, in microseconds."""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "entry_points.txt")
+        for scripts in (10, 1_000):
+            for conda in ("first", "last", "missing"):
+                path.write_text(entry_points_file(scripts, conda))
+                assert read_entry_points(path) == configparser_entry_points(path)
+
+                baseline = best_of(lambda: configparser_entry_points(path))
+                full = best_of(lambda: read_entry_points(path))
+                group = best_of(lambda: read_entry_points(path, "conda"))
+                print(
+                    f"{scripts:>5} scripts, conda {conda:<7}: "
+                    f"configparser {baseline:9.1f} us, "
+                    f"all groups {full:9.1f} us ({baseline / full:4.1f}x), "
+                    f"conda only {group:9.1f} us ({baseline / group:4.1f}x)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark manifest reading in ``PackageInfo.from_record``.
+
+Compares peak memory and time of loading ``info/paths.json`` whole with
+``json.loads`` (the previous implementation) against streaming it with
+:func:`iter_paths_json`, on synthetic manifests the size of large Python
+distributions.
+
+Run with ``python benchmarks/bench_manifest.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from conda_self.package_info import iter_paths_json
+
+
+def write_manifest(pkg_dir: Path, size: int) -> Path:
+    site_packages = "lib/python3.12/site-packages"
+    paths = [
+        f"{site_packages}/pkg-1.0.dist-info/{name}" for name in ("METADATA", "RECORD")
+    ]
+    paths += [f"{site_packages}/pkg/sub_{i // 100}/module_{i}.py" for i in range(size)]
+    manifest = pkg_dir / "info" / "paths.json"
+    manifest.parent.mkdir(parents=True)
+    manifest.write_text(
+        json.dumps(
+            {
+                "paths": [
+                    {
+                        "_path": path,
+                        "path_type": "hardlink",
+                        "sha256": "0" * 64,
+                        "size_in_bytes": 1234,
+                    }
+                    for path in paths
+                ],
+                "paths_version": 1,
+            },
+            indent=2,
+        )
+    )
+    return manifest
+
+
+def dist_infos(paths) -> set[str]:
+    return {
+        dirname
+        for path in paths
+        if (dirname := os.path.dirname(path)).endswith(".dist-info")
+    }
+
+
+def load_whole(manifest: Path) -> set[str]:
+    data = json.loads(manifest.read_text())
+    return dist_infos([entry["_path"] for entry in data.get("paths", [])])
+
+
+def stream(manifest: Path) -> set[str]:
+    return dist_infos(iter_paths_json(manifest))
+
+
+def measure(func, manifest: Path) -> tuple[float, float]:
+    """Best time in milliseconds and peak traced memory in MiB."""
+    elapsed = min(timeit.repeat(lambda: func(manifest), number=1, repeat=3))
+    tracemalloc.start()
+    func(manifest)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1e3, peak / 2**20
+
+
+def main() -> None:
+    for size in (1_000, 10_000, 100_000):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = write_manifest(Path(tmp), size)
+            assert load_whole(manifest) == stream(manifest)
+            print(f"{size} paths ({manifest.stat().st_size / 2**20:.1f} MiB)")
+            for name, func in (("json.loads", load_whole), ("streaming", stream)):
+                elapsed, peak = measure(func, manifest)
+                print(f"  {name:<10}: {elapsed:8.1f} ms, peak {peak:7.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark dist-info inspection with ``PackageInfo.scan_records``.
+
+Builds a synthetic prefix with thousands of records, each shipping a
+dist-info directory, and compares sequential inspection with the bounded
+thread pool. Pass ``--latency MS`` to add an artificial delay to every file
+open, which approximates an NFS-mounted shared install.
+
+Run with ``python benchmarks/bench_package_info.py [--records N] [--latency MS]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import builtins
+import io
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from conda.models.records import PrefixRecord
+
+from conda_self.package_info import PackageInfo
+
+SITE_PACKAGES = "lib/python3.12/site-packages"
+
+
+def synthetic_prefix(root: Path, size: int) -> list[PrefixRecord]:
+    records = []
+    for i in range(size):
+        dist_info = f"{SITE_PACKAGES}/pkg{i}-1.0.dist-info"
+        (root / dist_info).mkdir(parents=True)
+        entry_points = "[console_scripts]\n" + "".join(
+            f"cmd{j} = pkg{i}.cli:main{j}\n" for j in range(10)
+        )
+        if i % 50 == 0:
+            entry_points += f"[conda]\npkg{i} = pkg{i}.plugin\n"
+        (root / dist_info / "entry_points.txt").write_text(entry_points)
+        records.append(
+            PrefixRecord(
+                name=f"pkg{i}",
+                version="1.0",
+                build="0",
+                build_number=0,
+                files=[f"{dist_info}/METADATA", f"{SITE_PACKAGES}/pkg{i}/__init__.py"],
+            )
+        )
+    return records
+
+
+@contextmanager
+def open_latency(seconds: float):
+    """Delay every ``open()`` by ``seconds``."""
+    original = builtins.open
+
+    def slow_open(*args, **kwargs):
+        time.sleep(seconds)
+        return original(*args, **kwargs)
+
+    builtins.open = io.open = slow_open
+    try:
+        yield
+    finally:
+        builtins.open = io.open = original
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=2_000)
+    parser.add_argument("--latency", type=float, default=0.0, help="ms per open()")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # PrefixRecord paths are relative to sys.prefix
+        sys.prefix = tmp
+        records = synthetic_prefix(Path(tmp), args.records)
+        with open_latency(args.latency / 1e3):
+            sequential = timed(lambda: PackageInfo.scan_records(records, 1))
+            print(f"{args.records} records, {args.latency} ms/open")
+            print(f"  sequential:  {sequential:8.3f} s")
+            for workers in (4, 8, 16, 32):
+                threaded = timed(lambda: PackageInfo.scan_records(records, workers))
+                print(
+                    f"  {workers:>2} workers:  {threaded:8.3f} s"
+                    f"  ({sequential / threaded:.1f}x)"
+                )
+
+
+if __name__ == "__main__":
+    main()
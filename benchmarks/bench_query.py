@@ -0,0 +1,96 @@
+"""Benchmark the dependency graph used by ``permanent_dependencies``.
+
+Measures, on synthetic prefixes of 1k and 10k records:
+
+* graph construction with :meth:`DependencyGraph.from_records` versus
+  ``conda.models.prefix_graph.PrefixGraph`` (1k only, it is quadratic);
+* one shared traversal (:meth:`DependencyGraph.closure`) versus walking the
+  graph once per root, as ``PrefixGraph.all_ancestors`` did;
+* the whole query, graph and closure of 50 roots, with ``PrefixGraph`` (as
+  ``permanent_dependencies`` did before) versus :class:`DependencyGraph`.
+
+Run with ``python benchmarks/bench_query.py``.
+"""
+
+from __future__ import annotations
+
+import random
+import timeit
+
+from conda.models.prefix_graph import PrefixGraph
+from conda.models.records import PrefixRecord
+
+from conda_self.query import DependencyGraph
+
+
+def synthetic_records(size: int, fanout: int = 4, seed: int = 0) -> list[PrefixRecord]:
+    """Random DAG where every package depends on a few "older" packages."""
+    rng = random.Random(seed)
+    return [
+        PrefixRecord(
+            name=f"pkg-{i}",
+            version="1.0",
+            build="0",
+            build_number=0,
+            depends=[f"pkg-{j} >=1.0" for j in rng.sample(range(i), min(i, fanout))],
+        )
+        for i in range(size)
+    ]
+
+
+def per_root_closure(graph: DependencyGraph, roots: list[str]) -> set[str]:
+    result: set[str] = set()
+    for root in roots:
+        result |= graph.closure([root])
+    return result
+
+
+def prefix_graph_closure(records: list[PrefixRecord], roots: list[str]) -> set[str]:
+    """The closure of ``roots`` the way ``permanent_dependencies`` computed it."""
+    prefix_graph = PrefixGraph(records)
+    packages = set()
+    for root in roots:
+        node = next((rec for rec in prefix_graph.records if rec.name == root), None)
+        if node:
+            packages.add(node.name)
+            packages.update(record.name for record in prefix_graph.all_ancestors(node))
+    return packages
+
+
+def dependency_graph_closure(records: list[PrefixRecord], roots: list[str]) -> set[str]:
+    return DependencyGraph.from_records(records).closure(roots)
+
+
+def best_of(func, number: int) -> float:
+    """Best time per call, in milliseconds."""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e3
+
+
+def main() -> None:
+    for size in (1_000, 10_000):
+        records = synthetic_records(size)
+        graph = DependencyGraph.from_records(records)
+        roots = list(graph.names[-50:])
+        assert graph.closure(roots) == per_root_closure(graph, roots)
+
+        print(f"{size} records")
+        build = best_of(lambda: DependencyGraph.from_records(records), 5)
+        print(f"  from_records:       {build:10.2f} ms")
+        if size <= 1_000:
+            prefix_graph = best_of(lambda: PrefixGraph(records), 1)
+            print(f"  PrefixGraph:        {prefix_graph:10.2f} ms")
+            assert prefix_graph_closure(records, roots) == graph.closure(roots)
+            baseline = best_of(lambda: prefix_graph_closure(records, roots), 1)
+            query = best_of(lambda: dependency_graph_closure(records, roots), 5)
+            print(
+                f"  query, PrefixGraph: {baseline:10.2f} ms, "
+                f"DependencyGraph {query:.2f} ms ({baseline / query:.0f}x)"
+            )
+        shared = best_of(lambda: graph.closure(roots), 10)
+        print(f"  closure (shared):   {shared:10.2f} ms")
+        per_root = best_of(lambda: per_root_closure(graph, roots), 10)
+        print(f"  closure (per root): {per_root:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark ``fast_remove`` against an ``UnlinkLinkTransaction``.
+
+Removes 50 packages of 1,000 files each (50,000 files) from a synthetic
+prefix, once with a transaction, as ``conda self reset`` does by default, and
+once with ``conda self reset --fast``.
+
+Run with ``python benchmarks/bench_reset.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from conda.base.context import context
+from conda.core.link import PrefixSetup, UnlinkLinkTransaction
+
+from conda_self.fast_remove import fast_remove
+from conda_self.prefix_index import invalidate_prefix_index, prefix_index
+
+PACKAGES = 50
+FILES = 1_000
+
+
+def make_prefix(prefix: Path) -> None:
+    (prefix / "conda-meta").mkdir(parents=True)
+    (prefix / "conda-meta" / "history").write_text("")
+    for package in range(PACKAGES):
+        name = f"package-{package}"
+        files = [
+            f"lib/python3.12/site-packages/{name}/sub_{i % 20}/module_{i}.py"
+            for i in range(FILES)
+        ]
+        for path in files:
+            (prefix / path).parent.mkdir(parents=True, exist_ok=True)
+            (prefix / path).write_text("pass\n")
+        record = {
+            "name": name,
+            "version": "1.0",
+            "build": "0",
+            "build_number": 0,
+            "channel": "conda-forge",
+            "subdir": "noarch",
+            "fn": f"{name}-1.0-0.conda",
+            "depends": [],
+            "files": files,
+            "paths_data": {
+                "paths_version": 1,
+                "paths": [{"_path": path, "path_type": "hardlink"} for path in files],
+            },
+        }
+        (prefix / "conda-meta" / f"{name}-1.0-0.json").write_text(json.dumps(record))
+
+
+def transaction_remove(prefix: Path) -> None:
+    records = prefix_index(prefix).records()
+    setup = PrefixSetup(str(prefix), records, (), (), (), ())
+    UnlinkLinkTransaction(setup).execute()
+
+
+def timed(remove, prefix: Path) -> float:
+    make_prefix(prefix)
+    invalidate_prefix_index(prefix)
+    start = time.perf_counter()
+    remove(prefix)
+    elapsed = time.perf_counter() - start
+    invalidate_prefix_index(prefix)
+    assert not list((prefix / "conda-meta").glob("*.json"))
+    assert not (prefix / "lib").exists()
+    return elapsed
+
+
+def main() -> None:
+    context.quiet = True
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = timed(transaction_remove, Path(tmp, "transaction"))
+        fast = timed(
+            lambda prefix: fast_remove(prefix, prefix_index(prefix).records()),
+            Path(tmp, "fast"),
+        )
+    print(
+        f"{PACKAGES * FILES} files: transaction {baseline:6.2f} s, "
+        f"fast_remove {fast:6.2f} s ({baseline / fast:4.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
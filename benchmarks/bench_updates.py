@@ -0,0 +1,122 @@
+"""Benchmark ``cached_records`` against loading the whole cached repodata.
+
+Looks up ``conda`` and a few plugins in the index cache of conda-forge, as
+``conda self update --check`` does: once by loading each subdir with
+``SubdirData`` (the previous implementation), then with ``cached_records``,
+cold (the repodata is parsed and the entries extracted) and warm (the
+extracted entries are read from the conda-self cache).
+
+The real conda-forge repodata is used when it is in the index cache (e.g.
+after ``conda search -c conda-forge conda``); otherwise a synthetic channel
+of a similar size is generated and cached first.
+
+Run with ``python benchmarks/bench_updates.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from conda.base.constants import REPODATA_FN
+from conda.base.context import context, reset_context
+from conda.core.subdir_data import SubdirData
+from conda.models.channel import Channel, all_channel_urls
+
+from conda_self.updates import cached_records
+
+NAMES = ["conda", "conda-libmamba-solver", "conda-self", "anaconda-anon-usage"]
+#: Size of the synthetic channel: packages and builds per package.
+PACKAGES = 25_000
+BUILDS = 20
+
+
+def make_channel(channel: Path) -> None:
+    """A channel with ``PACKAGES * BUILDS`` records in the platform subdir."""
+    for subdir in (context.subdir, "noarch"):
+        packages = {}
+        if subdir == context.subdir:
+            names = [*NAMES, *(f"package-{i}" for i in range(PACKAGES))]
+            for name in names:
+                for build in range(BUILDS):
+                    packages[f"{name}-1.{build}-py_0.conda"] = {
+                        "name": name,
+                        "version": f"1.{build}",
+                        "build": "py_0",
+                        "build_number": 0,
+                        "depends": ["python >=3.9", "requests", "zstandard"],
+                        "license": "BSD-3-Clause",
+                        "md5": "0123456789abcdef0123456789abcdef",
+                        "sha256": "0123456789abcdef" * 4,
+                        "size": 123_456,
+                        "subdir": subdir,
+                        "timestamp": 1_700_000_000_000,
+                    }
+        (channel / subdir).mkdir(parents=True, exist_ok=True)
+        (channel / subdir / REPODATA_FN).write_text(
+            json.dumps({"info": {"subdir": subdir}, "packages.conda": packages})
+        )
+
+
+def subdir_data_records(channels: list[str]) -> int:
+    """The previous implementation: query each name in each loaded subdir."""
+    context.use_index_cache = True
+    try:
+        count = 0
+        for url in all_channel_urls(channels, context.subdirs):
+            subdir_data = SubdirData(Channel(url), repodata_fn=REPODATA_FN)
+            for name in NAMES:
+                count += len(tuple(subdir_data.query(name)))
+        return count
+    finally:
+        del context.use_index_cache
+        SubdirData.clear_cached_local_channel_data(exclude_file=False)
+
+
+def timed(function, *args) -> tuple[float, int]:
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    channels = ["conda-forge"]
+    cached = SubdirData(Channel(f"conda-forge/{context.subdir}")).cache_path_json
+    with tempfile.TemporaryDirectory() as tmp:
+        if cached.exists():
+            source = "cached conda-forge repodata"
+        else:
+            source = f"synthetic channel of {PACKAGES * BUILDS:,} records"
+            os.environ["CONDA_PKGS_DIRS"] = str(Path(tmp, "pkgs"))
+            reset_context()
+            channel = Path(tmp, "channel")
+            make_channel(channel)
+            channels = [channel.as_uri()]
+            # fill the index cache, as the last solve would have
+            list(SubdirData.query_all("conda", channels, context.subdirs))
+            SubdirData.clear_cached_local_channel_data(exclude_file=False)
+            subdir_data = SubdirData(Channel(f"{channels[0]}/{context.subdir}"))
+            cached = subdir_data.cache_path_json
+        print(f"{source}: {cached.stat().st_size / 2**20:.0f} MiB")
+
+        prefix = Path(tmp, "prefix")
+
+        def records() -> int:
+            found = cached_records(NAMES, channels, prefix)
+            return sum(map(len, found.values()))
+
+        baseline, expected = timed(subdir_data_records, channels)
+        cold, count = timed(records)
+        warm, count_warm = timed(records)
+        assert count == count_warm == expected, (count, count_warm, expected)
+
+    print(f"SubdirData:           {baseline * 1000:8.1f} ms ({expected} records)")
+    print(f"cached_records, cold: {cold * 1000:8.1f} ms ({baseline / cold:.1f}x)")
+    print(f"cached_records, warm: {warm * 1000:8.1f} ms ({baseline / warm:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Install, remove and update plugins in a single transaction on base."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, NamedTuple
+
+from conda.base.context import context
+from conda.exceptions import CondaValueError
+
+from .exceptions import PluginRemoveError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+#: Keys of a changes file and the corresponding :class:`PluginChanges` fields.
+CHANGE_KINDS = ("install", "remove", "update")
+
+
+class PluginChanges(NamedTuple):
+    install: tuple[str, ...] = ()
+    remove: tuple[str, ...] = ()
+    update: tuple[str, ...] = ()
+
+    def __bool__(self) -> bool:
+        return any((self.install, self.remove, self.update))
+
+    def merge(self, other: PluginChanges) -> PluginChanges:
+        return PluginChanges(
+            *(
+                tuple(dict.fromkeys([*mine, *theirs]))
+                for mine, theirs in zip(self, other)
+            )
+        )
+
+
+def read_changes_file(path: Path) -> PluginChanges:
+    """Read changes from a YAML (or JSON) mapping of lists of specs.
+
+    For example::
+
+        install: [conda-index]
+        remove: [conda-libmamba-solver]
+        update: [anaconda-anon-usage]
+    """
+    from conda.common.serialize import yaml
+
+    text = path.read_text()
+    data = json.loads(text) if path.suffix == ".json" else yaml.loads(text)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict) or set(data) - set(CHANGE_KINDS):
+        raise CondaValueError(
+            f"{path} must be a mapping with keys among: {', '.join(CHANGE_KINDS)}."
+        )
+    changes = {}
+    for kind in CHANGE_KINDS:
+        specs = data.get(kind) or []
+        if not isinstance(specs, list) or not all(isinstance(s, str) for s in specs):
+            raise CondaValueError(f"'{kind}' in {path} must be a list of specs.")
+        changes[kind] = tuple(specs)
+    return PluginChanges(**changes)
+
+
+def _names(specs: Iterable[str]) -> list[str]:
+    from conda.models.match_spec import MatchSpec
+
+    return [MatchSpec(spec).name for spec in specs]
+
+
+def validate_changes(changes: PluginChanges) -> None:
+    """Check ``changes`` against the rules of install, remove and update.
+
+    Whether the packages to install are plugins can only be checked once they
+    are extracted, see :func:`apply_changes`.
+    """
+    from conda.models.match_spec import MatchSpec
+
+    from .query import permanent_dependencies
+    from .validate import validate_plugin_is_installed
+
+    if not changes:
+        raise CondaValueError("Nothing to apply: no plugins to install/remove/update.")
+
+    with_channels = [
+        spec
+        for spec in (*changes.install, *changes.update)
+        if MatchSpec(spec).get("channel")
+    ]
+    if with_channels:
+        joined = ", ".join(with_channels)
+        raise CondaValueError(
+            f"Channel specifications are not supported: {joined}\n"
+            "Configure channels via `conda config --add channels <channel>` instead."
+        )
+
+    seen: dict[str, str] = {}
+    for kind, specs in zip(CHANGE_KINDS, changes):
+        for name in _names(specs):
+            if seen.setdefault(name, kind) != kind:
+                raise CondaValueError(
+                    f"'{name}' can not be both in {seen[name]} and {kind}."
+                )
+
+    protected = permanent_dependencies(add_plugins=False)
+    if protected_names := [n for n in _names(changes.remove) if n in protected]:
+        raise PluginRemoveError(protected_names)
+
+    for name in _names(changes.update):
+        if name != "conda":
+            validate_plugin_is_installed(name)
+
+
+def _plugin_names(changes: PluginChanges) -> list[str]:
+    """Names that must be conda plugins: all installed and updated but conda."""
+    return [
+        name for name in _names((*changes.install, *changes.update)) if name != "conda"
+    ]
+
+
+def apply_changes(
+    changes: PluginChanges,
+    dry_run: bool = False,
+    yes: bool = False,
+    json: bool = False,
+) -> int:
+    """Validate ``changes``, then solve and run them as one transaction on base.
+
+    Packages to install and update are checked to be plugins once extracted
+    to the package cache, before anything is linked into base. As for
+    :func:`~.install.install_specs_in_protected_env`, this runs in-process only
+    if :func:`~.install.in_process_enabled` and the solution does not touch an
+    isolated package; otherwise a single ``conda install`` or ``conda remove``
+    subprocess makes the changes. No subprocess can install and remove at
+    once, so such changes are refused rather than split in two transactions.
+    """
+    from conda.exceptions import DryRunExit
+
+    from .install import (
+        execute_in_protected_env,
+        in_process_enabled,
+        install_subprocess,
+        remove_subprocess,
+        solve_in_protected_env,
+        touches_isolated_packages,
+        validate_plugins,
+    )
+
+    validate_changes(changes)
+
+    specs = [*changes.install, *changes.update]
+    plugins = _plugin_names(changes)
+    if in_process_enabled([*specs, *changes.remove], json):
+        txn = solve_in_protected_env(specs_to_add=specs, specs_to_remove=changes.remove)
+        if txn.nothing_to_do:
+            # the plugins are all installed already, and must still be plugins
+            validate_plugins(txn, plugins)
+            if not context.quiet:
+                print("\n# All requested changes are already applied.\n")
+            return 0
+        if not touches_isolated_packages(txn):
+            returncode = execute_in_protected_env(
+                txn,
+                dry_run=dry_run,
+                yes=yes,
+                validate=lambda txn: validate_plugins(txn, plugins),
+            )
+            if dry_run:
+                raise DryRunExit()
+            return returncode
+
+    if specs and changes.remove:
+        raise CondaValueError(
+            "Installing or updating and removing plugins in a single transaction "
+            "requires running in-process: enable the self_in_process setting, "
+            "do not use --json, and leave conda, conda-self and python alone. "
+            "Otherwise, apply the removals and the other changes separately."
+        )
+    if specs:
+        returncode = install_subprocess(
+            specs, dry_run=dry_run, json=json, yes=yes, plugins=plugins
+        )
+    else:
+        returncode = remove_subprocess(
+            changes.remove, dry_run=dry_run, json=json, yes=yes
+        )
+    if dry_run:
+        raise DryRunExit()
+    return returncode
@@ -0,0 +1,277 @@
+"""Offline bundles replicating the state of a base environment.
+
+A bundle is an uncompressed tar archive holding:
+
+- :data:`~.constants.BUNDLE_EXPLICIT`, the CEP-23 ``@EXPLICIT`` spec of the
+  environment, with the md5 of every package;
+- :data:`~.constants.BUNDLE_MANIFEST`, the bundle format version, platform and,
+  for each package, its URL, tarball file name, size, md5 and sha256, and its
+  repodata record;
+- the package tarballs, under :data:`~.constants.BUNDLE_PKGS_DIR`.
+
+:func:`apply_bundle` puts the tarballs, checked against their sha256, in the
+first writable package cache and extracts them there, as conda would after a
+download. It then resets the environment to the explicit spec (see
+:func:`~.reset.reset`): the solver and the network are not involved.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tarfile
+import time
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING
+
+from conda.base.context import context
+
+from . import APP_VERSION
+from .constants import (
+    BUNDLE_EXPLICIT,
+    BUNDLE_FORMAT_VERSION,
+    BUNDLE_MANIFEST,
+    BUNDLE_PKGS_DIR,
+)
+from .exceptions import BundleError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import IO, Any
+
+    from conda.models.records import PackageCacheRecord, PrefixRecord
+
+
+def _sha256(fh: IO[bytes], copy_to: IO[bytes] | None = None) -> str:
+    digest = hashlib.sha256()
+    while chunk := fh.read(1 << 20):
+        digest.update(chunk)
+        if copy_to is not None:
+            copy_to.write(chunk)
+    return digest.hexdigest()
+
+
+def _cached_tarballs(
+    records: Iterable[PrefixRecord],
+) -> dict[str, PackageCacheRecord]:
+    """Package cache records holding the tarball of ``records``, by name.
+
+    Tarballs missing from the package caches are downloaded first.
+    """
+    from conda.core.package_cache_data import (
+        PackageCacheData,
+        ProgressiveFetchExtract,
+    )
+
+    def find(record: PrefixRecord) -> PackageCacheRecord | None:
+        return next(
+            (
+                cached
+                for cached in PackageCacheData.query_all(record)
+                if os.path.isfile(cached.package_tarball_full_path)
+            ),
+            None,
+        )
+
+    records = list(records)
+    tarballs = {record.name: find(record) for record in records}
+    if missing := [r for r in records if tarballs[r.name] is None]:
+        ProgressiveFetchExtract(missing).execute()
+        tarballs.update((record.name, find(record)) for record in missing)
+    found = {name: cached for name, cached in tarballs.items() if cached is not None}
+    if missing_names := sorted(set(tarballs) - set(found)):
+        raise BundleError(
+            "Package tarballs not found in the package cache: "
+            f"{', '.join(missing_names)}."
+        )
+    return found
+
+
+def _explicit_line(record: PrefixRecord) -> str:
+    """The URL of ``record`` with its md5, or else its sha256, as fragment."""
+    if md5 := getattr(record, "md5", None):
+        return f"{record.url}#{md5}"
+    if sha256 := getattr(record, "sha256", None):
+        return f"{record.url}#sha256:{sha256}"
+    return record.url
+
+
+def explicit_lines(records: Iterable[PrefixRecord], platform: str) -> list[str]:
+    """The CEP-23 ``@EXPLICIT`` spec of ``records``, with their checksums."""
+    from conda import __version__ as conda_version
+
+    return [
+        f"# platform: {platform}",
+        f"# created-by: {APP_VERSION} (conda {conda_version})",
+        "@EXPLICIT",
+        *map(_explicit_line, records),
+    ]
+
+
+def create_bundle(path: Path, prefix: str | Path = sys.prefix) -> dict[str, Any]:
+    """Write the packages installed in ``prefix`` to the bundle ``path``.
+
+    Returns the manifest of the bundle.
+    """
+    from conda.models.records import PackageRecord
+
+    from .prefix_index import prefix_index
+
+    records = sorted(prefix_index(prefix).records(), key=lambda r: r.name)
+    if missing_urls := [record.name for record in records if not record.url]:
+        raise BundleError(
+            f"Packages without a URL can not be bundled: {', '.join(missing_urls)}."
+        )
+    tarballs = _cached_tarballs(records)
+
+    packages = []
+    for record in records:
+        tarball = Path(tarballs[record.name].package_tarball_full_path)
+        with tarball.open("rb") as fh:
+            sha256 = _sha256(fh)
+        packages.append(
+            {
+                "name": record.name,
+                "url": record.url,
+                "filename": tarball.name,
+                "size": tarball.stat().st_size,
+                "md5": record.md5,
+                "sha256": sha256,
+                "record": PackageRecord.from_objects(record).dump(),
+            }
+        )
+    manifest = {
+        "version": BUNDLE_FORMAT_VERSION,
+        "platform": context.subdir,
+        "created": time.time(),
+        "created_by": APP_VERSION,
+        "packages": packages,
+    }
+
+    def add_bytes(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(manifest["created"])
+        tar.addfile(info, BytesIO(data))
+
+    partial = path.with_name(f"{path.name}.partial")
+    with tarfile.open(partial, "w") as tar:
+        add_bytes(tar, BUNDLE_MANIFEST, json.dumps(manifest, indent=2).encode())
+        add_bytes(
+            tar,
+            BUNDLE_EXPLICIT,
+            "\n".join(explicit_lines(records, context.subdir)).encode() + b"\n",
+        )
+        for package in packages:
+            tar.add(
+                tarballs[package["name"]].package_tarball_full_path,
+                f"{BUNDLE_PKGS_DIR}/{package['filename']}",
+            )
+    partial.replace(path)
+    return manifest
+
+
+def _member(tar: tarfile.TarFile, name: str) -> IO[bytes]:
+    try:
+        fh = tar.extractfile(name)
+    except KeyError:
+        fh = None
+    if fh is None:
+        raise BundleError(f"Missing from the bundle: {name}.")
+    return fh
+
+
+def read_manifest(tar: tarfile.TarFile) -> dict[str, Any]:
+    """The manifest of an open bundle, checked for this platform."""
+    try:
+        manifest = json.load(_member(tar, BUNDLE_MANIFEST))
+    except ValueError as err:
+        raise BundleError(f"Invalid bundle manifest: {err}") from err
+    if manifest.get("version") != BUNDLE_FORMAT_VERSION:
+        raise BundleError(
+            f"Unsupported bundle format version {manifest.get('version')!r}."
+        )
+    if manifest.get("platform") != context.subdir:
+        raise BundleError(
+            f"The bundle is for {manifest.get('platform')}, not {context.subdir}."
+        )
+    for package in manifest["packages"]:
+        if Path(package["filename"]).name != package["filename"]:
+            raise BundleError(f"Invalid file name in bundle: {package['filename']!r}")
+    return manifest
+
+
+def _is_cached(pkgs_dir: Path, package: dict[str, Any]) -> bool:
+    tarball = pkgs_dir / package["filename"]
+    extracted = pkgs_dir / _extracted_name(package["filename"])
+    if not (tarball.is_file() and (extracted / "info" / "index.json").is_file()):
+        return False
+    with tarball.open("rb") as fh:
+        return _sha256(fh) == package["sha256"]
+
+
+def _extracted_name(filename: str) -> str:
+    from conda.common.path import strip_pkg_extension
+
+    return strip_pkg_extension(filename)[0]
+
+
+def unpack_bundle(tar: tarfile.TarFile, manifest: dict[str, Any]) -> Path:
+    """Put the packages of a bundle in the first writable package cache.
+
+    Each tarball is checked against its sha256 and extracted, with its
+    repodata record, the way conda extracts downloaded packages. Packages
+    already in the cache are left alone. Returns the package cache directory.
+    """
+    from conda.core.package_cache_data import PackageCacheData
+    from conda.gateways.disk.create import extract_tarball
+
+    pkgs_dir = Path(PackageCacheData.first_writable().pkgs_dir)
+    for package in manifest["packages"]:
+        if _is_cached(pkgs_dir, package):
+            continue
+        source = _member(tar, f"{BUNDLE_PKGS_DIR}/{package['filename']}")
+        tarball = pkgs_dir / package["filename"]
+        partial = tarball.with_name(f"{tarball.name}.partial")
+        with partial.open("wb") as fh:
+            sha256 = _sha256(source, copy_to=fh)
+        if sha256 != package["sha256"]:
+            partial.unlink()
+            raise BundleError(
+                f"sha256 mismatch for {package['filename']}: "
+                f"expected {package['sha256']}, got {sha256}."
+            )
+        partial.replace(tarball)
+
+        extracted = pkgs_dir / _extracted_name(package["filename"])
+        shutil.rmtree(extracted, ignore_errors=True)
+        extract_tarball(str(tarball), str(extracted))
+        (extracted / "info" / "repodata_record.json").write_text(
+            json.dumps(package["record"], indent=2)
+        )
+    PackageCacheData(str(pkgs_dir)).reload()
+    return pkgs_dir
+
+
+def apply_bundle(path: Path, prefix: str = sys.prefix) -> None:
+    """Reset ``prefix`` to the state recorded in the bundle ``path``, offline."""
+    from conda.exceptions import DryRunExit
+
+    with tarfile.open(path) as tar:
+        manifest = read_manifest(tar)
+        if context.dry_run:
+            raise DryRunExit()
+        explicit = _member(tar, BUNDLE_EXPLICIT).read()
+        unpack_bundle(tar, manifest)
+
+    from .reset import reset
+
+    with TemporaryDirectory() as tmp:
+        snapshot = Path(tmp, BUNDLE_EXPLICIT)
+        snapshot.write_bytes(explicit)
+        reset(prefix=prefix, snapshot=snapshot)
@@ -0,0 +1,95 @@
+"""On-disk caches kept next to ``conda-meta`` in the base prefix.
+
+Cache files are plain JSON documents stored in :data:`~.constants.CACHE_DIR`
+and tagged with a key; a document whose key does not match the one computed
+for the current state of the prefix is treated as missing. Failing to read or
+write a cache (e.g. a read-only shared install) is never an error.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from contextlib import suppress
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import TYPE_CHECKING
+
+from . import APP_VERSION
+from .constants import CACHE_DIR
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+def cache_path(prefix: str | Path, filename: str) -> Path:
+    """Location of the cache file ``filename`` for ``prefix``."""
+    return Path(prefix, CACHE_DIR, filename)
+
+
+def site_packages_dirs(prefix: str | Path) -> list[Path]:
+    """The ``site-packages`` directories of the Python installed in ``prefix``."""
+    prefix = Path(prefix)
+    candidates = [prefix / "Lib" / "site-packages"]
+    with suppress(OSError):
+        candidates.extend(
+            Path(entry.path, "site-packages")
+            for entry in os.scandir(prefix / "lib")
+            if entry.name.startswith("python")
+        )
+    return sorted(path for path in candidates if path.is_dir())
+
+
+def conda_meta_fingerprint(prefix: str | Path) -> str:
+    """Hash of the state of the records installed in ``prefix``.
+
+    Covers name, size and mtime of every ``conda-meta/*.json`` record and of
+    the ``history`` file, plus the mtime of the ``site-packages`` directories
+    so that packages installed with ``pip`` (visible to conda through
+    interoperability) are accounted for too. Any transaction on the prefix
+    changes the fingerprint.
+    """
+    state = []
+    with suppress(OSError):
+        for entry in os.scandir(Path(prefix, "conda-meta")):
+            if entry.name.endswith(".json") or entry.name == "history":
+                stat = entry.stat()
+                state.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    for path in site_packages_dirs(prefix):
+        with suppress(OSError):
+            state.append((str(path), 0, path.stat().st_mtime_ns))
+    return hashlib.sha256(json.dumps(sorted(state)).encode()).hexdigest()
+
+
+def cache_key(*parts: Any) -> str:
+    """Combine JSON-serializable ``parts`` (and the conda-self version) in a key."""
+    return hashlib.sha256(json.dumps([APP_VERSION, *parts]).encode()).hexdigest()
+
+
+def read_cache(path: Path, key: str) -> Any | None:
+    """Return the data stored in ``path`` if it was written with ``key``."""
+    try:
+        document = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(document, dict) or document.get("key") != key:
+        return None
+    return document.get("data")
+
+
+def write_cache(path: Path, key: str, data: Any) -> None:
+    """Atomically store ``data`` in ``path`` under ``key``."""
+    with suppress(OSError):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(
+            "w", dir=path.parent, prefix=f".{path.name}.", delete=False
+        ) as tmp:
+            json.dump({"key": key, "data": data}, tmp)
+        try:
+            # caches of a shared install are written by its owner but read by all
+            os.chmod(tmp.name, 0o644)
+            os.replace(tmp.name, path)
+        except OSError:
+            os.unlink(tmp.name)
+            raise
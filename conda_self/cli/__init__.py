@@ -10,12 +10,20 @@ def configure_parser(parser: argparse.ArgumentParser) -> None:
     from functools import partial
 
     from .. import APP_NAME, APP_VERSION
+    from .main_apply import HELP as APPLY_HELP
+    from .main_apply import configure_parser as configure_parser_apply
+    from .main_bundle import HELP as BUNDLE_HELP
+    from .main_bundle import configure_parser as configure_parser_bundle
     from .main_install import HELP as INSTALL_HELP
     from .main_install import configure_parser as configure_parser_install
     from .main_remove import HELP as REMOVE_HELP
     from .main_remove import configure_parser as configure_parser_remove
     from .main_reset import HELP as RESET_HELP
     from .main_reset import configure_parser as configure_parser_reset
+    from .main_serve import HELP as SERVE_HELP
+    from .main_serve import configure_parser as configure_parser_serve
+    from .main_snapshot import HELP as SNAPSHOT_HELP
+    from .main_snapshot import configure_parser as configure_parser_snapshot
     from .main_update import HELP as UPDATE_HELP
     from .main_update import configure_parser as configure_parser_update
 
@@ -32,12 +40,25 @@ def configure_parser(parser: argparse.ArgumentParser) -> None:
         dest="subcommand",
     )
 
+    configure_parser_apply(subparsers.add_parser("apply", help=APPLY_HELP))
+    configure_parser_bundle(subparsers.add_parser("bundle", help=BUNDLE_HELP))
     configure_parser_install(subparsers.add_parser("install", help=INSTALL_HELP))
     configure_parser_remove(subparsers.add_parser("remove", help=REMOVE_HELP))
     configure_parser_reset(subparsers.add_parser("reset", help=RESET_HELP))
+    configure_parser_serve(subparsers.add_parser("serve", help=SERVE_HELP))
+    configure_parser_snapshot(subparsers.add_parser("snapshot", help=SNAPSHOT_HELP))
     configure_parser_update(subparsers.add_parser("update", help=UPDATE_HELP))
     parser.set_defaults(func=partial(parser.parse_args, ["--help"]))
 
 
 def execute(args: argparse.Namespace) -> int:
-    return args.func(args)
+    import sys
+
+    from ..daemon import FORWARDED_SUBCOMMANDS, base_lock, forward_to_daemon
+
+    if getattr(args, "subcommand", None) not in FORWARDED_SUBCOMMANDS:
+        return args.func(args)
+    if (returncode := forward_to_daemon(args)) is not None:
+        return returncode
+    with base_lock(sys.prefix):
+        return args.func(args)
@@ -0,0 +1,44 @@
+"""Command line options shared by several `conda self` subcommands."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
+
+    from ..progress import ProgressCallback
+
+
+def add_progress_fd_option(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--progress-fd",
+        type=int,
+        metavar="FD",
+        help=(
+            "Write progress events (solve, fetch and link phases, packages "
+            "fetched) as newline-delimited JSON to the file descriptor FD. "
+            "Runs conda in a separate process, in JSON mode, which does not "
+            "prompt: requires --yes or --dry-run."
+        ),
+    )
+
+
+def progress_from_args(
+    args: argparse.Namespace, prompts: bool = True
+) -> ProgressCallback | None:
+    """The progress callback requested by ``--progress-fd``, if any.
+
+    ``prompts`` tells whether the child conda would otherwise ask for
+    confirmation, in which case ``--yes`` or ``--dry-run`` is required.
+    """
+    from conda.base.context import context
+    from conda.exceptions import CondaValueError
+
+    from ..progress import progress_writer
+
+    if args.progress_fd is None:
+        return None
+    if prompts and not (context.always_yes or context.dry_run):
+        raise CondaValueError("--progress-fd requires --yes or --dry-run.")
+    return progress_writer(args.progress_fd)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
+
+HELP = "Install, remove and update plugins in a single transaction."
+
+DESCRIPTION = f"""{HELP}
+
+All changes are validated, solved together and applied to the 'base'
+environment at once when they can run in-process (see the self_in_process
+setting); otherwise by a single `conda install` or `conda remove` process, so
+changes mixing removals with installs or updates are refused then. Changes
+can also be read from a YAML or JSON file with 'install', 'remove' and
+'update' lists of specs.
+"""
+
+
+def configure_parser(parser: argparse.ArgumentParser) -> None:
+    from conda.cli.helpers import add_output_and_prompt_options
+
+    parser.description = DESCRIPTION
+    add_output_and_prompt_options(parser)
+    parser.add_argument(
+        "--install",
+        nargs="+",
+        default=[],
+        metavar="SPEC",
+        help="Plugins to install.",
+    )
+    parser.add_argument(
+        "--remove",
+        nargs="+",
+        default=[],
+        metavar="NAME",
+        help="Plugins to remove.",
+    )
+    parser.add_argument(
+        "--update",
+        nargs="+",
+        default=[],
+        metavar="NAME",
+        help="Plugins (or conda) to update.",
+    )
+    parser.add_argument(
+        "--file",
+        type=Path,
+        help="YAML or JSON file listing the plugins to install, remove and update.",
+    )
+    parser.set_defaults(func=execute)
+
+
+def execute(args: argparse.Namespace) -> int:
+    from conda.base.context import context
+
+    from ..apply import PluginChanges, apply_changes, read_changes_file
+
+    changes = PluginChanges(tuple(args.install), tuple(args.remove), tuple(args.update))
+    if args.file:
+        changes = read_changes_file(args.file).merge(changes)
+
+    if not context.quiet:
+        for kind, specs in zip(("Installing", "Removing", "Updating"), changes):
+            if specs:
+                print(f"{kind} plugins:", *specs)
+
+    return apply_changes(
+        changes, dry_run=context.dry_run, yes=context.always_yes, json=context.json
+    )
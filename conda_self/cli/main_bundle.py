@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
+
+HELP = "Create or apply an offline bundle of the 'base' environment."
+
+DESCRIPTION = f"""{HELP}
+
+A bundle is a single archive holding the explicit spec of 'base' and every
+package it references, with their hashes. Applying it on another machine of
+the same platform resets 'base' to that exact state, without solving and
+without network access.
+"""
+
+
+def configure_parser(parser: argparse.ArgumentParser) -> None:
+    from conda.cli.helpers import add_output_and_prompt_options
+
+    parser.description = DESCRIPTION
+    subparsers = parser.add_subparsers(
+        title="bundle commands", dest="bundle_command", required=True
+    )
+
+    create = subparsers.add_parser(
+        "create", help="Write the packages of 'base' to a bundle."
+    )
+    create.add_argument("path", type=Path, help="Bundle file to write.")
+    create.set_defaults(func=execute_create)
+
+    apply = subparsers.add_parser(
+        "apply", help="Reset 'base' to the state recorded in a bundle, offline."
+    )
+    add_output_and_prompt_options(apply)
+    apply.add_argument("path", type=Path, help="Bundle file to apply.")
+    apply.set_defaults(func=execute_apply)
+
+
+def execute_create(args: argparse.Namespace) -> int:
+    from conda.base.context import context
+
+    from ..bundle import create_bundle
+
+    if not context.quiet:
+        print(f"Writing the packages of 'base' to {args.path}...")
+    manifest = create_bundle(args.path)
+    if not context.quiet:
+        size = sum(package["size"] for package in manifest["packages"])
+        print(
+            f"Bundled {len(manifest['packages'])} packages "
+            f"({size / 2**20:.1f} MiB) for {manifest['platform']}."
+        )
+    return 0
+
+
+def execute_apply(args: argparse.Namespace) -> int:
+    from conda.base.context import context
+    from conda.reporters import confirm_yn
+
+    from ..bundle import apply_bundle
+
+    confirm_yn(
+        f"Proceed with resetting your 'base' environment to {args.path}?[y/n]:\n",
+        default="no",
+        dry_run=context.dry_run,
+    )
+    apply_bundle(args.path)
+    if not context.quiet:
+        print(f"\nSUCCESS!\nReset the `base` environment to {args.path}.")
+    return 0
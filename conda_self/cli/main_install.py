@@ -11,8 +11,11 @@ HELP = "Add conda plugins to the 'base' environment."
 def configure_parser(parser: argparse.ArgumentParser) -> None:
     from conda.cli.helpers import add_output_and_prompt_options
 
+    from .helpers import add_progress_fd_option
+
     parser.description = HELP
     add_output_and_prompt_options(parser)
+    add_progress_fd_option(parser)
     parser.add_argument(
         "--force-reinstall",
         action="store_true",
@@ -27,12 +30,9 @@ def execute(args: argparse.Namespace) -> int:
     from conda.exceptions import CondaValueError, DryRunExit
     from conda.models.match_spec import MatchSpec
 
-    from ..exceptions import NotAPluginError
-    from ..install import (
-        install_specs_in_protected_env,
-        uninstall_specs_in_protected_env,
-    )
-    from ..validate import conda_plugin_packages, reload_plugin_packages
+    from ..install import install_specs_in_protected_env
+    from ..validate import reload_plugin_packages
+    from .helpers import progress_from_args
 
     specs_to_add = [MatchSpec(spec) for spec in args.specs]
 
@@ -44,6 +44,7 @@ def execute(args: argparse.Namespace) -> int:
             "Configure channels via `conda config --add channels <channel>` instead."
         )
 
+    progress = progress_from_args(args)
     print("Installing plugins:", *args.specs)
 
     returncode = install_specs_in_protected_env(
@@ -52,6 +53,8 @@ def execute(args: argparse.Namespace) -> int:
         dry_run=context.dry_run,
         json=context.json,
         yes=context.always_yes,
+        plugins_only=True,
+        progress=progress,
     )
 
     if returncode != 0:
@@ -61,17 +64,4 @@ def execute(args: argparse.Namespace) -> int:
         raise DryRunExit()
 
     reload_plugin_packages()
-
-    plugin_names = conda_plugin_packages()
-    spec_names = [spec.name for spec in specs_to_add]
-    invalid_names = [
-        name
-        for name in spec_names
-        if name.lower().replace("_", "-") not in plugin_names
-    ]
-
-    if invalid_names:
-        uninstall_specs_in_protected_env(invalid_names, yes=True)
-        raise NotAPluginError(invalid_names)
-
     return 0
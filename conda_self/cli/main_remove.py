@@ -12,8 +12,11 @@ HELP = "Remove conda plugins from the 'base' environment."
 def configure_parser(parser: argparse.ArgumentParser) -> None:
     from conda.cli.helpers import add_output_and_prompt_options
 
+    from .helpers import add_progress_fd_option
+
     parser.description = HELP
     add_output_and_prompt_options(parser)
+    add_progress_fd_option(parser)
     parser.add_argument(
         "--force",
         action="store_true",
@@ -34,6 +37,10 @@ def execute(args: argparse.Namespace) -> int:
     from ..exceptions import PluginRemoveError
     from ..install import uninstall_specs_in_protected_env
     from ..query import permanent_dependencies
+    from .helpers import progress_from_args
+
+    # the confirmation is asked here, conda itself runs with --yes
+    progress = progress_from_args(args, prompts=False)
 
     uninstallable_packages = permanent_dependencies(add_plugins=False)
     protected_specs = [spec for spec in args.specs if spec in uninstallable_packages]
@@ -57,5 +64,7 @@ def execute(args: argparse.Namespace) -> int:
         dry_run=context.dry_run,
     )
 
-    uninstall_specs_in_protected_env(args.specs, json=context.json, yes=True)
+    uninstall_specs_in_protected_env(
+        args.specs, json=context.json, yes=True, progress=progress
+    )
     return 0
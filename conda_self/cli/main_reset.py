@@ -6,7 +6,12 @@ from pathlib import Path
 from textwrap import dedent
 from typing import TYPE_CHECKING
 
-from ..constants import RESET_FILE_BASE_PROTECTION, RESET_FILE_INSTALLER
+from ..constants import (
+    DEFAULT_SNAPSHOT_NAME,
+    RESET_FILE_BASE_PROTECTION,
+    RESET_FILE_INSTALLER,
+    SNAPSHOT_EXPLICIT,
+)
 
 if TYPE_CHECKING:
     import argparse
@@ -25,6 +30,7 @@ class Snapshot(Enum):
     INSTALLER_EXACT = "installer-exact"
     INSTALLER_UPDATED = "installer-updated"
     BASE_PROTECTION = "base-protection"
+    SAVED = "saved"
 
     def __str__(self) -> str:
         return self.value
@@ -40,15 +46,23 @@ class Snapshot(Enum):
                 return "installer-provided (with updates)"
             case Snapshot.BASE_PROTECTION:
                 return "base-protection"
+            case Snapshot.SAVED:
+                return "saved (conda self snapshot)"
 
     @property
     def file_path(self) -> Path | None:
-        """The ``conda-meta/*.txt`` file this snapshot mode reads, if any."""
+        """The explicit file this snapshot mode reads, if any."""
         match self:
             case Snapshot.INSTALLER_EXACT | Snapshot.INSTALLER_UPDATED:
                 return Path(sys.prefix, "conda-meta", RESET_FILE_INSTALLER)
             case Snapshot.BASE_PROTECTION:
                 return Path(sys.prefix, "conda-meta", RESET_FILE_BASE_PROTECTION)
+            case Snapshot.SAVED:
+                from ..snapshot import snapshot_path
+
+                return (
+                    snapshot_path(sys.prefix, DEFAULT_SNAPSHOT_NAME) / SNAPSHOT_EXPLICIT
+                )
             case Snapshot.CURRENT:
                 return None
 
@@ -73,6 +87,8 @@ SNAPSHOT_HELP = dedent(
     currently installed versions (no downgrade).
     `base-protection` restores the `base` environment to the snapshot saved
     by `conda doctor --fix` before protecting base.
+    `saved` restores the `base` environment to the last snapshot saved by
+    `conda self snapshot create`, with a regular transaction.
 
     If not set, `conda self` will try to reset to the base-protection snapshot
     first, then to the installer-provided (preserving updates), and finally
@@ -111,17 +127,74 @@ def configure_parser(parser: argparse.ArgumentParser) -> None:
         choices=list(Snapshot),
         help=SNAPSHOT_HELP,
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Remove packages by deleting their files in parallel instead of "
+        "through a conda transaction, which is much faster for large "
+        "environments. Packages with unlink scripts or menus still go through "
+        "a transaction. Only applies to the current and installer-updated "
+        "snapshots.",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Only report what the reset would do: the packages to unlink and "
+        "link, their files and sizes, and the packages to download. Nothing "
+        "is solved, downloaded or changed.",
+    )
     parser.set_defaults(func=execute)
 
 
+def reset_arguments(
+    snapshot: Snapshot | None, reset_file: Path | None, fast: bool
+) -> dict:
+    """The keyword arguments of :func:`~conda_self.reset.reset` for ``snapshot``."""
+    from ..query import permanent_dependencies
+    from ..reset import names_from_explicit
+
+    match snapshot:
+        case Snapshot.INSTALLER_UPDATED if reset_file is not None:
+            keep = permanent_dependencies(add_plugins=True) | names_from_explicit(
+                reset_file
+            )
+            return {"uninstallable_packages": keep, "fast": fast}
+        case Snapshot.INSTALLER_EXACT | Snapshot.BASE_PROTECTION | Snapshot.SAVED:
+            return {"snapshot": reset_file}
+        case _:
+            return {
+                "uninstallable_packages": permanent_dependencies(add_plugins=True),
+                "fast": fast,
+            }
+
+
+def plan(snapshot: Snapshot | None, reset_file: Path | None, fast: bool) -> int:
+    """Print the cost of the reset, see :func:`~conda_self.reset_plan.plan_reset`."""
+    import json
+
+    from conda.base.context import context
+
+    from ..reset_plan import plan_reset
+
+    reset_plan = plan_reset(**reset_arguments(snapshot, reset_file, fast))
+    if context.json:
+        document = {"snapshot": str(snapshot) if snapshot else None}
+        document.update(reset_plan.to_json())
+        print(json.dumps(document, indent=2))
+    else:
+        if snapshot is not None:
+            print(f"Snapshot: {snapshot.display_name}")
+        print(reset_plan.summary())
+    return 0
+
+
 def execute(args: argparse.Namespace) -> int:
     from conda.base.context import context
     from conda.reporters import confirm_yn
 
-    from ..query import permanent_dependencies
-    from ..reset import names_from_explicit, reset
+    from ..reset import reset
 
-    if not context.quiet:
+    if not context.quiet and not args.plan:
         print(WHAT_TO_EXPECT)
 
     snapshot: Snapshot | None = args.snapshot
@@ -142,6 +215,9 @@ def execute(args: argparse.Namespace) -> int:
             f"Failed to reset to `{snapshot}`.\nRequired file {reset_file} not found."
         )
 
+    if args.plan:
+        return plan(snapshot, reset_file, args.fast)
+
     prompt = "Proceed with resetting your 'base' environment"
     if snapshot is not None:
         prompt += f" to the {snapshot.display_name} snapshot"
@@ -150,16 +226,7 @@ def execute(args: argparse.Namespace) -> int:
     if not context.quiet:
         print("Resetting 'base' environment...")
 
-    match snapshot:
-        case Snapshot.INSTALLER_UPDATED if reset_file is not None:
-            keep = permanent_dependencies(add_plugins=True) | names_from_explicit(
-                reset_file
-            )
-            reset(uninstallable_packages=keep)
-        case Snapshot.INSTALLER_EXACT | Snapshot.BASE_PROTECTION:
-            reset(snapshot=reset_file)
-        case _:
-            reset(uninstallable_packages=permanent_dependencies(add_plugins=True))
+    reset(**reset_arguments(snapshot, reset_file, args.fast))
 
     if not context.quiet:
         if snapshot is not None:
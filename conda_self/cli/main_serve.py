@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
+
+HELP = "Keep a warm conda-self process serving requests (Unix only)."
+
+DESCRIPTION = f"""{HELP}
+
+While it runs, `conda self install`, `remove`, `reset` and `update` calls
+passing --yes or --dry-run are forwarded to it, saving the start-up of conda.
+Requests are run one at a time; the process exits once idle for
+--idle-timeout seconds.
+"""
+
+
+def configure_parser(parser: argparse.ArgumentParser) -> None:
+    from ..constants import DAEMON_IDLE_TIMEOUT
+
+    parser.description = DESCRIPTION
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DAEMON_IDLE_TIMEOUT,
+        metavar="SECONDS",
+        help="Exit after this many seconds without requests "
+        f"(default: {DAEMON_IDLE_TIMEOUT}).",
+    )
+    parser.set_defaults(func=execute)
+
+
+def execute(args: argparse.Namespace) -> int:
+    import sys
+
+    from conda.base.context import context
+
+    from ..daemon import serve
+
+    if not context.quiet:
+        print(f"Serving conda-self requests for {sys.prefix}...")
+    serve(sys.prefix, idle_timeout=args.idle_timeout)
+    return 0
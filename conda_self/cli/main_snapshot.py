@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+
+from ..constants import DEFAULT_SNAPSHOT_NAME
+
+if TYPE_CHECKING:
+    import argparse
+
+HELP = "Create or restore a snapshot of the 'base' environment."
+
+DESCRIPTION = f"""{HELP}
+
+A snapshot records the package records of 'base' and a tree of reflinks (or
+copies) of their files, so creating one copies almost no data where the file
+system supports reflinks. Restoring it links back the files of the packages
+that changed and the files that are missing or modified, then swaps the
+package records, without solving, downloading or extracting packages. When
+the packages to change have link or unlink scripts or menus, or linking the
+files fails, it is restored with a regular transaction instead, as `conda
+self reset --snapshot saved` does.
+"""
+
+
+def configure_parser(parser: argparse.ArgumentParser) -> None:
+    from conda.cli.helpers import add_output_and_prompt_options
+
+    from ..snapshot import LINK_METHODS
+
+    parser.description = DESCRIPTION
+    subparsers = parser.add_subparsers(
+        title="snapshot commands", dest="snapshot_command", required=True
+    )
+
+    create = subparsers.add_parser("create", help="Snapshot the 'base' environment.")
+    create.add_argument(
+        "name",
+        nargs="?",
+        default=DEFAULT_SNAPSHOT_NAME,
+        help=f"Name of the snapshot (default: {DEFAULT_SNAPSHOT_NAME}). "
+        "An existing snapshot of the same name is replaced.",
+    )
+    create.add_argument(
+        "--link",
+        choices=("auto", *LINK_METHODS),
+        default="auto",
+        help="How to store the files of the packages. `auto` (the default) uses "
+        "reflinks where the file system supports them, or else copies, with a "
+        "warning as that duplicates the files of 'base'. "
+        "`hardlink` must be asked for: hardlinked files modified in place "
+        "change in the snapshot too.",
+    )
+    create.set_defaults(func=execute_create)
+
+    restore = subparsers.add_parser(
+        "restore", help="Restore the 'base' environment to a snapshot."
+    )
+    add_output_and_prompt_options(restore)
+    restore.add_argument(
+        "name",
+        nargs="?",
+        default=DEFAULT_SNAPSHOT_NAME,
+        help=f"Name of the snapshot (default: {DEFAULT_SNAPSHOT_NAME}).",
+    )
+    restore.add_argument(
+        "--verify",
+        action="store_true",
+        help="Compare the files of unchanged packages by checksum rather than by "
+        "size and modification time. Reads all of them.",
+    )
+    restore.set_defaults(func=execute_restore)
+
+
+def execute_create(args: argparse.Namespace) -> int:
+    from conda.base.context import context
+
+    from ..snapshot import create_snapshot
+
+    if not context.quiet:
+        print(f"Creating the '{args.name}' snapshot of 'base'...")
+    manifest = create_snapshot(name=args.name, method=args.link)
+    if args.link == "auto" and manifest["method"] == "copy":
+        print(
+            "Warning: the file system does not support reflinks, so the snapshot "
+            "holds a full copy of the files of 'base'. Pass `--link copy` to "
+            "silence this warning, or `--link hardlink` to share them instead.",
+            file=sys.stderr,
+        )
+    if not context.quiet:
+        print(
+            f"Recorded {manifest['packages']} packages and {manifest['files']} "
+            f"files ({manifest['method']})."
+        )
+    return 0
+
+
+def execute_restore(args: argparse.Namespace) -> int:
+    from conda.base.context import context
+    from conda.reporters import confirm_yn
+
+    from ..snapshot import restore_snapshot
+
+    confirm_yn(
+        "Proceed with restoring your 'base' environment to the "
+        f"'{args.name}' snapshot?[y/n]:\n",
+        default="no",
+        dry_run=context.dry_run,
+    )
+    result = restore_snapshot(name=args.name, verify=args.verify)
+    if not context.quiet:
+        if result.fallback:
+            print(f"Restored with a transaction: {result.fallback}.")
+        else:
+            print(
+                f"Restored {result.restored} files and removed {result.removed} files."
+            )
+        print(f"\nSUCCESS!\nRestored the `base` environment to '{args.name}'.")
+    return 0
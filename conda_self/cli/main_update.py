@@ -11,14 +11,38 @@ HELP = "Update 'conda' and/or its plugins in the 'base' environment."
 def configure_parser(parser: argparse.ArgumentParser) -> None:
     from conda.cli.helpers import add_output_and_prompt_options
 
+    from ..constants import UPDATES_AVAILABLE_EXIT_CODE
+    from .helpers import add_progress_fd_option
+
     parser.description = HELP
     add_output_and_prompt_options(parser)
+    add_progress_fd_option(parser)
     parser.add_argument(
         "--force-reinstall",
         action="store_true",
         help="Install latest conda available even "
         "if currently installed is more recent.",
     )
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Solve the update and download/extract its packages into the "
+        "package cache, without changing 'base' (like --download-only). "
+        "A later update then only verifies and links them.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report whether newer builds of conda and the plugins (or "
+        "--plugin) are available, from the cached repodata, without solving "
+        f"or downloading. Exits with {UPDATES_AVAILABLE_EXIT_CODE} if so.",
+    )
+    parser.add_argument(
+        "--low-priority",
+        action="store_true",
+        help="Run conda at a lower CPU and I/O priority, e.g. to --prefetch "
+        "in the background.",
+    )
     update_group = parser.add_mutually_exclusive_group()
     update_group.add_argument(
         "--plugin",
@@ -34,11 +58,17 @@ def configure_parser(parser: argparse.ArgumentParser) -> None:
 
 def execute(args: argparse.Namespace) -> int:
     from conda.base.context import context
-    from conda.core.prefix_data import PrefixData
     from conda.exceptions import PackageNotInstalledError
 
     from ..install import install_specs_in_protected_env
+    from ..prefix_index import prefix_index
     from ..validate import conda_plugin_packages, validate_plugin_is_installed
+    from .helpers import progress_from_args
+
+    if args.check:
+        return check(args)
+
+    progress = progress_from_args(args)
 
     if args.plugin:
         validate_plugin_is_installed(args.plugin)
@@ -48,17 +78,18 @@ def execute(args: argparse.Namespace) -> int:
     else:
         package_names = ["conda"]
 
-    prefix_data = PrefixData(context.root_prefix)
+    index = prefix_index(context.root_prefix)
 
     info_parts = []
     for name in package_names:
-        installed = prefix_data.get(name)
+        installed = index.get(name)
         if not installed:
             raise PackageNotInstalledError(context.root_prefix, name)
         info_parts.append(f"{name} (installed: {installed.version})")
 
     if not context.quiet:
-        print(f"Updating {', '.join(info_parts)}...")
+        action = "Prefetching updates of" if args.prefetch else "Updating"
+        print(f"{action} {', '.join(info_parts)}...")
 
     return install_specs_in_protected_env(
         specs=package_names,
@@ -67,4 +98,46 @@ def execute(args: argparse.Namespace) -> int:
         dry_run=context.dry_run,
         json=context.json,
         yes=context.always_yes,
+        progress=progress,
+        download_only=args.prefetch,
+        low_priority=args.low_priority,
     )
+
+
+def check(args: argparse.Namespace) -> int:
+    """Report newer builds of conda and the plugins, or ``--plugin``."""
+    import json
+
+    from conda.base.context import context
+    from conda.exceptions import PackageNotInstalledError
+
+    from ..constants import UPDATES_AVAILABLE_EXIT_CODE
+    from ..prefix_index import prefix_index
+    from ..updates import check_updates, updates_report
+    from ..validate import conda_plugin_packages, validate_plugin_is_installed
+
+    if args.plugin:
+        validate_plugin_is_installed(args.plugin)
+        package_names = [args.plugin]
+    else:
+        package_names = ["conda", *sorted(conda_plugin_packages())]
+
+    index = prefix_index(context.root_prefix)
+    installed = {name: record for name in package_names if (record := index.get(name))}
+    if "conda" in package_names and "conda" not in installed:
+        raise PackageNotInstalledError(context.root_prefix, "conda")
+
+    updates = check_updates(installed, context.root_prefix)
+    if context.json:
+        print(json.dumps(updates_report(updates, installed), indent=2))
+    elif not context.quiet:
+        for name, record in installed.items():
+            if candidates := updates.get(name):
+                newest = candidates[0]
+                print(
+                    f"{name} {record.version}-{record.build} -> "
+                    f"{newest.version}-{newest.build} ({newest.channel})"
+                )
+        if not updates:
+            print("All checked packages are up to date.")
+    return UPDATES_AVAILABLE_EXIT_CODE if updates else 0
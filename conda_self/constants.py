@@ -3,8 +3,64 @@ from typing import Final
 PERMANENT_PACKAGES: Final = ("conda", "conda-self")
 
 SELF_PERMANENT_PACKAGES_SETTING: Final = "self_permanent_packages"
+SELF_IN_PROCESS_SETTING: Final = "self_in_process"
+SELF_METRICS_LOG_SETTING: Final = "self_metrics_log"
+
+#: Packages that the running interpreter depends on: transactions touching them
+#: always run in a separate ``conda`` process.
+ISOLATED_PACKAGES: Final = ("conda", "conda-self", "python")
+
+#: Set in the environment of a child ``conda`` whose progress is reported, see
+#: :mod:`conda_self.progress`.
+PROGRESS_ENV_VAR: Final = "CONDA_SELF_PROGRESS"
+
+#: Comma-separated names of the packages that a child ``conda install`` must
+#: check to be conda plugins before linking, see
+#: :class:`conda_self.validate.PluginCheckAction`.
+PLUGINS_ONLY_ENV_VAR: Final = "CONDA_SELF_PLUGINS_ONLY"
+
+#: Niceness of ``conda`` subprocesses run at low priority (e.g. prefetches).
+LOW_PRIORITY_NICENESS: Final = 10
+
+#: Exit status of ``conda self update --check`` when newer builds are available.
+UPDATES_AVAILABLE_EXIT_CODE: Final = 100
 
 DEFAULT_ENV_NAME: Final = "default"
 
 RESET_FILE_INSTALLER = "initial-state.explicit.txt"
 RESET_FILE_BASE_PROTECTION = "base-protection-state.explicit.txt"
+
+#: Members of a ``conda self bundle`` archive.
+BUNDLE_FORMAT_VERSION: Final = 1
+BUNDLE_MANIFEST: Final = "manifest.json"
+BUNDLE_EXPLICIT: Final = "explicit.txt"
+BUNDLE_PKGS_DIR: Final = "pkgs"
+
+#: Store of ``conda self snapshot``, in :data:`CACHE_DIR`, and its members.
+SNAPSHOT_DIR: Final = "snapshots"
+SNAPSHOT_FORMAT_VERSION: Final = 1
+SNAPSHOT_MANIFEST: Final = "manifest.json"
+SNAPSHOT_EXPLICIT: Final = "explicit.txt"
+SNAPSHOT_FILES_DIR: Final = "files"
+DEFAULT_SNAPSHOT_NAME: Final = "latest"
+
+#: Directory, relative to the base prefix, holding conda-self's on-disk caches.
+CACHE_DIR: Final = ".conda-self"
+PERMANENT_DEPENDENCIES_CACHE: Final = "permanent-dependencies{}.json"
+PLUGIN_INDEX_CACHE: Final = "plugin-index.json"
+SITE_PACKAGES_PLUGINS_CACHE: Final = "site-packages-plugins.json"
+#: Parsed packages of an explicit file, by hash of its resolved path.
+EXPLICIT_CACHE: Final = "explicit-{}.json"
+#: Entries of the cached repodata read by ``conda self update --check``.
+CACHED_RECORDS_CACHE: Final = "cached-records.json"
+
+#: Files of ``conda self serve``, in :data:`CACHE_DIR`.
+DAEMON_SOCKET: Final = "daemon.sock"
+DAEMON_LOCK: Final = "daemon.lock"
+#: Lock taken by every conda-self command modifying the base prefix.
+BASE_LOCK: Final = "base.lock"
+#: Seconds without requests after which ``conda self serve`` exits.
+DAEMON_IDLE_TIMEOUT: Final = 600
+#: Seconds a client waits for the daemon to start its command before running
+#: it itself.
+DAEMON_START_TIMEOUT: Final = 30
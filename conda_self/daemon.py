@@ -0,0 +1,386 @@
+"""Warm ``conda self`` process serving requests over a Unix domain socket.
+
+``conda self serve`` keeps conda, its context, the plugin manager, the
+:mod:`.prefix_index` and the solver caches loaded, and runs the ``conda self``
+commands it receives on :data:`~.constants.DAEMON_SOCKET` in the conda-self
+cache directory of the base prefix. While it runs, non-interactive
+``conda self`` invocations that would run in-process forward their arguments
+to it (see :func:`forward_to_daemon`) and print what it sends back; those
+that would start a ``conda`` subprocess anyway gain nothing from it.
+
+Requests are handled one at a time, each under :func:`base_lock`, the lock
+every writer of the base prefix takes, and only for clients running as the
+same user. A client gives up, and runs its command itself, when the daemon
+does not start the command within :data:`~.constants.DAEMON_START_TIMEOUT`
+seconds; the daemon drops requests whose client gave up. The daemon exits
+once it has been idle for ``idle_timeout`` seconds, or once conda,
+conda-self, python or a conda plugin changed in base, as it would otherwise
+keep running their old code.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import time
+from contextlib import ExitStack, contextmanager, suppress
+from tempfile import TemporaryFile
+from typing import TYPE_CHECKING
+
+from .cache import cache_path, conda_meta_fingerprint
+from .constants import (
+    BASE_LOCK,
+    DAEMON_IDLE_TIMEOUT,
+    DAEMON_LOCK,
+    DAEMON_SOCKET,
+    DAEMON_START_TIMEOUT,
+    ISOLATED_PACKAGES,
+)
+from .exceptions import DaemonError
+
+if TYPE_CHECKING:
+    import argparse
+    from collections.abc import Iterator
+    from pathlib import Path
+    from typing import IO, Any
+
+#: Subcommands that may be forwarded to a running daemon.
+FORWARDED_SUBCOMMANDS = (
+    "apply",
+    "bundle",
+    "install",
+    "remove",
+    "reset",
+    "snapshot",
+    "update",
+)
+
+#: Subcommands that always run in-process; the others only do with the
+#: ``self_in_process`` setting, see :func:`~.install.in_process_enabled`.
+IN_PROCESS_SUBCOMMANDS = ("bundle", "reset", "snapshot")
+
+#: State of base after the daemon's last request.
+_last_fingerprint: str | None = None
+
+#: Records of base whose code the daemon loaded, see :func:`_loaded_packages`.
+_loaded: frozenset[tuple[str, str, str]] | None = None
+
+#: Set once base no longer matches :data:`_loaded`: the daemon must exit.
+_stale = False
+
+#: Set while the daemon runs a request: it already holds :func:`base_lock` and
+#: must not forward the request to itself.
+_serving = False
+
+
+@contextmanager
+def _flock(path: Path, blocking: bool = True) -> Iterator[None]:
+    import fcntl
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as fh:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(fh, flags)
+        except BlockingIOError:
+            raise DaemonError(f"'{path}' is locked by another process.") from None
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+@contextmanager
+def base_lock(prefix: str | Path = sys.prefix) -> Iterator[None]:
+    """Exclusive lock held by whoever modifies ``prefix`` through conda-self.
+
+    A no-op on Windows, within the daemon, which already holds it, and for
+    users who cannot write to ``prefix`` (who cannot modify it either).
+    """
+    if os.name == "nt" or _serving:
+        yield
+        return
+    with ExitStack() as stack:
+        with suppress(OSError):
+            stack.enter_context(_flock(cache_path(prefix, BASE_LOCK)))
+        yield
+
+
+def _self_argv() -> list[str] | None:
+    """Arguments following ``self`` on the command line, if any."""
+    if "self" not in sys.argv[1:]:
+        return None
+    return sys.argv[sys.argv.index("self", 1) + 1 :]
+
+
+def _conda_environ() -> dict[str, str]:
+    return {
+        name: value for name, value in os.environ.items() if name.startswith("CONDA")
+    }
+
+
+def _apply_specs(args: argparse.Namespace) -> list[str] | None:
+    """Specs changed by ``conda self apply``, or ``None`` if they can't be read."""
+    from conda.exceptions import CondaError
+
+    from .apply import PluginChanges, read_changes_file
+
+    changes = PluginChanges(
+        *(tuple(getattr(args, kind, None) or ()) for kind in PluginChanges._fields)
+    )
+    if (path := getattr(args, "file", None)) is not None:
+        try:
+            changes = read_changes_file(path).merge(changes)
+        except (CondaError, OSError, ValueError):
+            return None  # reported when run locally
+    return [*changes.install, *changes.update, *changes.remove]
+
+
+def _runs_in_process(args: argparse.Namespace) -> bool:
+    """Whether the command runs in-process, rather than in a ``conda`` child."""
+    from conda.base.context import context
+
+    from .install import in_process_enabled
+
+    if args.subcommand in IN_PROCESS_SUBCOMMANDS:
+        return True
+    if args.subcommand == "update":
+        if getattr(args, "check", False):
+            return True
+        # prefetching links nothing, so conda itself is fine
+        plugin = getattr(args, "plugin", None)
+        specs = [] if getattr(args, "prefetch", False) else [plugin or "conda"]
+    elif args.subcommand == "apply":
+        if (apply_specs := _apply_specs(args)) is None:
+            return False
+        specs = apply_specs
+    else:
+        specs = getattr(args, "specs", None) or []
+    return in_process_enabled(specs, context.json)
+
+
+def forward_to_daemon(args: argparse.Namespace) -> int | None:
+    """Run the current ``conda self`` command in the daemon, if there is one.
+
+    Only non-interactive invocations (``--yes`` or ``--dry-run``) without
+    ``--progress-fd`` are forwarded, and only if they run in-process (see
+    :func:`_runs_in_process`) and the daemon runs with the same ``CONDA*``
+    environment variables. Returns the exit code of the command, or ``None``
+    if it must run in this process, including when the daemon did not start
+    it within :data:`~.constants.DAEMON_START_TIMEOUT` seconds. Once started,
+    the command is waited for as if it ran here.
+    """
+    if _serving or os.name == "nt" or args.subcommand not in FORWARDED_SUBCOMMANDS:
+        return None
+    if not (getattr(args, "yes", False) or getattr(args, "dry_run", False)):
+        return None
+    if getattr(args, "progress_fd", None) is not None:
+        # the file descriptor is only valid in this process
+        return None
+    if (argv := _self_argv()) is None or not _runs_in_process(args):
+        return None
+
+    path = cache_path(sys.prefix, DAEMON_SOCKET)
+    request = {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "environ": _conda_environ(),
+        "deadline": time.time() + DAEMON_START_TIMEOUT,
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(DAEMON_START_TIMEOUT)
+            sock.connect(str(path))
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as fh:
+                response = json.loads(fh.readline())
+                if response.get("started"):
+                    # running the command may take as long as it would here
+                    sock.settimeout(None)
+                    response = json.loads(fh.read())
+    except (OSError, ValueError):
+        # no daemon, a stale socket, or a daemon too busy (or stuck) to answer
+        return None
+    if response.get("returncode") is None:
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(response["stderr"])
+    sys.stderr.flush()
+    return response["returncode"]
+
+
+@contextmanager
+def _captured_fd(fd: int, name: str) -> Iterator[IO[bytes]]:
+    """Point ``fd`` and ``sys.<name>`` to a temporary file, children included."""
+    stream = getattr(sys, name)
+    stream.flush()
+    saved = os.dup(fd)
+    with TemporaryFile() as tmp:
+        os.dup2(tmp.fileno(), fd)
+        setattr(sys, name, open(fd, "w", buffering=1, closefd=False))
+        try:
+            yield tmp
+        finally:
+            getattr(sys, name).close()
+            setattr(sys, name, stream)
+            os.dup2(saved, fd)
+            os.close(saved)
+
+
+def _loaded_packages(prefix: str | Path) -> frozenset[tuple[str, str, str]]:
+    """Name, version and build of the records of ``prefix`` whose code a
+    ``conda self`` process loads: the isolated packages and the conda plugins.
+    """
+    from .prefix_index import prefix_index
+    from .validate import _normalize, conda_plugin_packages
+
+    names = {*ISOLATED_PACKAGES, *conda_plugin_packages()}
+    return frozenset(
+        (record.name, record.version, record.build)
+        for record in prefix_index(prefix).records()
+        if _normalize(record.name) in names
+    )
+
+
+def _base_changed() -> None:
+    """Drop the caches of base, and flag the daemon stale if its code changed."""
+    from .prefix_index import invalidate_prefix_index
+    from .validate import reload_plugin_packages
+
+    global _stale
+    invalidate_prefix_index(sys.prefix)
+    reload_plugin_packages()
+    if _loaded is not None and _loaded_packages(sys.prefix) != _loaded:
+        _stale = True
+
+
+def run_request(request: dict[str, Any]) -> dict[str, Any]:
+    """Run one ``conda self`` command in this process and collect its output.
+
+    The command is not run (the client then runs it) if the ``CONDA*``
+    environment variables of the client differ, or if the daemon is stale.
+    """
+    from conda.cli.main import main_subshell
+    from conda.exception_handler import conda_exception_handler
+
+    if request.get("environ") != _conda_environ():
+        # the client runs with a different configuration: let it run locally
+        return {"returncode": None}
+
+    global _last_fingerprint, _serving
+    fingerprint = conda_meta_fingerprint(sys.prefix)
+    if fingerprint != _last_fingerprint:
+        # base was changed behind our back
+        _base_changed()
+        _last_fingerprint = fingerprint
+    if _stale:
+        return {"returncode": None}
+
+    cwd = os.getcwd()
+    with ExitStack() as stack:
+        stack.enter_context(base_lock(sys.prefix))
+        stdout = stack.enter_context(_captured_fd(1, "stdout"))
+        stderr = stack.enter_context(_captured_fd(2, "stderr"))
+        _serving = True
+        try:
+            os.chdir(request["cwd"])
+            returncode = conda_exception_handler(
+                main_subshell, "self", *request["argv"]
+            )
+        except SystemExit as exc:
+            returncode = exc.code if isinstance(exc.code, int) else 1
+        finally:
+            _serving = False
+            os.chdir(cwd)
+        stdout.seek(0)
+        stderr.seek(0)
+        response = {
+            "returncode": returncode or 0,
+            "stdout": stdout.read().decode(errors="replace"),
+            "stderr": stderr.read().decode(errors="replace"),
+        }
+    if (fingerprint := conda_meta_fingerprint(sys.prefix)) != _last_fingerprint:
+        _base_changed()
+        _last_fingerprint = fingerprint
+    return response
+
+
+def _peer_uid(sock: socket.socket) -> int | None:
+    """User id of the process connected to the Unix domain socket ``sock``."""
+    with suppress(OSError):
+        if hasattr(socket, "SO_PEERCRED"):  # Linux: struct ucred
+            creds = sock.getsockopt(
+                socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+            )
+            return struct.unpack("3i", creds)[1]
+        if hasattr(socket, "LOCAL_PEERCRED"):  # macOS, BSDs: struct xucred
+            size = struct.calcsize("2Ih16I")
+            creds = sock.getsockopt(0, socket.LOCAL_PEERCRED, size)
+            return struct.unpack_from("2I", creds)[1]
+    return None
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        response: dict[str, Any] = {"returncode": None}
+        if _peer_uid(self.connection) != os.getuid():
+            # the socket is private to its owner; refuse anything else
+            pass
+        elif time.time() + 1 >= request.get("deadline", 0):
+            # the client gave up waiting, or is about to: it runs the command
+            pass
+        else:
+            self.wfile.write(json.dumps({"started": True}).encode() + b"\n")
+            response = run_request(request)
+        self.wfile.write(json.dumps(response).encode())
+        if _stale and isinstance(self.server, DaemonServer):
+            self.server.idle = True
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Serve requests one at a time until idle for ``timeout`` seconds."""
+
+    idle = False
+
+    def handle_timeout(self) -> None:
+        self.idle = True
+
+
+def serve(
+    prefix: str | Path = sys.prefix, idle_timeout: float = DAEMON_IDLE_TIMEOUT
+) -> None:
+    """Serve ``conda self`` requests for ``prefix`` until idle."""
+    if os.name == "nt":
+        raise DaemonError("`conda self serve` requires Unix domain sockets.")
+
+    path = cache_path(prefix, DAEMON_SOCKET)
+    with _flock(cache_path(prefix, DAEMON_LOCK), blocking=False):
+        # holding the daemon lock, any existing socket is stale
+        path.unlink(missing_ok=True)
+        umask = os.umask(0o077)  # only the owner of base may connect
+        try:
+            server = DaemonServer(str(path), _RequestHandler)
+        except OSError as err:
+            raise DaemonError(f"Could not listen on '{path}': {err}") from err
+        finally:
+            os.umask(umask)
+        server.timeout = idle_timeout
+        global _loaded, _stale
+        _loaded, _stale = _loaded_packages(prefix), False
+        try:
+            with server:
+                while not server.idle:
+                    server.handle_request()
+        finally:
+            _loaded = None
+            path.unlink(missing_ok=True)
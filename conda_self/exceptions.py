@@ -10,6 +10,7 @@ if TYPE_CHECKING:
 
 class NotAPluginError(CondaError):
     def __init__(self, specs: list[str]):
+        self.specs = specs
         super().__init__(f"The following requested specs are not plugins: {specs}.")
 
 
@@ -23,3 +24,15 @@ class NoDistInfoDirFound(CondaError):
         super().__init__(
             f"No *.dist-info directories found for '{package_name}' in '{path}'."
         )
+
+
+class DaemonError(CondaError):
+    pass
+
+
+class BundleError(CondaError):
+    pass
+
+
+class SnapshotError(CondaError):
+    pass
@@ -0,0 +1,157 @@
+"""Streaming parser for CEP-23 ``@EXPLICIT`` files.
+
+Every package line of an explicit file is a tarball URL, optionally followed
+by a ``#<md5>`` or ``#sha256:<sha256>`` fragment::
+
+    https://conda.anaconda.org/conda-forge/noarch/pip-24.0-pyhd8ed1ab_0.conda#f586...
+
+Channel, subdir, name, version and build all come from the URL path, so
+:func:`iter_explicit` splits it with plain string operations instead of
+building a :class:`~conda.models.match_spec.MatchSpec` per line.
+:func:`read_explicit` caches the parsed packages of a file in
+:data:`~.constants.CACHE_DIR`, keyed by the hash of its content, as the same
+snapshot files are read by ``conda self reset``, the base protection health
+check and :func:`~.reset.reset`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+from typing import TYPE_CHECKING, NamedTuple
+
+from conda.base.constants import EXPLICIT_MARKER
+
+from .cache import cache_key, cache_path, read_cache, write_cache
+from .constants import EXPLICIT_CACHE
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+    from typing import Any
+
+_HEX = frozenset("0123456789abcdef")
+
+
+class ExplicitPackage(NamedTuple):
+    """A package line of an explicit file."""
+
+    url: str
+    channel: str
+    subdir: str
+    filename: str
+    name: str
+    version: str
+    build: str
+    md5: str | None = None
+    sha256: str | None = None
+
+    def to_match_spec(self):
+        from conda.models.match_spec import MatchSpec
+
+        checksums = {
+            key: value
+            for key, value in (("md5", self.md5), ("sha256", self.sha256))
+            if value
+        }
+        return MatchSpec(self.url, **checksums)
+
+
+def _checksums(fragment: str) -> tuple[str | None, str | None]:
+    """The md5 and sha256 in the ``#`` fragment of a package line."""
+    fragment = fragment.removeprefix("sha256:")
+    if set(fragment) <= _HEX:
+        if len(fragment) == 32:
+            return fragment, None
+        if len(fragment) == 64:
+            return None, fragment
+    return None, None
+
+
+def parse_explicit_line(line: str) -> ExplicitPackage:
+    """Parse the package line ``line`` of an explicit file.
+
+    Local paths are turned into ``file://`` URLs, as conda does.
+    """
+    from conda.exceptions import ParseError
+
+    url, _, fragment = line.strip().partition("#")
+    if "://" not in url:
+        from conda.common.path import expand
+        from conda.common.url import path_to_url
+
+        url = path_to_url(expand(url))
+    base, _, filename = url.replace("\\", "/").rpartition("/")
+    channel, _, subdir = base.rpartition("/")
+    if filename.endswith(".conda"):
+        dist = filename[: -len(".conda")]
+    elif filename.endswith(".tar.bz2"):
+        dist = filename[: -len(".tar.bz2")]
+    else:
+        raise ParseError(f"Could not parse explicit URL: {line}")
+    parts = dist.rsplit("-", 2)
+    if len(parts) != 3 or not all(parts) or not channel:
+        raise ParseError(f"Could not parse explicit URL: {line}")
+    name, version, build = parts
+    md5, sha256 = _checksums(fragment)
+    return ExplicitPackage(
+        url, channel, subdir, filename, name, version, build, md5, sha256
+    )
+
+
+def iter_explicit(lines: Iterable[str]) -> Iterator[ExplicitPackage]:
+    """The packages of the lines of an explicit file, one line at a time.
+
+    Blank lines, comments and the ``@EXPLICIT`` marker are skipped.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or line == EXPLICIT_MARKER:
+            continue
+        yield parse_explicit_line(line)
+
+
+def _read_lines(path: Path, digest: Any = None) -> Iterator[str]:
+    """The lines of ``path``, read one at a time and fed to ``digest``."""
+    with open(path, "rb") as fh:
+        for line in fh:
+            if digest is not None:
+                digest.update(line)
+            yield line.decode()
+
+
+def _cache_file(cache_prefix: str | Path, path: Path) -> Path:
+    path_hash = hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:16]
+    return cache_path(cache_prefix, EXPLICIT_CACHE.format(path_hash))
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_explicit(
+    path: Path, cache_prefix: str | Path | None = sys.prefix
+) -> list[ExplicitPackage]:
+    """The packages of the explicit file ``path``, parsed one line at a time.
+
+    The result is cached in the conda-self cache of ``cache_prefix`` (see
+    :mod:`.cache`) under a hash of the resolved path of the file, and reused
+    for as long as the content of the file stays the same. ``None`` disables
+    the cache.
+    """
+    if cache_prefix is None:
+        return list(iter_explicit(_read_lines(path)))
+
+    cache_file = _cache_file(cache_prefix, path)
+    cached = read_cache(cache_file, cache_key(_file_sha256(path)))
+    if cached is not None:
+        return [ExplicitPackage(*row) for row in cached]
+    # keyed by the content parsed, should the file change in between
+    digest = hashlib.sha256()
+    packages = list(iter_explicit(_read_lines(path, digest)))
+    write_cache(cache_file, cache_key(digest.hexdigest()), packages)
+    return packages
@@ -0,0 +1,156 @@
+"""Remove many packages from a prefix without an ``UnlinkLinkTransaction``.
+
+A transaction unlinks the files of every package one action at a time, which
+is slow for tens of thousands of files on network storage. :func:`fast_remove`
+plans the removal from the ``files`` of the :class:`PrefixRecord` objects
+instead, grouped by directory, and deletes each directory's files as one task
+on a bounded thread pool. Directories left empty are pruned in a single
+bottom-up pass. Then, as a transaction would, the ``conda-meta`` records are
+removed and the change is written to ``conda-meta/history``.
+
+Packages with unlink scripts or menus are left to a transaction, see
+:func:`needs_transaction`.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from conda.models.records import PrefixRecord
+
+#: Files whose removal needs more than an unlink: pre/post-unlink scripts run
+#: by the transaction, and menu shortcuts removed by menuinst.
+_TRANSACTION_FILES = re.compile(
+    r"^((bin|Scripts)/\.[^/]+-(pre|post)-unlink\.(sh|bat)|Menu/[^/]+\.json)$"
+)
+
+
+class RemovalPlan(NamedTuple):
+    """Files to delete, grouped by directory, and directories to prune."""
+
+    #: Directory, relative to the prefix, and the names of its files to delete.
+    files: dict[str, list[str]]
+    #: Directories that may be left empty, deepest first.
+    directories: tuple[str, ...]
+
+    @property
+    def file_count(self) -> int:
+        return sum(len(names) for names in self.files.values())
+
+
+def needs_transaction(record: PrefixRecord) -> bool:
+    """Whether removing ``record`` runs scripts or removes menus."""
+    return any(_TRANSACTION_FILES.match(path) for path in record.files)
+
+
+def plan_removal(
+    records: Iterable[PrefixRecord], keep: Iterable[PrefixRecord] = ()
+) -> RemovalPlan:
+    """Plan the removal of the files of ``records``.
+
+    Files that also belong to one of ``keep`` (e.g. clobbered files) stay.
+    """
+    kept = {path for record in keep for path in record.files}
+    files: dict[str, list[str]] = {}
+    for record in records:
+        for path in record.files:
+            if path in kept:
+                continue
+            directory, _, name = path.rpartition("/")
+            files.setdefault(directory, []).append(name)
+
+    directories = set()
+    for directory in files:
+        while directory and directory not in directories:
+            directories.add(directory)
+            directory = directory.rpartition("/")[0]
+    return RemovalPlan(
+        files,
+        tuple(sorted(directories, key=lambda d: (-d.count("/"), d))),
+    )
+
+
+def _remove_directory_files(prefix: str, directory: str, names: list[str]) -> int:
+    from conda.gateways.disk.delete import rm_rf
+
+    removed = 0
+    parent = os.path.join(prefix, directory)
+    for name in names:
+        path = os.path.join(parent, name)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            continue
+        except OSError:
+            # a directory, or a read-only file on Windows
+            rm_rf(path)
+        removed += 1
+    return removed
+
+
+def remove_files(
+    prefix: str | Path, plan: RemovalPlan, max_workers: int | None = None
+) -> int:
+    """Delete the files of ``plan``, one task per directory. Returns the count."""
+    prefix = str(prefix)
+    if max_workers == 1 or len(plan.files) <= 1:
+        return sum(
+            _remove_directory_files(prefix, directory, names)
+            for directory, names in plan.files.items()
+        )
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(
+            executor.map(
+                _remove_directory_files,
+                [prefix] * len(plan.files),
+                plan.files.keys(),
+                plan.files.values(),
+            )
+        )
+
+
+def prune_directories(prefix: str | Path, plan: RemovalPlan) -> None:
+    """Remove the directories of ``plan`` that are left empty, deepest first."""
+    for directory in plan.directories:
+        if directory == "conda-meta":
+            continue
+        try:
+            os.rmdir(os.path.join(prefix, directory))
+        except OSError:
+            pass  # not empty (e.g. files created at runtime), or already gone
+
+
+def fast_remove(
+    prefix: str | Path,
+    records: Iterable[PrefixRecord],
+    keep: Iterable[PrefixRecord] = (),
+    max_workers: int | None = None,
+) -> RemovalPlan:
+    """Remove ``records`` from ``prefix``, keeping the files of ``keep``.
+
+    ``records`` must not need a transaction (see :func:`needs_transaction`).
+    """
+    from conda.history import History
+
+    from .prefix_index import invalidate_prefix_index, prefix_index
+
+    records = list(records)
+    plan = plan_removal(records, keep)
+    prefix_data = prefix_index(prefix).prefix_data
+    try:
+        remove_files(prefix, plan, max_workers)
+        for record in records:
+            prefix_data.remove(record.name)
+        prune_directories(prefix, plan)
+    finally:
+        invalidate_prefix_index(prefix)
+    # diffs the state recorded in history against conda-meta, read afresh
+    History(str(prefix)).update()
+    return plan
@@ -12,6 +12,8 @@ from typing import TYPE_CHECKING
 from conda.base.constants import OK_MARK, PREFIX_FROZEN_FILE, X_MARK
 from conda.core.prefix_data import PrefixData
 
+from ..prefix_index import prefix_index
+
 if TYPE_CHECKING:
     from argparse import Namespace
 
@@ -25,8 +27,7 @@ def is_base_environment(prefix: str) -> bool:
 
 def is_base_protected() -> bool:
     """Check if the base environment is protected (frozen)."""
-    frozen_file = PrefixData(sys.prefix).prefix_path / PREFIX_FROZEN_FILE
-    return frozen_file.exists()
+    return prefix_index(sys.prefix).is_frozen
 
 
 def check(prefix: str, _verbose: bool) -> None:
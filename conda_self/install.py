@@ -1,19 +1,263 @@
+from __future__ import annotations
+
+import os
 import sys
-from subprocess import run
+from subprocess import Popen
+from typing import TYPE_CHECKING
 
 from conda.base.context import context
+from conda.common.compat import on_win
 
+from .constants import (
+    ISOLATED_PACKAGES,
+    PLUGINS_ONLY_ENV_VAR,
+    SELF_IN_PROCESS_SETTING,
+)
+from .prefix_index import invalidate_prefix_index, prefix_index
 
-def install_specs_in_protected_env(
-    specs: list[str],
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, Sequence
+
+    from conda.core.link import UnlinkLinkTransaction
+    from conda.models.records import PackageCacheRecord, PrefixRecord
+
+    from .progress import ProgressCallback
+
+
+def in_process_enabled(specs: list[str], json: bool = False) -> bool:
+    """Whether ``specs`` can be handled without a ``conda`` subprocess.
+
+    Requires the ``self_in_process`` setting. Windows (files in use cannot be
+    replaced), ``--json`` output (left to conda itself) and specs naming one of
+    :data:`~.constants.ISOLATED_PACKAGES` always go through a subprocess.
+    """
+    from conda.models.match_spec import MatchSpec
+
+    if not getattr(context.plugins, SELF_IN_PROCESS_SETTING, False):
+        return False
+    if on_win or json:
+        return False
+    return not any(MatchSpec(spec).name in ISOLATED_PACKAGES for spec in specs)
+
+
+def touches_isolated_packages(txn: UnlinkLinkTransaction) -> bool:
+    """Whether ``txn`` links or unlinks one of :data:`~.constants.ISOLATED_PACKAGES`."""
+    return any(
+        record.name in ISOLATED_PACKAGES
+        for setup in txn.prefix_setups.values()
+        for record in (*setup.unlink_precs, *setup.link_precs)
+    )
+
+
+def solve_in_protected_env(
+    specs_to_add: Sequence[str] = (),
+    specs_to_remove: Sequence[str] = (),
+    update_dependencies: bool = False,
+    force_reinstall: bool = False,
+) -> UnlinkLinkTransaction:
+    """Solve, in-process, one transaction on the protected base env."""
+    from conda.base.constants import UpdateModifier
+    from conda.models.channel import Channel
+    from conda.models.match_spec import MatchSpec
+
+    solver_backend = context.plugin_manager.get_cached_solver_backend(context.solver)
+    solver = solver_backend(
+        sys.prefix,
+        [Channel(channel) for channel in context.channels],
+        context.subdirs,
+        specs_to_add=[MatchSpec(spec) for spec in specs_to_add],
+        specs_to_remove=[MatchSpec(spec) for spec in specs_to_remove],
+    )
+    if specs_to_remove and not specs_to_add:
+        return solver.solve_for_transaction()
+    return solver.solve_for_transaction(
+        update_modifier=(
+            UpdateModifier.UPDATE_ALL
+            if update_dependencies
+            else UpdateModifier.UPDATE_SPECS
+        ),
+        force_reinstall=force_reinstall,
+    )
+
+
+def extracted_records(
+    txn: UnlinkLinkTransaction, names: Iterable[str]
+) -> list[PackageCacheRecord]:
+    """Package cache records of the packages named ``names`` that ``txn`` links.
+
+    Only valid once the transaction has been downloaded and extracted.
+    """
+    from conda.core.package_cache_data import PackageCacheData
+
+    names = set(names)
+    return [
+        PackageCacheData.get_entry_to_link(record)
+        for setup in txn.prefix_setups.values()
+        for record in setup.link_precs
+        if record.name in names
+    ]
+
+
+def execute_in_protected_env(
+    txn: UnlinkLinkTransaction,
+    dry_run: bool = False,
+    yes: bool = False,
+    validate: Callable[[UnlinkLinkTransaction], None] | None = None,
+    download_only: bool = False,
+) -> int:
+    """Run a transaction solved by :func:`solve_in_protected_env`.
+
+    Like ``conda install/remove --override-frozen``: conda only enforces the
+    frozen marker in its CLI, which is bypassed here. ``validate`` is called
+    once the packages are extracted, before anything is linked; raising from
+    it leaves base untouched. With ``download_only``, like ``--download-only``,
+    stop there, without asking for confirmation as base is not changed.
+    """
+    from conda.reporters import confirm_yn
+
+    if not context.quiet:
+        txn.print_transaction_summary()
+    if dry_run:
+        return 0
+    if not (yes or download_only):
+        confirm_yn()
+
+    txn.download_and_extract()
+    if validate is not None:
+        validate(txn)
+    if download_only:
+        return 0
+    try:
+        txn.execute()
+    finally:
+        invalidate_prefix_index(sys.prefix)
+    return 0
+
+
+def _run(
+    cmd: list[str],
+    json: bool = False,
+    dry_run: bool = False,
+    progress: ProgressCallback | None = None,
+    low_priority: bool = False,
+    env: Mapping[str, str] | None = None,
+) -> int:
+    """Run a child ``conda`` command and measure the resources it uses.
+
+    With ``progress``, the output of the child is parsed, see
+    :func:`~.progress.run_with_progress`; otherwise it is left alone, ``--json``
+    output included. The measurements go to the metrics log, see :mod:`.usage`,
+    and to the ``finished`` progress event. With ``low_priority``,
+    the child runs at a lower scheduling priority. ``env`` holds additional
+    environment variables of the child.
+    """
+    from .usage import UsageMeter, log_usage, lower_priority
+
+    meter = UsageMeter()
+    if progress is not None:
+        from .progress import run_with_progress
+
+        if "--json" not in cmd:
+            cmd = [*cmd, "--json"]
+        returncode = run_with_progress(
+            cmd,
+            progress,
+            dry_run=dry_run,
+            json=json,
+            meter=meter,
+            low_priority=low_priority,
+            env=env,
+        )
+    else:
+        process = Popen(cmd, env={**os.environ, **env} if env else None)
+        if low_priority:
+            lower_priority(process.pid)
+        returncode = meter.wait(process)
+    if meter.usage is not None:
+        log_usage(cmd, returncode, meter.usage)
+    return returncode
+
+
+def _installed_records(names: Iterable[str]) -> list[PrefixRecord]:
+    index = prefix_index(sys.prefix)
+    return [record for name in names if (record := index.get(name))]
+
+
+def validate_plugins(txn: UnlinkLinkTransaction, names: Sequence[str]) -> None:
+    """Check that ``names`` are conda plugins, before ``txn`` is linked.
+
+    Packages linked by ``txn`` are inspected in the package cache, the others
+    in base, where they are already installed.
+    """
+    from .validate import validate_plugin_records
+
+    records: list[PrefixRecord | PackageCacheRecord] = []
+    records.extend(extracted_records(txn, names))
+    linked = {record.name for record in records}
+    records.extend(_installed_records(n for n in names if n not in linked))
+    validate_plugin_records(records)
+
+
+def _solve_and_execute(
+    specs_to_add: Sequence[str] = (),
+    specs_to_remove: Sequence[str] = (),
+    update_dependencies: bool = False,
+    force_reinstall: bool = False,
+    dry_run: bool = False,
+    yes: bool = False,
+    plugins: Sequence[str] = (),
+    download_only: bool = False,
+) -> int | None:
+    """Solve and run a transaction on the protected base env in-process.
+
+    The packages named in ``plugins`` are checked to be conda plugins before
+    anything is linked. Returns ``None``, without changing anything, if the
+    solution links or unlinks an isolated package, unless ``download_only``.
+    """
+    from conda.exceptions import PackagesNotFoundError
+
+    from .validate import validate_plugin_records
+
+    txn = solve_in_protected_env(
+        specs_to_add, specs_to_remove, update_dependencies, force_reinstall
+    )
+    if txn.nothing_to_do:
+        if specs_to_remove:
+            raise PackagesNotFoundError(list(specs_to_remove))
+        validate_plugin_records(_installed_records(plugins))
+        if not context.quiet:
+            print("\n# All requested packages already installed.\n")
+        return 0
+    if not download_only and touches_isolated_packages(txn):
+        return None
+    return execute_in_protected_env(
+        txn,
+        dry_run=dry_run,
+        yes=yes,
+        validate=(lambda txn: validate_plugins(txn, plugins)) if plugins else None,
+        download_only=download_only,
+    )
+
+
+def install_subprocess(
+    specs: Sequence[str],
     force_reinstall: bool = False,
     update_dependencies: bool = False,
     dry_run: bool = False,
     json: bool = False,
     yes: bool = False,
+    plugins: Sequence[str] = (),
+    progress: ProgressCallback | None = None,
+    download_only: bool = False,
+    low_priority: bool = False,
 ) -> int:
-    """Install or update specs into the protected base env via subprocess."""
-    process = run(
+    """Install or update specs into the protected base env with ``conda install``.
+
+    The packages named in ``plugins`` are checked to be conda plugins by the
+    child, once extracted and before anything is linked, see
+    :class:`~.validate.PluginCheckAction`.
+    """
+    returncode = _run(
         [
             sys.executable,
             "-m",
@@ -27,20 +271,30 @@ def install_specs_in_protected_env(
             ),
             *(("--force-reinstall",) if force_reinstall else ()),
             *(("--dry-run",) if dry_run else ()),
+            *(("--download-only",) if download_only else ()),
             *(("--json",) if json else ()),
-            *(("--yes",) if yes else ()),
+            *(("--yes",) if yes or download_only else ()),
             "--all" if update_dependencies else "--update-specs",
             *specs,
-        ]
+        ],
+        json=json,
+        dry_run=dry_run,
+        progress=progress,
+        low_priority=low_priority,
+        env={PLUGINS_ONLY_ENV_VAR: ",".join(plugins)} if plugins else None,
     )
-    return process.returncode
+    invalidate_prefix_index(sys.prefix)
+    return returncode
 
 
-def uninstall_specs_in_protected_env(
-    specs: list[str],
+def remove_subprocess(
+    specs: Sequence[str],
+    dry_run: bool = False,
     json: bool = False,
     yes: bool = True,
+    progress: ProgressCallback | None = None,
 ) -> int:
+    """Remove specs from the protected base env with ``conda remove``."""
     cmd = [
         sys.executable,
         "-m",
@@ -48,9 +302,91 @@ def uninstall_specs_in_protected_env(
         "remove",
         f"--prefix={sys.prefix}",
         *(("--override-frozen",) if hasattr(context, "protect_frozen_envs") else ()),
+        *(("--dry-run",) if dry_run else ()),
         *(("--json",) if json else ()),
         *(("--yes",) if yes else ()),
         *specs,
     ]
-    process = run(cmd)
-    return process.returncode
+    returncode = _run(cmd, json=json, dry_run=dry_run, progress=progress)
+    invalidate_prefix_index(sys.prefix)
+    return returncode
+
+
+def install_specs_in_protected_env(
+    specs: list[str],
+    force_reinstall: bool = False,
+    update_dependencies: bool = False,
+    dry_run: bool = False,
+    json: bool = False,
+    yes: bool = False,
+    plugins_only: bool = False,
+    progress: ProgressCallback | None = None,
+    download_only: bool = False,
+    low_priority: bool = False,
+) -> int:
+    """Install or update specs into the protected base env.
+
+    Runs in-process if :func:`in_process_enabled`, via subprocess otherwise.
+    With ``progress``, always via a ``conda --json`` subprocess, whose progress
+    events are passed to ``progress`` (see :mod:`.progress`).
+    With ``download_only``, only solve and fill the package cache, without
+    confirmation: a later install then only has to verify and link. As nothing
+    is linked, this runs in-process even for conda itself. ``low_priority``
+    runs a subprocess at a lower scheduling priority.
+    With ``plugins_only``, every package of ``specs`` is checked to be a conda
+    plugin before anything is linked: in-process,
+    :class:`~.exceptions.NotAPluginError` is raised; a subprocess fails with
+    that error instead.
+    """
+    from conda.models.match_spec import MatchSpec
+
+    names = [MatchSpec(spec).name for spec in specs] if plugins_only else []
+    # nothing is linked when downloading only: isolated packages are fine
+    in_process = in_process_enabled(
+        [] if download_only else specs, json or progress is not None
+    )
+    if in_process and not low_priority:
+        returncode = _solve_and_execute(
+            specs_to_add=specs,
+            update_dependencies=update_dependencies,
+            force_reinstall=force_reinstall,
+            dry_run=dry_run,
+            yes=yes,
+            plugins=names,
+            download_only=download_only,
+        )
+        if returncode is not None:
+            return returncode
+
+    return install_subprocess(
+        specs,
+        force_reinstall=force_reinstall,
+        update_dependencies=update_dependencies,
+        dry_run=dry_run,
+        json=json,
+        yes=yes,
+        plugins=names,
+        progress=progress,
+        download_only=download_only,
+        low_priority=low_priority,
+    )
+
+
+def uninstall_specs_in_protected_env(
+    specs: list[str],
+    json: bool = False,
+    yes: bool = True,
+    progress: ProgressCallback | None = None,
+) -> int:
+    """Remove specs from the protected base env.
+
+    Runs in-process if :func:`in_process_enabled`, via subprocess otherwise.
+    With ``progress``, always via a ``conda --json`` subprocess, see
+    :func:`install_specs_in_protected_env`.
+    """
+    if in_process_enabled(specs, json or progress is not None):
+        returncode = _solve_and_execute(specs_to_remove=specs, yes=yes)
+        if returncode is not None:
+            return returncode
+
+    return remove_subprocess(specs, json=json, yes=yes, progress=progress)
@@ -0,0 +1,171 @@
+"""Resolve CEP-23 ``@EXPLICIT`` specs from the local package caches.
+
+:func:`conda.misc.get_package_records_from_explicit` hands every URL of an
+explicit file to ``ProgressiveFetchExtract``, which may go to the channels
+even when all the packages are already extracted in ``pkgs_dirs``.
+:func:`resolve_explicit` looks the packages up in a :class:`PackageCacheIndex`
+instead, checks their tarballs against the expected hashes on a thread pool,
+and only fetches the packages that are missing or do not match.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from conda.base.context import context
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from conda.models.records import PackageCacheRecord
+
+    from .explicit import ExplicitPackage
+
+
+def _hashes_agree(record: PackageCacheRecord, entry: ExplicitPackage) -> bool:
+    return all(
+        not expected or not (actual := record.get(key)) or actual == expected
+        for key, expected in (("md5", entry.md5), ("sha256", entry.sha256))
+    )
+
+
+class PackageCacheIndex:
+    """Extracted packages of the package caches, by URL, file name and hashes."""
+
+    def __init__(self, records: Iterable[PackageCacheRecord]):
+        self.by_url: dict[str, list[PackageCacheRecord]] = {}
+        self.by_filename: dict[str, list[PackageCacheRecord]] = {}
+        self.by_md5: dict[str, list[PackageCacheRecord]] = {}
+        self.by_sha256: dict[str, list[PackageCacheRecord]] = {}
+        for record in records:
+            for index, key in (
+                (self.by_url, record.get("url")),
+                (self.by_filename, record.fn),
+                (self.by_md5, record.get("md5")),
+                (self.by_sha256, record.get("sha256")),
+            ):
+                if key:
+                    index.setdefault(key, []).append(record)
+
+    @classmethod
+    def from_pkgs_dirs(cls, pkgs_dirs: Iterable[str] | None = None):
+        """Index the extracted packages of ``pkgs_dirs``, writable caches first.
+
+        Tarballs that are not extracted are left to ``ProgressiveFetchExtract``.
+        """
+        from conda.core.package_cache_data import PackageCacheData
+
+        if pkgs_dirs is None:
+            caches = PackageCacheData.all_caches_writable_first()
+        else:
+            caches = [PackageCacheData(pkgs_dir) for pkgs_dir in pkgs_dirs]
+        return cls(
+            record
+            for cache in caches
+            for record in cache.values()
+            if record.is_extracted
+        )
+
+    def lookup(self, entry: ExplicitPackage) -> PackageCacheRecord | None:
+        """The cached package of ``entry``, if any.
+
+        Packages from another URL are only accepted if ``entry`` has a hash,
+        that they match.
+        """
+        candidates = (
+            *self.by_url.get(entry.url, ()),
+            *self.by_sha256.get(entry.sha256 or "", ()),
+            *self.by_md5.get(entry.md5 or "", ()),
+            *self.by_filename.get(entry.filename, ()),
+        )
+        for record in candidates:
+            if record.fn != entry.filename or not _hashes_agree(record, entry):
+                continue
+            if record.get("url") == entry.url or entry.md5 or entry.sha256:
+                return record
+        return None
+
+
+def tarball_matches(record: PackageCacheRecord, entry: ExplicitPackage) -> bool:
+    """Whether the tarball of ``record`` has the hashes ``entry`` expects.
+
+    Without a hash in ``entry``, the tarball is checked against the md5 of
+    ``record``. Packages whose tarball was removed (``conda clean
+    --tarballs``) can only be checked through their repodata record.
+    """
+    path = record.package_tarball_full_path
+    if not os.path.isfile(path):
+        return _hashes_agree(record, entry)
+    expected = {"md5": entry.md5, "sha256": entry.sha256}
+    if not any(expected.values()):
+        expected["md5"] = record.get("md5")
+    digests = {key: hashlib.new(key) for key, value in expected.items() if value}
+    if not digests:
+        return True
+    with open(path, "rb") as fh:
+        while chunk := fh.read(1 << 20):
+            for digest in digests.values():
+                digest.update(chunk)
+    return all(digest.hexdigest() == expected[key] for key, digest in digests.items())
+
+
+def verify_tarballs(
+    pairs: Sequence[tuple[ExplicitPackage, PackageCacheRecord]],
+    max_workers: int | None = None,
+) -> list[bool]:
+    """Run :func:`tarball_matches` for many packages on a thread pool.
+
+    Hashing releases the GIL, so large tarballs are checked concurrently.
+    Results are returned in the order of ``pairs``.
+    """
+    if max_workers == 1 or len(pairs) <= 1:
+        return [tarball_matches(record, entry) for entry, record in pairs]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda pair: tarball_matches(pair[1], pair[0]), pairs))
+
+
+def resolve_explicit(
+    packages: Iterable[ExplicitPackage], index: PackageCacheIndex | None = None
+) -> list[PackageCacheRecord]:
+    """Package cache records of the packages of an explicit file, in order.
+
+    Packages are found in ``index`` (by default, of the configured package
+    caches) and verified before anything is fetched; only those that are
+    missing or fail verification go through ``ProgressiveFetchExtract``.
+    """
+    from conda.core.package_cache_data import (
+        PackageCacheData,
+        ProgressiveFetchExtract,
+    )
+    from conda.exceptions import DryRunExit, SpecNotFoundInPackageCache
+
+    entries = list(packages)
+    if context.dry_run:
+        raise DryRunExit()
+
+    if index is None:
+        index = PackageCacheIndex.from_pkgs_dirs()
+    records: list[PackageCacheRecord | None] = [index.lookup(e) for e in entries]
+    found = [
+        (i, (entry, record))
+        for i, (entry, record) in enumerate(zip(entries, records))
+        if record is not None
+    ]
+    verified = verify_tarballs([pair for _, pair in found])
+    for (i, _), ok in zip(found, verified):
+        if not ok:
+            records[i] = None
+
+    if missing := [i for i, record in enumerate(records) if record is None]:
+        specs = [entries[i].to_match_spec() for i in missing]
+        ProgressiveFetchExtract(specs).execute()
+        for i, spec in zip(missing, specs):
+            records[i] = next(PackageCacheData.query_all(spec), None)
+        if not_found := [str(entries[i].url) for i in missing if records[i] is None]:
+            raise SpecNotFoundInPackageCache(
+                f"Missing package cache records for: {', '.join(not_found)}"
+            )
+    return [record for record in records if record is not None]
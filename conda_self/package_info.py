@@ -3,58 +3,353 @@ from __future__ import annotations
 import configparser
 import json
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
 from conda.models.records import PrefixRecord
 
 from .exceptions import NoDistInfoDirFound
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import IO, Any
+
     from conda.models.records import PackageCacheRecord
 
 
-# This is required for reading entry point info from an extracted package
+# Kept for compatibility; entry points are now read with read_entry_points().
 # ref: https://packaging.python.org/en/latest/specifications/entry-points/#file-format
 class CaseSensitiveConfigParser(configparser.ConfigParser):
     optionxform = staticmethod(str)  # type: ignore
 
 
+def read_entry_points(
+    path: str | os.PathLike, group: str | None = None
+) -> dict[str, dict[str, str]]:
+    """Parse an ``entry_points.txt`` file without :mod:`configparser`.
+
+    Follows the entry points file format: ``[group]`` headers, ``name = value``
+    entries, and whole-line ``#``/``;`` comments; indented lines continue the
+    previous value, as with configparser. There is no interpolation.
+
+    With ``group``, only that group is returned (if present), and reading
+    stops as soon as its section ends. A missing file has no entry points.
+
+    ref: https://packaging.python.org/en/latest/specifications/entry-points/#file-format
+    """
+    entry_points: dict[str, dict[str, str]] = {}
+    try:
+        # binary mode: lines past the requested group are never even decoded
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return entry_points
+
+    section: dict[str, str] | None = None
+    name: str | None = None
+    key: str | None = None
+    with fh:
+        for raw in map(bytes.decode, fh):
+            line = raw.strip()
+            if not line or line[0] in "#;":
+                continue
+            if line[0] == "[" and line[-1] == "]":
+                if group is not None and name == group:
+                    break
+                name = line[1:-1]
+                key = None
+                if group is None or name == group:
+                    section = entry_points.setdefault(name, {})
+                else:
+                    section = None
+            elif section is None:
+                continue
+            elif raw[0] in " \t" and key is not None:
+                section[key] = f"{section[key]}\n{line}"
+            elif "=" in line:
+                key, _, value = line.partition("=")
+                key = key.strip()
+                section[key] = value.strip()
+    return entry_points
+
+
+#: How deep :func:`find_dist_info_dirs` walks when no known layout matches.
+DIST_INFO_SEARCH_DEPTH = 4
+
+
+def _site_packages_layouts(basedir: str) -> Iterator[str]:
+    """Directories of ``basedir`` where Python packages keep their dist-info.
+
+    That is the root itself (wheels), ``site-packages``, ``Lib/site-packages``
+    (Windows) and ``lib/pythonX.Y/site-packages``.
+    """
+    yield basedir
+    yield os.path.join(basedir, "site-packages")
+    yield os.path.join(basedir, "Lib", "site-packages")
+    try:
+        with os.scandir(os.path.join(basedir, "lib")) as entries:
+            pythons = [e.name for e in entries if e.name.startswith("python")]
+    except OSError:
+        return
+    for python in sorted(pythons):
+        yield os.path.join(basedir, "lib", python, "site-packages")
+
+
+def _dist_info_entries(directory: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(directory) as entries:
+            return [
+                entry
+                for entry in entries
+                if entry.name.endswith(".dist-info") and entry.is_dir()
+            ]
+    except OSError:
+        return []
+
+
+def find_dist_info_dirs(
+    basedir: str, max_depth: int | None = DIST_INFO_SEARCH_DEPTH
+) -> set[str]:
+    """Find ``*.dist-info`` directories in an extracted package, relative to it.
+
+    Only the known ``site-packages`` layouts are listed first. If none of them
+    has a dist-info directory, the tree is walked breadth-first as a last
+    resort, down to ``max_depth`` levels (``None`` walks the whole tree);
+    dist-info directories themselves are never descended into.
+    """
+    for directory in _site_packages_layouts(basedir):
+        if dist_infos := _dist_info_entries(directory):
+            return {os.path.relpath(entry.path, basedir) for entry in dist_infos}
+
+    found = set()
+    level = [basedir]
+    depth = 0
+    while level and (max_depth is None or depth <= max_depth):
+        next_level = []
+        for directory in level:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        if entry.name.endswith(".dist-info"):
+                            found.add(os.path.relpath(entry.path, basedir))
+                        else:
+                            next_level.append(entry.path)
+            except OSError:
+                continue
+        level = next_level
+        depth += 1
+    return found
+
+
+class _JSONStream:
+    """Incremental tokenizer over a JSON document read in chunks."""
+
+    _decoder = json.JSONDecoder()
+    _non_whitespace = re.compile(r"[^ \t\n\r]")
+    _separator = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+
+    def __init__(self, fh: IO[str], chunk_size: int):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        if self.pos > self.chunk_size:
+            # drop what was consumed so memory stays bounded by the chunk size
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+        chunk = self.fh.read(self.chunk_size)
+        self.buffer += chunk
+        self.eof = not chunk
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it ("" at the end)."""
+        while True:
+            match = self._non_whitespace.search(self.buffer, self.pos)
+            self.pos = match.start() if match else len(self.buffer)
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        if (char := self.peek()) == "" or char not in chars:
+            raise json.JSONDecodeError(f"Expecting {chars!r}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next JSON value, reading more data until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number (or literal) may continue in the next chunk
+            if end < len(self.buffer) or not self._fill():
+                self.pos = end
+                return value
+
+    def items(self) -> Iterator[Any]:
+        """Decode the items of an array, one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        decode = self._decoder.raw_decode
+        separator = self._separator
+        while True:
+            # fast path: item and separator are entirely within the buffer
+            try:
+                value, end = decode(self.buffer, self.pos)
+                match = separator.match(self.buffer, end)
+            except json.JSONDecodeError:
+                match = None
+            if match is not None and match.end() < len(self.buffer):
+                self.pos = match.end()
+                yield value
+                if match.group(1) == "]":
+                    return
+                continue
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+            self.peek()
+
+
+def iter_paths_json(
+    path: str | os.PathLike, chunk_size: int = 64 * 1024
+) -> Iterator[str]:
+    """Yield the ``_path`` of every entry of an ``info/paths.json`` file.
+
+    The file is read in chunks of ``chunk_size`` characters and entries are
+    decoded one at a time, so memory use does not grow with the size of the
+    manifest. Reading stops at the end of the ``paths`` array.
+    """
+    with open(path, encoding="utf-8") as fh:
+        stream = _JSONStream(fh, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "paths":
+                for entry in stream.items():
+                    yield entry["_path"]
+                return
+            stream.value()
+            if stream.expect(",}") == "}":
+                return
+
+
+def read_paths_data(path: str | os.PathLike) -> list[dict] | None:
+    """The ``paths_data`` entries of a ``paths.json`` or ``conda-meta`` file.
+
+    Read from the JSON document as conda drops ``size_in_bytes`` when it
+    loads a :class:`PrefixRecord`.
+    """
+    try:
+        with open(path) as fh:
+            document = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    paths = document.get("paths_data", document).get("paths")
+    return paths if isinstance(paths, list) else None
+
+
+class RecordScan(NamedTuple):
+    """Outcome of inspecting the dist-info directories of one record."""
+
+    record: PrefixRecord | PackageCacheRecord
+    package_infos: list[PackageInfo]
+    #: Entry points of all the record's dist-info directories, merged by group.
+    entry_points: dict[str, dict[str, str]]
+    #: Set when the record could not be inspected, e.g. :class:`NoDistInfoDirFound`.
+    error: Exception | None = None
+
+
+@lru_cache(maxsize=1024)
+def _cached_entry_points(
+    path: str, mtime_ns: int, size: int, group: str | None
+) -> dict[str, dict[str, str]]:
+    return read_entry_points(path, group)
+
+
+def _entry_points(path: Path, group: str | None = None) -> dict[str, dict[str, str]]:
+    """:func:`read_entry_points`, memoized per process by path, mtime and size."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    entry_points = _cached_entry_points(
+        str(path), stat.st_mtime_ns, stat.st_size, group
+    )
+    # the cached dicts are shared, hand out copies
+    return {name: dict(items) for name, items in entry_points.items()}
+
+
 class PackageInfo:
+    __slots__ = ("dist_info_path", "_entry_points", "_groups")
+
     def __init__(self, dist_info_path: Path):
         """Describe the dist-info for a Python package installed as a conda package"""
         self.dist_info_path = dist_info_path
+        self._entry_points: dict[str, dict[str, str]] | None = None
+        self._groups: dict[str, dict[str, str] | None] = {}
 
     @classmethod
-    def read_manifest(cls, pkg_dir: str) -> list[str]:
-        """Read file paths from an extracted package directory.
+    def iter_manifest(cls, pkg_dir: str) -> Iterator[str]:
+        """Lazily yield file paths from an extracted package directory.
 
         Tries info/paths.json first (canonical per CEP), then falls back
-        to info/files (deprecated legacy format).
+        to info/files (deprecated legacy format). Both are streamed rather
+        than loaded whole.
         """
         pkg_path = Path(pkg_dir)
 
         paths_json = pkg_path / "info" / "paths.json"
         if paths_json.is_file():
-            data = json.loads(paths_json.read_text())
-            return [entry["_path"] for entry in data.get("paths", [])]
+            yield from iter_paths_json(paths_json)
+            return
 
         try:
-            return (pkg_path / "info" / "files").read_text().splitlines()
+            with open(pkg_path / "info" / "files", encoding="utf-8") as fh:
+                for line in fh:
+                    yield line.rstrip("\r\n")
         except FileNotFoundError:
-            return []
+            return
+
+    @classmethod
+    def read_manifest(cls, pkg_dir: str) -> list[str]:
+        """Read file paths from an extracted package directory.
+
+        See :meth:`iter_manifest`, which avoids building the list.
+        """
+        return list(cls.iter_manifest(pkg_dir))
 
     @classmethod
     def from_record(
         cls, record: PrefixRecord | PackageCacheRecord
     ) -> list[PackageInfo]:
-        had_manifest = True
-        if not (paths := getattr(record, "files", None)):
-            paths = cls.read_manifest(record.extracted_package_dir)
-            had_manifest = bool(paths)
+        paths: Iterable[str] | None = getattr(record, "files", None)
+        had_manifest = bool(paths)
+        if not paths:
+            paths = cls.iter_manifest(record.extracted_package_dir)
         dist_infos = set()
         for path in paths:
+            had_manifest = True
             if (maybe_dist_info := os.path.dirname(path)).endswith(".dist-info"):
                 dist_infos.add(maybe_dist_info)
         if isinstance(record, PrefixRecord):
@@ -66,10 +361,7 @@ class PackageInfo:
             # Last resort for package cache records: scan the extracted
             # directory for .dist-info (e.g. bare wheel with no conda metadata).
             # Not safe for PrefixRecord where basedir is the entire prefix.
-            basepath = Path(basedir)
-            for candidate in basepath.rglob("*.dist-info"):
-                if candidate.is_dir():
-                    dist_infos.add(str(candidate.relative_to(basepath)))
+            dist_infos.update(find_dist_info_dirs(basedir))
 
         if not dist_infos:
             raise NoDistInfoDirFound(record.name, basedir)
@@ -92,13 +384,95 @@ class PackageInfo:
                   expressed as a dict.
 
         ref: https://packaging.python.org/en/latest/specifications/entry-points/#file-format
+
+        The file is parsed once per instance (and once per process for a given
+        path and mtime).
         """
-        entry_point_file = self.dist_info_path / "entry_points.txt"
-        entry_points_config = CaseSensitiveConfigParser()
-        entry_points_config.read(entry_point_file)
+        if self._entry_points is None:
+            self._entry_points = _entry_points(self.dist_info_path / "entry_points.txt")
+        return self._entry_points
 
-        entry_points = {}
-        for section in entry_points_config.sections():
-            entry_points[section] = dict(entry_points_config[section])
+    def entry_point_group(self, group: str) -> dict[str, str] | None:
+        """Get the entry points of a single ``group``, or ``None`` if absent.
 
-        return entry_points
+        Cheaper than :meth:`entry_points`: the file is only read up to the end
+        of the group's section.
+        """
+        if self._entry_points is not None:
+            return self._entry_points.get(group)
+        if group not in self._groups:
+            path = self.dist_info_path / "entry_points.txt"
+            self._groups[group] = _entry_points(path, group).get(group)
+        return self._groups[group]
+
+    @classmethod
+    def scan_record(
+        cls, record: PrefixRecord | PackageCacheRecord, group: str | None = None
+    ) -> RecordScan:
+        """Find the dist-info directories of ``record`` and read their entry points.
+
+        With ``group``, only that entry point group is read. Failures are
+        reported in :attr:`RecordScan.error` instead of raised.
+        """
+        try:
+            package_infos = cls.from_record(record)
+            entry_points: dict[str, dict[str, str]] = {}
+            for package_info in package_infos:
+                if group is None:
+                    for name, items in package_info.entry_points().items():
+                        entry_points.setdefault(name, {}).update(items)
+                elif (selected := package_info.entry_point_group(group)) is not None:
+                    entry_points.setdefault(group, {}).update(selected)
+        except (NoDistInfoDirFound, OSError) as err:
+            return RecordScan(record, [], {}, err)
+        return RecordScan(record, package_infos, entry_points)
+
+    @classmethod
+    def scan_records(
+        cls,
+        records: Iterable[PrefixRecord | PackageCacheRecord],
+        max_workers: int | None = None,
+        group: str | None = None,
+    ) -> list[RecordScan]:
+        """Run :meth:`scan_record` for many records on a bounded thread pool.
+
+        Inspection is dominated by small file reads, which are slow on network
+        filesystems, so it parallelizes well despite the GIL. Results are
+        returned in the order of ``records``.
+        """
+        records = list(records)
+        if max_workers == 1 or len(records) <= 1:
+            return [cls.scan_record(record, group) for record in records]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(cls.scan_record, records, [group] * len(records)))
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[PrefixRecord | PackageCacheRecord],
+        max_workers: int | None = None,
+    ) -> dict[str, list[PackageInfo]]:
+        """Run :meth:`from_record` for many records on a bounded thread pool.
+
+        Returns the dist-info directories of every record keyed by record name;
+        records without any map to an empty list. Entry points are read lazily
+        (and memoized) by the returned instances.
+        """
+
+        def find(record: PrefixRecord | PackageCacheRecord) -> list[PackageInfo]:
+            try:
+                return cls.from_record(record)
+            except NoDistInfoDirFound:
+                return []
+
+        records = list(records)
+        if max_workers == 1 or len(records) <= 1:
+            found = [find(record) for record in records]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                found = list(executor.map(find, records))
+
+        package_infos: dict[str, list[PackageInfo]] = {}
+        for record, infos in zip(records, found):
+            package_infos.setdefault(record.name, []).extend(infos)
+        return package_infos
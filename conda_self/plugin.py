@@ -2,14 +2,30 @@
 
 from __future__ import annotations
 
+import os
 from typing import TYPE_CHECKING
 
 from conda.common.configuration import PrimitiveParameter, SequenceParameter
 from conda.plugins.hookspec import hookimpl
-from conda.plugins.types import CondaHealthCheck, CondaSetting, CondaSubcommand
+from conda.plugins.types import (
+    CondaHealthCheck,
+    CondaPostSolve,
+    CondaPostTransactionAction,
+    CondaPreSolve,
+    CondaPreTransactionAction,
+    CondaSetting,
+    CondaSubcommand,
+)
 
 from .cli import configure_parser, execute
-from .constants import PERMANENT_PACKAGES, SELF_PERMANENT_PACKAGES_SETTING
+from .constants import (
+    PERMANENT_PACKAGES,
+    PLUGINS_ONLY_ENV_VAR,
+    PROGRESS_ENV_VAR,
+    SELF_IN_PROCESS_SETTING,
+    SELF_METRICS_LOG_SETTING,
+    SELF_PERMANENT_PACKAGES_SETTING,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -52,3 +68,76 @@ def conda_settings() -> Iterable[CondaSetting]:
         ),
         parameter=SequenceParameter(PrimitiveParameter("", element_type=str)),
     )
+    yield CondaSetting(
+        name=SELF_IN_PROCESS_SETTING,
+        description=(
+            "Solve and run plugin installs and removals inside the running conda "
+            "process instead of a `conda install`/`conda remove` subprocess. "
+            "Transactions touching conda, conda-self or python, and --json "
+            "output, still use a subprocess."
+        ),
+        parameter=PrimitiveParameter(False, element_type=bool),
+    )
+    yield CondaSetting(
+        name=SELF_METRICS_LOG_SETTING,
+        description=(
+            "File to which the CPU time, peak memory, I/O and wall time of "
+            "every `conda` process run by conda-self are appended, one JSON "
+            "object per line."
+        ),
+        parameter=PrimitiveParameter("", element_type=str),
+    )
+
+
+# The hooks below only matter in a `conda` child of conda-self, which sets
+# their environment variable; any other conda command registers nothing.
+
+
+@hookimpl
+def conda_pre_solves() -> Iterable[CondaPreSolve]:
+    """Report progress to a `conda self` parent process, see :mod:`.progress`."""
+    if not os.environ.get(PROGRESS_ENV_VAR):
+        return
+    from .progress import report_solve_started
+
+    yield CondaPreSolve(name="conda-self-progress", action=report_solve_started)
+
+
+@hookimpl
+def conda_post_solves() -> Iterable[CondaPostSolve]:
+    """Report progress to a `conda self` parent process, see :mod:`.progress`."""
+    if not os.environ.get(PROGRESS_ENV_VAR):
+        return
+    from .progress import report_solve_finished
+
+    yield CondaPostSolve(name="conda-self-progress", action=report_solve_finished)
+
+
+@hookimpl
+def conda_pre_transaction_actions() -> Iterable[CondaPreTransactionAction]:
+    """Report progress to a `conda self` parent process, see :mod:`.progress`,
+    and check that the plugins it installs are plugins before linking them."""
+    if os.environ.get(PROGRESS_ENV_VAR):
+        from .progress import LinkStartedAction
+
+        yield CondaPreTransactionAction(
+            name="conda-self-progress", action=LinkStartedAction
+        )
+    if os.environ.get(PLUGINS_ONLY_ENV_VAR):
+        from .validate import PluginCheckAction
+
+        yield CondaPreTransactionAction(
+            name="conda-self-plugins-only", action=PluginCheckAction
+        )
+
+
+@hookimpl
+def conda_post_transaction_actions() -> Iterable[CondaPostTransactionAction]:
+    """Report progress to a `conda self` parent process, see :mod:`.progress`."""
+    if not os.environ.get(PROGRESS_ENV_VAR):
+        return
+    from .progress import LinkFinishedAction
+
+    yield CondaPostTransactionAction(
+        name="conda-self-progress", action=LinkFinishedAction
+    )
@@ -0,0 +1,188 @@
+"""Persistent indexes of the ``conda`` entry points installed in a prefix.
+
+Finding out which records are conda plugins means locating each record's
+``*.dist-info`` directories and parsing their ``entry_points.txt``. The
+outcome only depends on the record itself, so it is stored on disk (see
+:mod:`.cache`) keyed by name, build and checksum, and only records that are
+not in the index yet are inspected again.
+
+When only the Python distributions matter, :func:`site_packages_plugins`
+skips the records altogether and reads the ``entry_points.txt`` files of the
+``site-packages`` directories, rescanning a directory only when its mtime
+changes and parsing only the ``entry_points.txt`` files whose mtime or size
+changed.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .cache import (
+    cache_key,
+    cache_path,
+    read_cache,
+    site_packages_dirs,
+    write_cache,
+)
+from .constants import PLUGIN_INDEX_CACHE, SITE_PACKAGES_PLUGINS_CACHE
+from .package_info import PackageInfo
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from conda.models.records import PackageRecord, PrefixRecord
+
+    from .package_info import RecordScan
+
+#: Group under which conda plugins register their entry points.
+CONDA_ENTRY_POINT_GROUP = "conda"
+
+#: Metadata directories of the Python distributions in ``site-packages``.
+DIST_INFO_SUFFIXES = (".dist-info", ".egg-info")
+
+#: Version of the entries of the :data:`SITE_PACKAGES_PLUGINS_CACHE` index.
+SITE_PACKAGES_FORMAT = 2
+
+
+def record_key(record: PackageRecord) -> str:
+    """Identify the installed artifact behind ``record``.
+
+    Records installed with ``pip`` (interoperability) have no checksum; their
+    version stands in for it.
+    """
+    checksum = (
+        getattr(record, "sha256", None)
+        or getattr(record, "md5", None)
+        or record.version
+    )
+    return f"{record.name}/{record.build}/{checksum}"
+
+
+def index_entry(scan: RecordScan) -> dict:
+    """Index entry for a scanned record: dist-info presence and conda entry points."""
+    return {
+        "dist_info": bool(scan.package_infos),
+        "conda": scan.entry_points.get(CONDA_ENTRY_POINT_GROUP, {}),
+    }
+
+
+def update_index(
+    records: Iterable[PrefixRecord],
+    prefix: str | Path = sys.prefix,
+    max_workers: int | None = None,
+) -> dict[str, dict]:
+    """Return the index entries of ``records``, keyed by record name.
+
+    Entries already in the on-disk index of ``prefix`` are reused; the others
+    are inspected concurrently (see :meth:`.PackageInfo.scan_records`) and the
+    index is rewritten without entries of records that are no longer installed.
+    """
+    path = cache_path(prefix, PLUGIN_INDEX_CACHE)
+    key = cache_key(PLUGIN_INDEX_CACHE)
+    index: dict[str, dict] = read_cache(path, key) or {}
+
+    records = list(records)
+    missing = [record for record in records if record_key(record) not in index]
+    scanned = {
+        record_key(scan.record): index_entry(scan)
+        for scan in PackageInfo.scan_records(
+            missing, max_workers=max_workers, group=CONDA_ENTRY_POINT_GROUP
+        )
+    }
+
+    entries = {}
+    updated = {}
+    for record in records:
+        rkey = record_key(record)
+        entries[record.name] = updated[rkey] = index.get(rkey) or scanned[rkey]
+
+    if updated != index:
+        write_cache(path, key, updated)
+    return entries
+
+
+def conda_plugins(
+    records: Iterable[PrefixRecord], prefix: str | Path = sys.prefix
+) -> set[str]:
+    """Names of the ``records`` that register at least one ``conda`` entry point."""
+    return {
+        name for name, entry in update_index(records, prefix).items() if entry["conda"]
+    }
+
+
+def _dist_name(dist_info: str) -> str:
+    """Distribution name of a ``{name}-{version}.dist-info`` (or ``.egg-info``)."""
+    for suffix in DIST_INFO_SUFFIXES:
+        dist_info = dist_info.removesuffix(suffix)
+    return dist_info.partition("-")[0]
+
+
+def _entry_points_stat(dist_info: str) -> list[int] | None:
+    """``(mtime_ns, size)`` of the ``entry_points.txt`` of ``dist_info``."""
+    try:
+        stat = os.stat(os.path.join(dist_info, "entry_points.txt"))
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def scan_site_packages(directory: str | Path, previous: dict | None = None) -> dict:
+    """Index entry for a ``site-packages`` directory.
+
+    Maps every ``*.dist-info`` and ``*.egg-info`` directory to its ``conda``
+    entry points and the ``(mtime_ns, size)`` of its ``entry_points.txt``.
+    Entries of ``previous`` (an earlier entry for the same directory) are
+    reused only when that stat did not change, so a distribution reinstalled
+    with the same version is parsed again.
+    """
+    known = previous["dists"] if previous else {}
+    dists = {}
+    mtime_ns = os.stat(directory).st_mtime_ns
+    for entry in os.scandir(directory):
+        # egg-info may also be a single PKG-INFO file, without entry points
+        if not entry.name.endswith(DIST_INFO_SUFFIXES) or not entry.is_dir():
+            continue
+        stat = _entry_points_stat(entry.path)
+        cached = known.get(entry.name)
+        if cached is not None and cached["stat"] == stat:
+            dists[entry.name] = cached
+        else:
+            group = PackageInfo(Path(entry.path)).entry_point_group(
+                CONDA_ENTRY_POINT_GROUP
+            )
+            dists[entry.name] = {"stat": stat, "conda": group or {}}
+    return {"mtime_ns": mtime_ns, "dists": dists}
+
+
+def site_packages_plugins(prefix: str | Path = sys.prefix) -> dict[str, dict]:
+    """``conda`` entry points of the Python distributions installed in ``prefix``.
+
+    Keyed by distribution name; only distributions with at least one ``conda``
+    entry point are returned. Directories whose mtime did not change since the
+    last call (in any process) are not scanned again.
+    """
+    path = cache_path(prefix, SITE_PACKAGES_PLUGINS_CACHE)
+    key = cache_key(SITE_PACKAGES_PLUGINS_CACHE, SITE_PACKAGES_FORMAT)
+    index: dict[str, dict] = read_cache(path, key) or {}
+
+    updated = {}
+    for directory in map(str, site_packages_dirs(prefix)):
+        previous = index.get(directory)
+        with suppress(OSError):
+            if previous and previous["mtime_ns"] == os.stat(directory).st_mtime_ns:
+                updated[directory] = previous
+            else:
+                updated[directory] = scan_site_packages(directory, previous)
+
+    if updated != index:
+        write_cache(path, key, updated)
+    return {
+        _dist_name(dist_info): dist["conda"]
+        for entry in updated.values()
+        for dist_info, dist in entry["dists"].items()
+        if dist["conda"]
+    }
@@ -0,0 +1,92 @@
+"""Records installed in a prefix, loaded once per conda-self invocation.
+
+A single command used to read ``conda-meta`` several times: once per
+``PrefixData`` flavour (with and without interoperability), and again after
+every ``PrefixData._cache_`` reset. :func:`prefix_index` hands out one
+:class:`PrefixIndex` per prefix for the whole process; it reads ``conda-meta``
+through the same ``PrefixData`` instance conda itself uses (e.g. in
+``Environment.from_prefix``) and only adds the PyPI records on top when they
+are asked for. Anything that changes the prefix must call
+:func:`invalidate_prefix_index` afterwards.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from conda.base.constants import PREFIX_FROZEN_FILE
+from conda.base.context import context
+from conda.core.prefix_data import PrefixData
+
+if TYPE_CHECKING:
+    from conda.models.records import PrefixRecord
+
+
+class PrefixIndex:
+    """Lazily loaded, memoized records of ``prefix``."""
+
+    def __init__(self, prefix: str | Path):
+        self.prefix = Path(prefix)
+        self._records: dict[str, PrefixRecord] | None = None
+        self._interoperability_records: tuple[PrefixRecord, ...] | None = None
+
+    @property
+    def prefix_data(self) -> PrefixData:
+        """The (conda-meta only) ``PrefixData`` shared with conda."""
+        return PrefixData(self.prefix, interoperability=False)
+
+    @property
+    def is_frozen(self) -> bool:
+        """Whether the prefix is protected (frozen)."""
+        return (self.prefix / PREFIX_FROZEN_FILE).exists()
+
+    def _conda_records(self) -> dict[str, PrefixRecord]:
+        if self._records is None:
+            self._records = {
+                record.name: record for record in self.prefix_data.iter_records()
+            }
+        return self._records
+
+    def records(self, interoperability: bool = False) -> tuple[PrefixRecord, ...]:
+        """Installed records; with ``interoperability``, PyPI packages too.
+
+        ``conda-meta`` is read at most once in both cases: the PyPI records are
+        added by running conda's prefix data loaders on a copy of the conda
+        records, as ``PrefixData(..., interoperability=True)`` would.
+        """
+        if not interoperability:
+            return tuple(self._conda_records().values())
+        if self._interoperability_records is None:
+            records = dict(self._conda_records())
+            for loader in context.plugin_manager.get_prefix_data_loaders():
+                loader(self.prefix, records)
+            self._interoperability_records = tuple(records.values())
+        return self._interoperability_records
+
+    def get(self, name: str) -> PrefixRecord | None:
+        """The conda record named ``name``, if installed."""
+        return self._conda_records().get(name)
+
+    def invalidate(self) -> None:
+        """Forget the records of the prefix, ours and ``PrefixData``'s."""
+        self._records = self._interoperability_records = None
+        for interoperability in (False, True):
+            PrefixData._cache_.pop((self.prefix, interoperability), None)
+
+
+_session: dict[Path, PrefixIndex] = {}
+
+
+def prefix_index(prefix: str | Path | None = None) -> PrefixIndex:
+    """The :class:`PrefixIndex` of ``prefix`` (default: ``sys.prefix``)."""
+    path = Path(sys.prefix if prefix is None else prefix)
+    if path not in _session:
+        _session[path] = PrefixIndex(path)
+    return _session[path]
+
+
+def invalidate_prefix_index(prefix: str | Path | None = None) -> None:
+    """Drop the records of ``prefix`` (default: ``sys.prefix``) after a change."""
+    prefix_index(prefix).invalidate()
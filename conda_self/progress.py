@@ -0,0 +1,291 @@
+"""Progress events of the ``conda`` child process, as NDJSON.
+
+Given a progress callback, :func:`~.install.install_specs_in_protected_env` and
+:func:`~.install.uninstall_specs_in_protected_env` run the child ``conda`` with
+``--json`` and :data:`~.constants.PROGRESS_ENV_VAR` set (see
+:func:`run_with_progress`). In the child, conda-self's solve and transaction
+hooks then write markers (see :func:`report`) to stdout, framed like conda's
+own NUL-separated fetch records. The parent parses these records as they
+arrive and turns them into events (see :class:`EventStream`), each a mapping
+with an ``event`` name and a ``time`` stamp:
+
+- ``started``: the child was started, with its ``args``.
+- ``phase_started`` / ``phase_finished``: a ``phase``, one of ``solve``,
+  ``fetch`` (from the end of the solve to the start of linking: download,
+  extraction and verification) and ``link``. The end of the solve reports the
+  number of packages to ``link`` and ``unlink``.
+- ``fetch_progress``: a ``package`` being downloaded, and its ``progress``
+  between 0 and 1, when conda reports it.
+- ``fetched``: a ``package`` that was downloaded, its ``channel`` and
+  ``bytes``, read from the final document of the child.
+- ``finished``: the ``returncode`` of the child, ``success``, the total
+  ``bytes`` fetched, the ``resource_usage`` of the child (see :mod:`.usage`)
+  and, on failure, the name of the conda ``error``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from subprocess import PIPE, Popen
+from typing import TYPE_CHECKING
+
+from conda.core.path_actions import Action
+
+from .constants import PROGRESS_ENV_VAR
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping, Sequence
+    from typing import IO, Any
+
+    from conda.models.match_spec import MatchSpec
+    from conda.models.records import PackageRecord
+
+    from .usage import ResourceUsage, UsageMeter
+
+    ProgressCallback = Callable[[dict[str, Any]], None]
+
+#: Key of the markers written by the child, see :func:`report`.
+MARKER_KEY = "conda_self_progress"
+
+#: Phases of a child ``conda`` command, in order.
+PHASES = ("solve", "fetch", "link")
+
+
+def report(marker: str, **fields: Any) -> None:
+    """Write a progress marker to stdout, if run by :func:`run_with_progress`."""
+    if not os.environ.get(PROGRESS_ENV_VAR):
+        return
+    sys.stdout.write(json.dumps({MARKER_KEY: marker, **fields}) + "\n\0")
+    sys.stdout.flush()
+
+
+def report_solve_started(
+    specs_to_add: frozenset[MatchSpec], specs_to_remove: frozenset[MatchSpec]
+) -> None:
+    report("solve_started")
+
+
+def report_solve_finished(
+    repodata_fn: str,
+    unlink_precs: tuple[PackageRecord, ...],
+    link_precs: tuple[PackageRecord, ...],
+) -> None:
+    report("solve_finished", link=len(link_precs), unlink=len(unlink_precs))
+
+
+class _MarkerAction(Action):
+    marker = ""
+
+    def verify(self) -> None:
+        self._verified = True
+
+    def execute(self) -> None:
+        report(self.marker)
+
+    def reverse(self) -> None:
+        pass
+
+    def cleanup(self) -> None:
+        pass
+
+
+class LinkStartedAction(_MarkerAction):
+    marker = "link_started"
+
+
+class LinkFinishedAction(_MarkerAction):
+    marker = "link_finished"
+
+
+def iter_frames(stream: IO[bytes]) -> Iterator[bytes]:
+    """Split the output of ``conda --json`` in its records as they arrive.
+
+    Each record is yielded as written, with its terminating NUL; the final
+    document, which is not followed by one, is yielded once the stream ends.
+    """
+    buffer = b""
+    while chunk := stream.read1(1 << 16):  # type: ignore[attr-defined]
+        *frames, buffer = (buffer + chunk).split(b"\0")
+        for frame in frames:
+            yield frame + b"\0"
+    if buffer:
+        yield buffer
+
+
+def iter_records(stream: IO[bytes]) -> Iterator[dict[str, Any] | str]:
+    """Parse the NUL-separated JSON records of ``conda --json`` as they arrive.
+
+    Output that is not a JSON object is yielded as text.
+    """
+    for frame in iter_frames(stream):
+        yield from _parse_record(frame)
+
+
+def _parse_record(data: bytes) -> Iterator[dict[str, Any] | str]:
+    text = data.decode(errors="replace").strip("\0 \t\r\n")
+    if not text:
+        return
+    try:
+        record = json.loads(text)
+    except ValueError:
+        record = None
+    yield record if isinstance(record, dict) else text
+
+
+def _package(record: dict[str, Any]) -> str:
+    build = record.get("build") or record.get("build_string") or ""
+    return "-".join(
+        part for part in (record.get("name"), record.get("version"), build) if part
+    )
+
+
+class EventStream:
+    """Turn the records of a child ``conda --json`` into progress events."""
+
+    def __init__(self, callback: ProgressCallback | None, dry_run: bool = False):
+        self.callback = callback
+        self.dry_run = dry_run
+        self.phase: str | None = None
+        #: JSON documents written by the child, other than progress records.
+        self.documents: list[dict[str, Any]] = []
+
+    def emit(self, event: str, **fields: Any) -> None:
+        if self.callback is not None:
+            self.callback({"event": event, "time": time.time(), **fields})
+
+    def _start(self, phase: str) -> None:
+        if self.phase == phase:
+            # e.g. conda retrying a solve with another repodata file
+            return
+        self._finish()
+        self.phase = phase
+        self.emit("phase_started", phase=phase)
+
+    def _finish(self, **fields: Any) -> None:
+        if self.phase is not None:
+            self.emit("phase_finished", phase=self.phase, **fields)
+            self.phase = None
+
+    def feed(self, record: dict[str, Any]) -> None:
+        marker = record.get(MARKER_KEY)
+        if marker == "solve_started":
+            self._start("solve")
+        elif marker == "solve_finished":
+            self._finish(link=record.get("link", 0), unlink=record.get("unlink", 0))
+            if record.get("link") and not self.dry_run:
+                self._start("fetch")
+        elif marker == "link_started":
+            self._start("link")
+        elif marker == "link_finished":
+            self._finish()
+        elif "fetch" in record:
+            self._start("fetch")
+            self.emit(
+                "fetch_progress",
+                # conda's description: "name-version | size | "
+                package=str(record["fetch"]).split("|")[0].strip(),
+                progress=record.get("progress", 0),
+            )
+        else:
+            self.documents.append(record)
+
+    def close(self, returncode: int, usage: ResourceUsage | None = None) -> None:
+        self._finish()
+        total = 0
+        if not self.dry_run:
+            for document in self.documents:
+                actions = document.get("actions")
+                if not isinstance(actions, dict):
+                    continue
+                for record in actions.get("FETCH") or ():
+                    size = record.get("size") or 0
+                    total += size
+                    self.emit(
+                        "fetched",
+                        package=_package(record),
+                        channel=record.get("channel"),
+                        bytes=size,
+                    )
+        fields: dict[str, Any] = {}
+        if usage is not None:
+            fields["resource_usage"] = usage._asdict()
+        if returncode:
+            errors = [d for d in self.documents if "exception_name" in d]
+            if errors:
+                fields["error"] = errors[-1]["exception_name"]
+        self.emit(
+            "finished",
+            returncode=returncode,
+            success=returncode == 0,
+            bytes=total,
+            **fields,
+        )
+
+
+def run_with_progress(
+    cmd: Sequence[str],
+    callback: ProgressCallback | None = None,
+    dry_run: bool = False,
+    json: bool = False,
+    meter: UsageMeter | None = None,
+    low_priority: bool = False,
+    env: Mapping[str, str] | None = None,
+) -> int:
+    """Run ``cmd``, a ``conda --json`` command, passing its events to ``callback``.
+
+    With ``json``, the output of the child but conda-self's markers is passed
+    through to stdout byte for byte; otherwise only its error messages are
+    written, to stderr. The ``resource_usage`` measured by ``meter`` goes to
+    the ``finished`` event. With ``low_priority``, the child runs at a lower
+    scheduling priority. ``env`` holds additional environment variables of
+    the child.
+    """
+    events = EventStream(callback, dry_run=dry_run)
+    events.emit("started", args=list(cmd[3:]))
+    with Popen(
+        cmd, stdout=PIPE, env={**os.environ, **(env or {}), PROGRESS_ENV_VAR: "1"}
+    ) as process:
+        assert process.stdout is not None
+        if low_priority:
+            from .usage import lower_priority
+
+            lower_priority(process.pid)
+        for frame in iter_frames(process.stdout):
+            record = next(_parse_record(frame), None)
+            if isinstance(record, dict):
+                events.feed(record)
+                if MARKER_KEY in record:
+                    continue  # ours, not part of the output of conda
+            if json:
+                sys.stdout.flush()
+                sys.stdout.buffer.write(frame)
+                sys.stdout.buffer.flush()
+            elif isinstance(record, str):
+                # not ours, nor conda's JSON: pass it through
+                print(record)
+        returncode = process.wait() if meter is None else meter.wait(process)
+    events.close(returncode, meter.usage if meter is not None else None)
+
+    if not json and returncode:
+        for document in events.documents:
+            if message := document.get("message"):
+                print(message, file=sys.stderr)
+    return returncode
+
+
+def progress_writer(fd: int) -> ProgressCallback:
+    """A progress callback writing events as NDJSON to the file descriptor ``fd``."""
+    from conda.exceptions import CondaValueError
+
+    try:
+        stream = open(fd, "w", buffering=1, closefd=False)
+    except OSError as err:
+        raise CondaValueError(f"Invalid progress file descriptor {fd}: {err}")
+
+    def write(event: dict[str, Any]) -> None:
+        stream.write(json.dumps(event) + "\n")
+
+    return write
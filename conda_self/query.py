@@ -2,43 +2,167 @@
 
 from __future__ import annotations
 
+import re
 import sys
-from contextlib import suppress
+from typing import TYPE_CHECKING
 
 from conda.base.context import context
-from conda.core.prefix_data import PrefixData
-from conda.models.prefix_graph import PrefixGraph
 
-from .constants import PERMANENT_PACKAGES
-from .exceptions import NoDistInfoDirFound
-from .package_info import PackageInfo
+from .cache import (
+    cache_key,
+    cache_path,
+    conda_meta_fingerprint,
+    read_cache,
+    write_cache,
+)
+from .constants import PERMANENT_DEPENDENCIES_CACHE, PERMANENT_PACKAGES
+from .plugin_index import conda_plugins
+from .prefix_index import prefix_index
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from conda.models.prefix_graph import PrefixGraph
+    from conda.models.records import PackageRecord
+
+#: Leading package name of a ``depends`` entry, e.g. ``python`` in
+#: ``python >=3.10,<3.11.0a0`` or ``numpy`` in ``conda-forge::numpy[version=1]``.
+_DEPENDS_NAME = re.compile(r"^\s*(?:[^\s:]+::)?([^\s=<>!~\[,;]+)")
+
+
+def depends_name(spec: str) -> str | None:
+    """Return the bare package name of a ``depends`` entry, without MatchSpec."""
+    if match := _DEPENDS_NAME.match(spec):
+        return match.group(1)
+    return None
+
+
+class DependencyGraph:
+    """Name-level view of the dependency graph of a prefix.
+
+    Each package name is a node identified by its position in :attr:`names`;
+    :attr:`parents` holds, for every node, the indices of the nodes it depends
+    on. The name index is built once, so closure queries for any number of
+    roots cost a single traversal of the graph.
+    """
+
+    def __init__(self, names: Sequence[str], parents: Sequence[Sequence[int]]):
+        self.names = tuple(names)
+        self.parents = tuple(tuple(p) for p in parents)
+        self.index: dict[str, int] = {}
+        for i, name in enumerate(self.names):
+            self.index.setdefault(name, i)
+        self._children: tuple[tuple[int, ...], ...] | None = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[PackageRecord]) -> DependencyGraph:
+        """Build the graph in O(records + edges) from name-level edges.
+
+        ``depends`` entries are reduced to their package name and resolved
+        through a dict keyed by name; version and build constraints are
+        ignored, which is sufficient for a consistent prefix. Records sharing
+        a name (e.g. a conda record and its PyPI counterpart) become a single
+        node.
+        """
+        index: dict[str, int] = {}
+        depends: list[list[str]] = []
+        for record in records:
+            if (node := index.setdefault(record.name, len(depends))) == len(depends):
+                depends.append([])
+            depends[node].extend(record.depends)
+
+        parents = []
+        for node, specs in enumerate(depends):
+            edges = dict.fromkeys(
+                index[name]
+                for spec in specs
+                if (name := depends_name(spec)) in index and index[name] != node
+            )
+            parents.append(list(edges))
+        return cls(list(index), parents)
+
+    @classmethod
+    def from_prefix_graph(cls, prefix_graph: PrefixGraph) -> DependencyGraph:
+        records = list(prefix_graph.records)
+        position = {record: i for i, record in enumerate(records)}
+        return cls(
+            [record.name for record in records],
+            [
+                [position[parent] for parent in prefix_graph.graph[record]]
+                for record in records
+            ],
+        )
+
+    @property
+    def children(self) -> tuple[tuple[int, ...], ...]:
+        """Reverse adjacency: for every node, the nodes that depend on it."""
+        if self._children is None:
+            children: list[list[int]] = [[] for _ in self.names]
+            for node, parents in enumerate(self.parents):
+                for parent in parents:
+                    children[parent].append(node)
+            self._children = tuple(tuple(c) for c in children)
+        return self._children
+
+    def _walk(self, start: Iterable[int], edges: Sequence[Sequence[int]]) -> set[int]:
+        seen: set[int] = set()
+        stack = list(start)
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.extend(edge for edge in edges[node] if edge not in seen)
+        return seen
+
+    def closure(self, roots: Iterable[str]) -> set[str]:
+        """Names of ``roots`` plus everything they (transitively) depend on.
+
+        All roots share the same visited set, so subtrees common to several
+        roots (``python``, ``openssl``, ...) are only walked once. Roots that
+        are not installed are ignored.
+        """
+        start = [self.index[name] for name in roots if name in self.index]
+        return {self.names[node] for node in self._walk(start, self.parents)}
+
+    def required_by(self, name: str, roots: Iterable[str]) -> set[str]:
+        """Which of ``roots`` pull in ``name``, directly or transitively."""
+        if name not in self.index:
+            return set()
+        dependents = self._walk([self.index[name]], self.children)
+        return {
+            root
+            for root in roots
+            if root in self.index and self.index[root] in dependents
+        }
 
 
 def permanent_dependencies(add_plugins: bool = False) -> set[str]:
-    """Get the full list of dependencies for all the permanent packages."""
+    """Get the full list of dependencies for all the permanent packages.
+
+    The result is cached on disk (see :mod:`.cache`) and reused for as long as
+    the records installed in base, the ``self_permanent_packages`` setting and
+    ``add_plugins`` stay the same.
+    """
+    protect = [*PERMANENT_PACKAGES, *context.plugins.self_permanent_packages]
+
+    cache_file = cache_path(
+        sys.prefix,
+        PERMANENT_DEPENDENCIES_CACHE.format("-plugins" if add_plugins else ""),
+    )
+    key = cache_key(conda_meta_fingerprint(sys.prefix), protect, add_plugins)
+    if (cached := read_cache(cache_file, key)) is not None:
+        return set(cached)
+
     # In some dev environments, conda-self is installed as a PyPI package
     # and does not have its conda-meta/conda-self-*.json entry, which makes it
     # invisible to PrefixData()... unless we enable interoperability.
-    installed = list(PrefixData(sys.prefix, interoperability=True).iter_records())
-    prefix_graph = PrefixGraph(installed)
-
-    protect = [*PERMANENT_PACKAGES, *context.plugins.self_permanent_packages]
+    installed = prefix_index(sys.prefix).records(interoperability=True)
+    graph = DependencyGraph.from_records(installed)
 
     if add_plugins:
-        for record in installed:
-            with suppress(NoDistInfoDirFound):
-                if any(
-                    "conda" in pkg_info.entry_points()
-                    for pkg_info in PackageInfo.from_record(record)
-                ):
-                    protect.append(record.name)
-
-    packages = []
-    for pkg in protect:
-        node = next((rec for rec in prefix_graph.records if rec.name == pkg), None)
-        if node:
-            packages.append(node.name)
-            packages.extend(
-                [record.name for record in prefix_graph.all_ancestors(node)]
-            )
-    return set(packages)
+        protect.extend(sorted(conda_plugins(installed, sys.prefix)))
+
+    packages = graph.closure(protect)
+    write_cache(cache_file, key, sorted(packages))
+    return packages
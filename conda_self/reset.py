@@ -4,42 +4,46 @@ import sys
 from typing import TYPE_CHECKING
 
 from boltons.setutils import IndexedSet
-from conda.base.constants import EXPLICIT_MARKER
 from conda.base.context import context
 from conda.core.link import PrefixSetup, UnlinkLinkTransaction
-from conda.core.prefix_data import PrefixData
 from conda.core.solve import diff_for_unlink_link_precs
-from conda.gateways.disk.read import yield_lines
-from conda.misc import get_package_records_from_explicit
-from conda.models.match_spec import MatchSpec
+
+from .explicit import read_explicit
+from .package_cache import resolve_explicit
+from .prefix_index import invalidate_prefix_index, prefix_index
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from conda.models.records import PrefixRecord
+
 
 def names_from_explicit(path: Path) -> set[str]:
     """Extract package names from a CEP-23 ``@EXPLICIT`` file without fetching.
 
-    Parses each URL line with :class:`~conda.models.match_spec.MatchSpec`,
-    which reads ``name``/``version``/``build`` from the tarball filename and
-    strips any ``#md5=…``/``#sha256=…`` checksum fragment as a comment.  No
-    network access, unlike :func:`conda.misc.get_package_records_from_explicit`.
+    See :func:`~.explicit.read_explicit`. No network access, unlike
+    :func:`~.package_cache.resolve_explicit`, which fetches the packages
+    missing from the package caches.
     """
-    return {
-        MatchSpec(line).name for line in yield_lines(path) if line != EXPLICIT_MARKER
-    }
+    return {package.name for package in read_explicit(path)}
 
 
 def reset(
     prefix: str = sys.prefix,
     uninstallable_packages: set[str] = set(),
     snapshot: Path | None = None,
+    fast: bool = False,
 ):
+    """Reset ``prefix`` to ``snapshot``, or to ``uninstallable_packages`` only.
+
+    With ``fast``, and without ``snapshot``, packages are removed by
+    :func:`~.fast_remove.fast_remove`; those with unlink scripts or menus
+    still go through a transaction, first.
+    """
+    fast_removals: list[PrefixRecord] = []
     if snapshot:
-        snapshot_content = list(yield_lines(snapshot))
-        packages_in_reset_env = IndexedSet(
-            get_package_records_from_explicit(snapshot_content)
-        )
+        # resolved from the package caches: only missing packages are fetched
+        packages_in_reset_env = IndexedSet(resolve_explicit(read_explicit(snapshot)))
         packages_to_remove, packages_to_install = diff_for_unlink_link_precs(
             prefix, packages_in_reset_env
         )
@@ -50,22 +54,38 @@ def reset(
             )
             return
     else:
-        installed = sorted(PrefixData(prefix).iter_records(), key=lambda x: x.name)
-        packages_to_remove = tuple(
-            pkg for pkg in installed if pkg.name not in uninstallable_packages
-        )
+        installed = sorted(prefix_index(prefix).records(), key=lambda x: x.name)
+        to_remove = [pkg for pkg in installed if pkg.name not in uninstallable_packages]
+        if fast:
+            from .fast_remove import needs_transaction
+
+            fast_removals = [pkg for pkg in to_remove if not needs_transaction(pkg)]
+            to_remove = [pkg for pkg in to_remove if needs_transaction(pkg)]
+        packages_to_remove = tuple(to_remove)
         packages_to_install = ()
 
-    stp = PrefixSetup(
-        target_prefix=prefix,
-        unlink_precs=packages_to_remove,
-        link_precs=packages_to_install,
-        remove_specs=(),
-        update_specs=(),
-        neutered_specs=(),
-    )
-
-    txn = UnlinkLinkTransaction(stp)
-    if not context.json and not context.quiet:
-        txn.print_transaction_summary()
-    txn.execute()
+    if packages_to_remove or packages_to_install:
+        stp = PrefixSetup(
+            target_prefix=prefix,
+            unlink_precs=packages_to_remove,
+            link_precs=packages_to_install,
+            remove_specs=(),
+            update_specs=(),
+            neutered_specs=(),
+        )
+
+        txn = UnlinkLinkTransaction(stp)
+        if not context.json and not context.quiet:
+            txn.print_transaction_summary()
+        try:
+            txn.execute()
+        finally:
+            invalidate_prefix_index(prefix)
+
+    if fast_removals:
+        from .fast_remove import fast_remove
+
+        if not context.json and not context.quiet:
+            print(f"Removing {len(fast_removals)} packages...")
+        kept = [pkg for pkg in installed if pkg.name in uninstallable_packages]
+        fast_remove(prefix, fast_removals, keep=kept)
@@ -0,0 +1,215 @@
+"""Estimate the cost of ``conda self reset`` without running it.
+
+:func:`plan_reset` works out the packages :func:`~.reset.reset` would unlink
+and link, and what that costs, without solving, fetching or preparing an
+``UnlinkLinkTransaction``: file counts and sizes come from the ``paths_data``
+of the installed records and from ``info/paths.json`` of the extracted
+packages found in the :class:`~.package_cache.PackageCacheIndex`. Packages
+missing from the package caches are reported as downloads.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from conda.models.records import PackageCacheRecord, PrefixRecord
+
+    from .explicit import ExplicitPackage
+    from .package_cache import PackageCacheIndex
+
+
+class PackageCost(NamedTuple):
+    """A package to unlink or link, and the number and size of its files.
+
+    ``files`` and ``size`` are ``None`` when unknown, e.g. for packages that
+    are not in the package caches yet.
+    """
+
+    name: str
+    version: str
+    build: str
+    files: int | None = None
+    size: int | None = None
+    #: Where the package has to be downloaded from, if it is not cached.
+    url: str | None = None
+
+
+class ResetPlan(NamedTuple):
+    """The packages :func:`~.reset.reset` would unlink and link."""
+
+    prefix: str
+    unlink: list[PackageCost]
+    link: list[PackageCost]
+    #: How many of ``unlink`` are removed without a transaction (``--fast``).
+    fast_removals: int = 0
+
+    @property
+    def downloads(self) -> list[PackageCost]:
+        return [package for package in self.link if package.url]
+
+    def to_json(self) -> dict:
+        """The ``--json`` document of ``conda self reset --plan``."""
+
+        def group(packages: list[PackageCost], **extra) -> dict:
+            return {
+                "count": len(packages),
+                "files": sum(package.files or 0 for package in packages),
+                "bytes": sum(package.size or 0 for package in packages),
+                "unknown": sum(package.files is None for package in packages),
+                **extra,
+                "packages": [package._asdict() for package in packages],
+            }
+
+        return {
+            "prefix": self.prefix,
+            "unlink": group(self.unlink, fast=self.fast_removals),
+            "link": group(self.link),
+            "download": {
+                "count": len(self.downloads),
+                "urls": [package.url for package in self.downloads],
+            },
+            "transaction_required": len(self.unlink) > self.fast_removals
+            or bool(self.link),
+        }
+
+    def summary(self) -> str:
+        """A human summary of the plan."""
+        from conda.utils import human_bytes
+
+        def line(label: str, packages: list[PackageCost]) -> str:
+            files = sum(package.files or 0 for package in packages)
+            size = sum(package.size or 0 for package in packages)
+            text = (
+                f"  {label:<9} {len(packages):>5} packages, {files:>7} files, "
+                f"{human_bytes(size):>9}"
+            )
+            if unknown := sum(package.files is None for package in packages):
+                text += f" (+{unknown} of unknown size)"
+            return text
+
+        lines = [
+            f"Reset plan for {self.prefix}:",
+            line("Unlink:", self.unlink),
+            line("Link:", self.link),
+            f"  {'Download:':<9} {len(self.downloads):>5} packages",
+        ]
+        if self.fast_removals:
+            lines.append(
+                f"  {self.fast_removals} of the packages to unlink are removed "
+                "without a transaction."
+            )
+        if not self.unlink and not self.link:
+            lines.append("Nothing to do.")
+        return "\n".join(lines)
+
+
+def _size(paths: list[dict] | None) -> int | None:
+    if paths is None:
+        return None
+    return sum(path.get("size_in_bytes") or 0 for path in paths)
+
+
+def _lstat_size(path: str) -> int:
+    try:
+        return os.lstat(path).st_size
+    except OSError:
+        return 0
+
+
+def prefix_record_cost(prefix: str | Path, record: PrefixRecord) -> PackageCost:
+    """The files of an installed package, from its ``paths_data``.
+
+    Older packages have no ``size_in_bytes``; their files are measured on disk.
+    """
+    from .package_info import read_paths_data
+
+    filename = f"{record.name}-{record.version}-{record.build}.json"
+    paths = read_paths_data(os.path.join(prefix, "conda-meta", filename)) or []
+    sizes = {path["_path"]: path.get("size_in_bytes") for path in paths}
+    size = sum(
+        size
+        if (size := sizes.get(path)) is not None
+        else _lstat_size(os.path.join(prefix, path))
+        for path in record.files
+    )
+    return PackageCost(
+        record.name, record.version, record.build, len(record.files), size
+    )
+
+
+def cached_package_cost(
+    entry: ExplicitPackage, record: PackageCacheRecord | None
+) -> PackageCost:
+    """The files of an extracted package, from its ``info/paths.json``."""
+    from .package_info import read_paths_data
+
+    if record is None:
+        return PackageCost(entry.name, entry.version, entry.build, url=entry.url)
+    paths = read_paths_data(
+        os.path.join(record.extracted_package_dir, "info", "paths.json")
+    )
+    return PackageCost(
+        entry.name,
+        entry.version,
+        entry.build,
+        None if paths is None else len(paths),
+        _size(paths),
+    )
+
+
+def plan_reset(
+    prefix: str | Path = sys.prefix,
+    uninstallable_packages: set[str] = set(),
+    snapshot: Path | None = None,
+    fast: bool = False,
+    index: PackageCacheIndex | None = None,
+) -> ResetPlan:
+    """Plan :func:`~.reset.reset` with the same arguments.
+
+    Installed packages are the same as those of ``snapshot`` when their name,
+    version, build and subdir agree. ``index`` defaults to the package caches
+    of the context.
+    """
+    from .explicit import read_explicit
+    from .fast_remove import needs_transaction
+    from .package_cache import PackageCacheIndex
+    from .prefix_index import prefix_index
+
+    installed = sorted(prefix_index(prefix).records(), key=lambda x: x.name)
+    link: list[PackageCost] = []
+    if snapshot:
+        if index is None:
+            index = PackageCacheIndex.from_pkgs_dirs()
+        by_name = {record.name: record for record in installed}
+        unchanged: set[str] = set()
+        for entry in read_explicit(snapshot):
+            record = by_name.get(entry.name)
+            if record is not None and (
+                record.version,
+                record.build,
+                record.subdir,
+            ) == (entry.version, entry.build, entry.subdir):
+                unchanged.add(entry.name)
+            else:
+                link.append(cached_package_cost(entry, index.lookup(entry)))
+        to_remove = [record for record in installed if record.name not in unchanged]
+    else:
+        to_remove = [r for r in installed if r.name not in uninstallable_packages]
+
+    # like reset(), --fast only applies without a snapshot
+    fast_removals = (
+        sum(not needs_transaction(record) for record in to_remove)
+        if fast and not snapshot
+        else 0
+    )
+    return ResetPlan(
+        str(prefix),
+        [prefix_record_cost(prefix, record) for record in to_remove],
+        link,
+        fast_removals,
+    )
@@ -0,0 +1,449 @@
+"""Snapshots of a base environment as a tree of links.
+
+``conda self snapshot create`` records a prefix in a snapshot directory (see
+:func:`snapshot_path`) holding:
+
+- :data:`~.constants.SNAPSHOT_MANIFEST`, the snapshot format version,
+  creation time and the link method used for the files;
+- :data:`~.constants.SNAPSHOT_EXPLICIT`, the CEP-23 ``@EXPLICIT`` spec of the
+  prefix;
+- ``conda-meta``, copies of the package records and of the history;
+- :data:`~.constants.SNAPSHOT_FILES_DIR`, the files of the packages, as
+  reflinks (copy-on-write clones, Linux only), hardlinks or copies.
+
+Reflinks make a snapshot a metadata-only operation where the file system
+supports them; ``auto`` copies otherwise, duplicating the files of the
+prefix. Hardlinks are only used when asked for, as they share their content
+with the prefix: a file modified in place, rather than replaced as conda
+does, changes in the snapshot too.
+
+:func:`restore_snapshot` links back the files of the packages that changed
+since the snapshot and the missing files, compares the others by ``stat``
+(or, on request, by checksum) to relink those that differ, removes the files
+of packages installed since, and only then swaps the ``conda-meta`` records:
+there is no solve, download or extraction. When the packages that change have
+link or unlink scripts or menus, the snapshot is incomplete, or linking
+fails halfway, it falls back to :func:`~.reset.reset` with the explicit spec
+of the snapshot.
+"""
+
+from __future__ import annotations
+
+import errno
+import json
+import os
+import re
+import shutil
+import stat
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from conda.base.context import context
+
+from . import APP_VERSION
+from .cache import cache_path
+from .constants import (
+    DEFAULT_SNAPSHOT_NAME,
+    SNAPSHOT_DIR,
+    SNAPSHOT_EXPLICIT,
+    SNAPSHOT_FILES_DIR,
+    SNAPSHOT_FORMAT_VERSION,
+    SNAPSHOT_MANIFEST,
+)
+from .exceptions import SnapshotError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+    from typing import Any
+
+    from conda.models.records import PrefixRecord
+
+#: Ways to put the files of a snapshot in place.
+LINK_METHODS = ("reflink", "hardlink", "copy")
+
+#: The link methods ``auto`` tries, in order; hardlinks must be asked for.
+AUTO_LINK_METHODS = ("reflink", "copy")
+
+#: ``FICLONE`` ioctl of Linux, cloning a file on copy-on-write file systems.
+_FICLONE = 0x40049409
+
+#: Files whose linking needs more than a link: pre/post-link scripts run by
+#: the transaction, and menu shortcuts created by menuinst.
+_LINK_FILES = re.compile(
+    r"^((bin|Scripts)/\.[^/]+-(pre|post)-link\.(sh|bat)|Menu/[^/]+\.json)$"
+)
+
+
+class SnapshotRestore(NamedTuple):
+    """What :func:`restore_snapshot` did."""
+
+    #: Files linked back from the snapshot.
+    restored: int
+    #: Files of packages installed after the snapshot, removed.
+    removed: int
+    #: Why the snapshot was restored with a transaction instead, if it was.
+    fallback: str | None = None
+
+
+def snapshot_path(prefix: str | Path, name: str = DEFAULT_SNAPSHOT_NAME) -> Path:
+    """The directory of the snapshot ``name`` of ``prefix``."""
+    if not name or name in (".", "..") or os.sep in name or "/" in name:
+        raise SnapshotError(f"Invalid snapshot name: {name!r}.")
+    return cache_path(prefix, SNAPSHOT_DIR) / name
+
+
+def _record_filename(record: PrefixRecord) -> str:
+    """The name of the ``conda-meta`` file of ``record``."""
+    from conda.common.path import strip_pkg_extension
+
+    return f"{strip_pkg_extension(record.fn)[0]}.json"
+
+
+def _reflink(source: str, target: str) -> None:
+    """Clone ``source`` to ``target``, or raise ``OSError``."""
+    if sys.platform != "linux":
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are only supported on Linux")
+    import fcntl
+
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+    except OSError:
+        with suppress(FileNotFoundError):
+            os.unlink(target)
+        raise
+    shutil.copystat(source, target)
+
+
+def _link(source: str, target: str, method: str) -> None:
+    """Put ``source`` at ``target`` with ``method``; symlinks are recreated."""
+    if os.path.islink(source):
+        os.symlink(os.readlink(source), target)
+    elif method == "reflink":
+        _reflink(source, target)
+    elif method == "hardlink":
+        os.link(source, target)
+    else:
+        shutil.copy2(source, target)
+
+
+def _same_file(
+    source: str, target: str, method: str, sha256: str | None = None
+) -> bool:
+    """Whether ``target`` is still the file ``source`` was linked from.
+
+    Hardlinks are compared by inode; reflinks and copies by size, then by
+    ``sha256`` (the checksum recorded for the file) when it is known, or
+    else by modification time, which they keep from their source.
+    """
+    try:
+        src = os.lstat(source)
+        dst = os.lstat(target)
+    except OSError:
+        return False
+    if stat.S_ISLNK(src.st_mode) or stat.S_ISLNK(dst.st_mode):
+        return (
+            stat.S_ISLNK(src.st_mode)
+            and stat.S_ISLNK(dst.st_mode)
+            and os.readlink(source) == os.readlink(target)
+        )
+    if (src.st_dev, src.st_ino) == (dst.st_dev, dst.st_ino):
+        return True
+    if method == "hardlink" or src.st_size != dst.st_size:
+        return False
+    if sha256:
+        from conda.gateways.disk.read import compute_sum
+
+        try:
+            return compute_sum(target, "sha256") == sha256
+        except OSError:
+            return False
+    return src.st_mtime_ns == dst.st_mtime_ns
+
+
+def _link_directory_files(
+    source_root: str,
+    target_root: str,
+    directory: str,
+    names: list[str],
+    method: str,
+    checksums: Mapping[str, str],
+    compare: bool,
+) -> int:
+    os.makedirs(os.path.join(target_root, directory), exist_ok=True)
+    linked = 0
+    for name in names:
+        source = os.path.join(source_root, directory, name)
+        target = os.path.join(target_root, directory, name)
+        sha256 = checksums.get(f"{directory}/{name}" if directory else name)
+        if compare and _same_file(source, target, method, sha256):
+            continue
+        partial = f"{target}.conda-self-partial"
+        try:
+            _link(source, partial, method)
+        except FileNotFoundError:
+            continue  # missing from the source; checked by the caller if needed
+        os.replace(partial, target)
+        linked += 1
+    return linked
+
+
+def link_files(
+    source_root: str | Path,
+    target_root: str | Path,
+    paths: Iterable[str],
+    method: str,
+    max_workers: int | None = None,
+    checksums: Mapping[str, str] | None = None,
+    compare: bool = True,
+) -> int:
+    """Link ``paths`` of ``source_root`` to ``target_root``, one task per directory.
+
+    With ``compare``, files that are already the same (see :func:`_same_file`,
+    with their ``sha256`` from ``checksums``) are skipped. The others are
+    replaced atomically. Returns the number of files linked.
+    """
+    by_directory: dict[str, list[str]] = {}
+    for path in paths:
+        directory, _, name = path.rpartition("/")
+        by_directory.setdefault(directory, []).append(name)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(
+            executor.map(
+                _link_directory_files,
+                [str(source_root)] * len(by_directory),
+                [str(target_root)] * len(by_directory),
+                by_directory.keys(),
+                by_directory.values(),
+                [method] * len(by_directory),
+                [checksums or {}] * len(by_directory),
+                [compare] * len(by_directory),
+            )
+        )
+
+
+def probe_link_method(
+    prefix: str | Path, paths: Sequence[str], target_dir: Path, method: str = "auto"
+) -> str:
+    """The link method to use between ``prefix`` and ``target_dir``.
+
+    ``auto`` is the first of :data:`AUTO_LINK_METHODS` that works for the
+    first regular file of ``paths``.
+    """
+    if method != "auto":
+        return method
+    source = next(
+        (
+            path
+            for path in (os.path.join(prefix, p) for p in paths)
+            if os.path.isfile(path) and not os.path.islink(path)
+        ),
+        None,
+    )
+    if source is None:
+        return AUTO_LINK_METHODS[-1]
+    probe = str(target_dir / ".conda-self-probe")
+    for candidate in AUTO_LINK_METHODS:
+        try:
+            _link(source, probe, candidate)
+        except OSError:
+            continue
+        os.unlink(probe)
+        return candidate
+    raise SnapshotError(f"Can not reflink or copy files to {target_dir}.")
+
+
+def create_snapshot(
+    prefix: str | Path = sys.prefix,
+    name: str = DEFAULT_SNAPSHOT_NAME,
+    method: str = "auto",
+) -> dict[str, Any]:
+    """Record the packages of ``prefix`` in the snapshot ``name``.
+
+    An existing snapshot of the same name is only replaced once the new one
+    is complete. Returns the manifest of the snapshot.
+    """
+    from conda.gateways.disk.delete import rm_rf
+
+    from .bundle import explicit_lines
+    from .prefix_index import prefix_index
+
+    path = snapshot_path(prefix, name)
+    records = sorted(prefix_index(prefix).records(), key=lambda r: r.name)
+    partial = path.with_name(f"{name}.partial")
+    rm_rf(partial)
+    conda_meta = partial / "conda-meta"
+    conda_meta.mkdir(parents=True)
+    for filename in [*map(_record_filename, records), "history"]:
+        source = Path(prefix, "conda-meta", filename)
+        if source.exists():
+            shutil.copy2(source, conda_meta / filename)
+
+    files = sorted({path for record in records for path in record.files})
+    method = probe_link_method(prefix, files, partial, method)
+    linked = link_files(prefix, partial / SNAPSHOT_FILES_DIR, files, method)
+    (partial / SNAPSHOT_EXPLICIT).write_text(
+        "\n".join(explicit_lines([r for r in records if r.url], context.subdir)) + "\n"
+    )
+    manifest = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "platform": context.subdir,
+        "created": time.time(),
+        "created_by": APP_VERSION,
+        "method": method,
+        "packages": len(records),
+        "files": linked,
+    }
+    (partial / SNAPSHOT_MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+    old = path.with_name(f"{name}.old")
+    if path.exists():
+        rm_rf(old)
+        path.rename(old)
+    partial.rename(path)
+    rm_rf(old)
+    return manifest
+
+
+def read_snapshot(path: Path) -> tuple[dict[str, Any], list[PrefixRecord]]:
+    """The manifest and package records of the snapshot directory ``path``."""
+    from conda.models.records import PrefixRecord
+
+    try:
+        manifest = json.loads((path / SNAPSHOT_MANIFEST).read_text())
+    except FileNotFoundError:
+        raise SnapshotError(f"No snapshot found in {path}.")
+    except ValueError as err:
+        raise SnapshotError(f"Invalid snapshot manifest: {err}") from err
+    if manifest.get("version") != SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(
+            f"Unsupported snapshot format version {manifest.get('version')!r}."
+        )
+    if manifest.get("method") not in LINK_METHODS:
+        raise SnapshotError(f"Unknown link method {manifest.get('method')!r}.")
+    records = [
+        PrefixRecord(**json.loads(record.read_text()))
+        for record in sorted((path / "conda-meta").glob("*.json"))
+    ]
+    return manifest, records
+
+
+def _checksums(conda_meta: Path, filenames: Iterable[str]) -> dict[str, str]:
+    """``sha256`` of the files of the ``conda-meta`` records ``filenames``.
+
+    Files whose prefix placeholder is replaced at link time only have one
+    when conda recorded their ``sha256_in_prefix``.
+    """
+    from .package_info import read_paths_data
+
+    checksums = {}
+    for filename in filenames:
+        for entry in read_paths_data(conda_meta / filename) or ():
+            sha256 = entry.get("sha256_in_prefix") or (
+                None if entry.get("prefix_placeholder") else entry.get("sha256")
+            )
+            if sha256 and entry.get("_path"):
+                checksums[entry["_path"]] = sha256
+    return checksums
+
+
+def _reset_to(prefix: str | Path, path: Path, reason: str) -> SnapshotRestore:
+    """Restore the snapshot ``path`` with a transaction, for ``reason``."""
+    from .reset import reset
+
+    reset(prefix=str(prefix), snapshot=path / SNAPSHOT_EXPLICIT)
+    return SnapshotRestore(0, 0, reason)
+
+
+def fallback_reason(
+    path: Path,
+    saved: Iterable[PrefixRecord],
+    to_unlink: Iterable[PrefixRecord],
+    to_link: Iterable[PrefixRecord],
+) -> str | None:
+    """Why the snapshot ``path`` can not be restored by links only, if it can't."""
+    from .fast_remove import needs_transaction
+
+    if any(needs_transaction(record) for record in to_unlink):
+        return "packages to remove have unlink scripts or menus"
+    if any(_LINK_FILES.match(p) for record in to_link for p in record.files):
+        return "packages to restore have link scripts or menus"
+    files = path / SNAPSHOT_FILES_DIR
+    missing = sum(
+        not os.path.lexists(files / p) for record in saved for p in record.files
+    )
+    if missing:
+        return f"{missing} files are missing from the snapshot"
+    return None
+
+
+def restore_snapshot(
+    prefix: str | Path = sys.prefix,
+    name: str = DEFAULT_SNAPSHOT_NAME,
+    verify: bool = False,
+) -> SnapshotRestore:
+    """Restore ``prefix`` to the snapshot ``name``.
+
+    The files of the packages installed in both are relinked when missing or
+    when their size or modification time changed; with ``verify``, when their
+    checksum differs from the one recorded in the snapshot, which reads all
+    of them. See the module documentation for when a transaction is used
+    instead.
+    """
+    from conda.exceptions import DryRunExit
+    from conda.history import History
+
+    from .fast_remove import plan_removal, prune_directories, remove_files
+    from .prefix_index import invalidate_prefix_index, prefix_index
+
+    path = snapshot_path(prefix, name)
+    manifest, saved = read_snapshot(path)
+    if manifest.get("platform") != context.subdir:
+        raise SnapshotError(
+            f"The snapshot is for {manifest.get('platform')}, not {context.subdir}."
+        )
+    if context.dry_run:
+        raise DryRunExit()
+
+    installed = {_record_filename(r): r for r in prefix_index(prefix).records()}
+    saved_by_filename = {_record_filename(r): r for r in saved}
+    to_unlink = {fn: r for fn, r in installed.items() if fn not in saved_by_filename}
+    to_link = {fn: r for fn, r in saved_by_filename.items() if fn not in installed}
+
+    if reason := fallback_reason(path, saved, to_unlink.values(), to_link.values()):
+        return _reset_to(prefix, path, reason)
+
+    plan = plan_removal(to_unlink.values(), keep=saved)
+    changed = {p for record in to_link.values() for p in record.files}
+    kept = {p for record in saved for p in record.files} - changed
+    kept_records = [fn for fn in saved_by_filename if fn not in to_link]
+    checksums = _checksums(path / "conda-meta", kept_records) if verify else None
+    files = path / SNAPSHOT_FILES_DIR
+    conda_meta = Path(prefix, "conda-meta")
+    try:
+        removed = remove_files(prefix, plan)
+        restored = link_files(
+            files, prefix, sorted(changed), manifest["method"], compare=False
+        ) + link_files(
+            files, prefix, sorted(kept), manifest["method"], checksums=checksums
+        )
+        # the records only change once every file is in place
+        for filename in to_unlink:
+            (conda_meta / filename).unlink(missing_ok=True)
+        for filename in to_link:
+            shutil.copy2(path / "conda-meta" / filename, conda_meta / filename)
+        prune_directories(prefix, plan)
+    except OSError as err:
+        # conda-meta still describes what is installed, as far as the
+        # transaction is concerned: let it repair the prefix
+        invalidate_prefix_index(prefix)
+        return _reset_to(prefix, path, f"restoring the files failed: {err}")
+    finally:
+        invalidate_prefix_index(prefix)
+    # diffs the state recorded in history against conda-meta, read afresh
+    History(str(prefix)).update()
+    return SnapshotRestore(restored, removed)
@@ -7,6 +7,8 @@ from typing import TYPE_CHECKING
 
 from conda.core.prefix_data import PrefixData
 
+from .prefix_index import invalidate_prefix_index
+
 if TYPE_CHECKING:
     from subprocess import CompletedProcess
 
@@ -29,5 +31,5 @@ def conda_cli_subprocess(prefix: str | Path, *args, **kwargs) -> CompletedProces
 
 
 def is_installed(prefix: str | Path, package: PackageRecord | MatchSpec | str):
-    PrefixData._cache_.clear()
+    invalidate_prefix_index(prefix)
     return bool(list(PrefixData(prefix).query(package)))
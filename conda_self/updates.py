@@ -0,0 +1,211 @@
+"""Look up newer builds of installed packages in cached repodata.
+
+Unlike ``conda self update --dry-run``, no solver is involved and nothing is
+downloaded: only the repodata already in the index cache (as left by the last
+solve) is read, so the answer can be outdated by the cache's age, and only
+says that a newer build exists, not that it is installable.
+
+Only the entries of the packages asked for are kept from each cached
+``repodata.json``; they are stored on disk (see :mod:`.cache`) keyed by the
+``(mtime_ns, size)`` of that file, so later checks do not parse it again
+until the index cache is refreshed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import TYPE_CHECKING, NamedTuple
+
+from conda.base.context import context
+
+from .cache import cache_key, cache_path, read_cache, write_cache
+from .constants import CACHED_RECORDS_CACHE
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from pathlib import Path
+    from typing import Any
+
+    from conda.core.subdir_data import SubdirData
+    from conda.models.records import PackageRecord
+
+
+class UpdateCandidate(NamedTuple):
+    name: str
+    version: str
+    build: str
+    build_number: int
+    channel: str
+    subdir: str
+
+    @classmethod
+    def from_record(cls, record: PackageRecord) -> UpdateCandidate:
+        return cls(
+            record.name,
+            record.version,
+            record.build,
+            record.build_number,
+            record.channel.canonical_name,
+            record.subdir,
+        )
+
+
+def _sort_key(record: PackageRecord | UpdateCandidate) -> tuple:
+    from conda.models.version import VersionOrder
+
+    return VersionOrder(record.version), record.build_number
+
+
+def is_newer(record: PackageRecord, installed: PackageRecord) -> bool:
+    """Whether ``record`` has a higher version, or build number, than ``installed``."""
+    return _sort_key(record) > _sort_key(installed)
+
+
+def _repodata_stat(path: Path) -> list[int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def extract_repodata(path: str | Path, names: Iterable[str]) -> dict:
+    """The entries of the packages ``names`` in the ``repodata.json`` at ``path``.
+
+    Returns the ``subdir`` and ``base_url`` of the repodata and its
+    ``packages`` (and ``packages.conda``, unless ``use_only_tar_bz2`` is set)
+    entries, by filename, for these names only.
+    """
+    names = set(names)
+    with open(path) as fh:
+        repodata = json.load(fh)
+    info = repodata.get("info") or {}
+    groups = ["packages"]
+    if not context.use_only_tar_bz2:
+        groups.append("packages.conda")
+    return {
+        "subdir": info.get("subdir"),
+        "base_url": info.get("base_url"),
+        "packages": {
+            fn: entry
+            for group in groups
+            for fn, entry in (repodata.get(group) or {}).items()
+            if entry.get("name") in names
+        },
+    }
+
+
+def _records(subdir_data: SubdirData, extract: dict) -> Iterable[PackageRecord]:
+    from conda.common.url import join_url
+    from conda.models.records import PackageRecord
+
+    channel = subdir_data.channel
+    base_url = extract["base_url"] or subdir_data.url_w_subdir
+    for fn, entry in extract["packages"].items():
+        if entry.get("record_version", 0) > 1:
+            continue
+        yield PackageRecord(
+            **{
+                **entry,
+                "fn": fn,
+                "url": join_url(base_url, fn),
+                "channel": channel,
+                "subdir": extract["subdir"] or channel.subdir,
+            }
+        )
+
+
+def cached_records(
+    names: Iterable[str],
+    channels: Iterable[str] | None = None,
+    prefix: str | Path = sys.prefix,
+) -> dict[str, list[PackageRecord]]:
+    """Records of the packages ``names`` in the cached repodata of ``channels``.
+
+    ``channels`` defaults to the configured channels. Nothing is fetched:
+    subdirs without cached repodata, or whose cache can not be read, are
+    skipped. The entries of ``names`` are kept in a cache of ``prefix`` and
+    only extracted again from the repodata files that changed since.
+    """
+    from conda.base.constants import REPODATA_FN
+    from conda.core.subdir_data import SubdirData
+    from conda.models.channel import Channel, all_channel_urls
+
+    names = sorted(set(names))
+    path = cache_path(prefix, CACHED_RECORDS_CACHE)
+    key = cache_key(CACHED_RECORDS_CACHE, names, context.use_only_tar_bz2)
+    extracts: dict[str, dict] = read_cache(path, key) or {}
+
+    records: dict[str, list[PackageRecord]] = {name: [] for name in names}
+    urls = all_channel_urls(
+        context.channels if channels is None else channels, context.subdirs
+    )
+    updated = {}
+    for url in urls:
+        subdir_data = SubdirData(Channel(url), repodata_fn=REPODATA_FN)
+        repodata = str(subdir_data.cache_path_json)
+        if (stat := _repodata_stat(subdir_data.cache_path_json)) is None:
+            continue
+        extract = extracts.get(repodata)
+        if extract is None or extract["stat"] != stat:
+            try:
+                extract = {"stat": stat, **extract_repodata(repodata, names)}
+            except (OSError, ValueError):
+                continue
+        updated[repodata] = extract
+        for record in _records(subdir_data, extract):
+            records[record.name].append(record)
+
+    if updated != extracts:
+        write_cache(path, key, updated)
+    return records
+
+
+def check_updates(
+    names: Iterable[str],
+    prefix: str | Path = sys.prefix,
+    channels: Iterable[str] | None = None,
+) -> dict[str, list[UpdateCandidate]]:
+    """Newer builds of the packages ``names`` installed in ``prefix``, newest first.
+
+    Packages that are not installed, or up to date, are left out.
+    """
+    from .prefix_index import prefix_index
+
+    index = prefix_index(prefix)
+    installed = {name: record for name in names if (record := index.get(name))}
+    updates = {}
+    for name, records in cached_records(installed, channels, prefix).items():
+        candidates = {
+            UpdateCandidate.from_record(record)
+            for record in records
+            if is_newer(record, installed[name])
+        }
+        if candidates:
+            updates[name] = sorted(candidates, key=_sort_key, reverse=True)
+    return updates
+
+
+def updates_report(
+    updates: Mapping[str, list[UpdateCandidate]],
+    installed: Mapping[str, PackageRecord],
+) -> dict[str, Any]:
+    """The ``--json`` document of ``conda self update --check``."""
+    return {
+        "updates_available": bool(updates),
+        "packages": {
+            name: {
+                "installed": {
+                    "version": record.version,
+                    "build": record.build,
+                    "channel": record.channel.canonical_name,
+                },
+                "candidates": [
+                    candidate._asdict() for candidate in updates.get(name, [])
+                ],
+            }
+            for name, record in installed.items()
+        },
+    }
@@ -0,0 +1,151 @@
+"""Resources used by child ``conda`` processes.
+
+:class:`UsageMeter` measures one child: wall time, the CPU time, peak
+resident set size and block I/O from ``getrusage(RUSAGE_CHILDREN)``, and the
+bytes read and written from ``/proc/<pid>/io`` where available (Linux).
+Measurements are reported in the ``--json`` output of the commands running
+the child, and appended to the metrics log set by the ``self_metrics_log``
+setting, one JSON object per line (see :func:`log_usage`).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from conda.base.context import context
+
+from .constants import LOW_PRIORITY_NICENESS, SELF_METRICS_LOG_SETTING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from subprocess import Popen
+    from typing import Any
+
+
+class ResourceUsage(NamedTuple):
+    """Resources used by a child process; ``None`` where not measurable."""
+
+    #: Seconds from start to exit.
+    wall_time: float
+    #: Seconds of CPU time in user and kernel mode.
+    user_time: float | None = None
+    system_time: float | None = None
+    #: Peak resident set size, in bytes, of the largest child waited for so
+    #: far (``RUSAGE_CHILDREN`` has no per-child peak).
+    max_rss: int | None = None
+    #: Block input and output operations.
+    block_input: int | None = None
+    block_output: int | None = None
+    #: Bytes fetched from and sent to the storage layer.
+    read_bytes: int | None = None
+    write_bytes: int | None = None
+
+
+def _children_rusage() -> Any:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_CHILDREN)
+
+
+def _proc_io(pid: int) -> dict[str, int]:
+    """``/proc/<pid>/io``, once ``pid`` has exited but before it is reaped."""
+    if not hasattr(os, "waitid"):
+        return {}
+    counters = {}
+    try:
+        os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+        with open(f"/proc/{pid}/io") as fh:
+            for line in fh:
+                key, _, value = line.partition(":")
+                counters[key] = int(value)
+    except (OSError, ValueError):
+        return {}
+    return counters
+
+
+class UsageMeter:
+    """Measure the resources of the next child process to be waited for.
+
+    Create the meter before starting the child, then wait for the child with
+    :meth:`wait`, which sets :attr:`usage`.
+    """
+
+    def __init__(self) -> None:
+        self.usage: ResourceUsage | None = None
+        self._start = time.monotonic()
+        self._before = _children_rusage()
+
+    def wait(self, process: Popen) -> int:
+        """Wait for ``process`` to exit and measure it; return its exit code."""
+        io = _proc_io(process.pid)
+        returncode = process.wait()
+        wall_time = time.monotonic() - self._start
+        after = _children_rusage()
+
+        fields: dict[str, Any] = {}
+        if self._before is not None and after is not None:
+            before = self._before
+            fields.update(
+                user_time=after.ru_utime - before.ru_utime,
+                system_time=after.ru_stime - before.ru_stime,
+                # kilobytes, but bytes on macOS
+                max_rss=after.ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+                block_input=after.ru_inblock - before.ru_inblock,
+                block_output=after.ru_oublock - before.ru_oublock,
+            )
+        if io:
+            fields.update(
+                read_bytes=io.get("read_bytes"), write_bytes=io.get("write_bytes")
+            )
+        self.usage = ResourceUsage(wall_time, **fields)
+        return returncode
+
+
+def lower_priority(pid: int) -> None:
+    """Lower the CPU priority of the process ``pid``, where supported.
+
+    Most Linux I/O schedulers derive the I/O priority of a process from its
+    CPU priority, so this lowers its I/O priority too.
+    """
+    if not hasattr(os, "setpriority"):  # Windows
+        return
+    with suppress(OSError):  # e.g. the process already exited
+        os.setpriority(
+            os.PRIO_PROCESS,
+            pid,
+            max(os.getpriority(os.PRIO_PROCESS, pid), LOW_PRIORITY_NICENESS),
+        )
+
+
+def log_usage(cmd: Sequence[str], returncode: int, usage: ResourceUsage) -> None:
+    """Append ``usage`` of the child ``conda`` run as ``cmd`` to the metrics log.
+
+    Does nothing unless the ``self_metrics_log`` setting is set; failing to
+    write the log is never an error.
+    """
+    from conda import __version__ as conda_version
+
+    path = getattr(context.plugins, SELF_METRICS_LOG_SETTING, None)
+    if not path:
+        return
+    record = {
+        "time": time.time(),
+        "command": cmd[3],
+        "args": list(cmd[4:]),
+        "returncode": returncode,
+        "conda_version": conda_version,
+        **usage._asdict(),
+    }
+    with suppress(OSError):
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a") as fh:
+            fh.write(json.dumps(record) + "\n")
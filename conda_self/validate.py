@@ -1,8 +1,23 @@
+from __future__ import annotations
+
+import os
+import sys
 from functools import cache
-from importlib.metadata import entry_points
+from typing import TYPE_CHECKING
 
+from conda.core.path_actions import Action
 from conda.exceptions import CondaValueError
 
+from .constants import PLUGINS_ONLY_ENV_VAR
+from .exceptions import NotAPluginError
+from .package_info import PackageInfo
+from .plugin_index import CONDA_ENTRY_POINT_GROUP, site_packages_plugins
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from conda.models.records import PackageCacheRecord, PrefixRecord
+
 
 def _normalize(name: str) -> str:
     """Normalize package name for comparison (hyphens vs underscores)."""
@@ -11,19 +26,23 @@ def _normalize(name: str) -> str:
 
 @cache
 def conda_plugin_packages():
-    # Normalize names to use hyphens (conda convention) since
-    # importlib.metadata may return underscores (Python convention).
+    # Only read the entry_points.txt files of the base site-packages, rather
+    # than going through importlib.metadata, which parses the metadata of every
+    # distribution on sys.path. Distribution names use underscores (Python
+    # convention), hence the normalization.
     return set(
-        _normalize(name)
-        for ep in entry_points(group="conda")
-        if ep.dist is not None
-        and (name := ep.dist.name.strip())
-        and _normalize(name) != "conda-self"
+        normalized
+        for name in site_packages_plugins(sys.prefix)
+        if (normalized := _normalize(name)) != "conda-self"
     )
 
 
 def reload_plugin_packages() -> None:
-    """Invalidate the cache to pick up newly installed packages."""
+    """Invalidate the cache to pick up newly installed packages.
+
+    Only the ``site-packages`` directories modified since the last lookup are
+    rescanned, and only their new ``*.dist-info`` directories are parsed.
+    """
     conda_plugin_packages.cache_clear()
 
 
@@ -33,3 +52,73 @@ def validate_plugin_is_installed(name: str) -> None:
             f"Package '{name}' does not seem to be a valid conda plugin. "
             "Try one of:\n- " + "\n- ".join(sorted(conda_plugin_packages()))
         )
+
+
+def validate_plugin_records(
+    records: Iterable[PrefixRecord | PackageCacheRecord],
+) -> None:
+    """Raise :class:`~.exceptions.NotAPluginError` for non-plugin ``records``.
+
+    Only the dist-info directories of ``records`` are inspected, so this works
+    on extracted package cache records, before they are linked, as well as on
+    freshly installed records.
+    """
+    not_plugins = [
+        scan.record.name
+        for scan in PackageInfo.scan_records(records, group=CONDA_ENTRY_POINT_GROUP)
+        if not scan.entry_points.get(CONDA_ENTRY_POINT_GROUP)
+    ]
+    if not_plugins:
+        raise NotAPluginError(not_plugins)
+
+
+class PluginCheckAction(Action):
+    """Check, before linking, that the packages to install are conda plugins.
+
+    The packages are named in :data:`~.constants.PLUGINS_ONLY_ENV_VAR`. A
+    pre-transaction action: in the ``conda install`` child started by
+    :func:`~.install.install_specs_in_protected_env`, it is verified once the
+    packages are extracted, so a failure aborts the transaction before
+    anything is linked into base. Packages the transaction does not link are
+    looked up in the target prefix. Without the variable, it does nothing.
+    """
+
+    def _check(self) -> None:
+        from conda.core.package_cache_data import PackageCacheData
+
+        from .prefix_index import prefix_index
+
+        names = {n for n in os.environ.get(PLUGINS_ONLY_ENV_VAR, "").split(",") if n}
+        if not names or self.target_prefix is None:
+            return
+        records: list[PrefixRecord | PackageCacheRecord] = [
+            PackageCacheData.get_entry_to_link(record)
+            for record in self.link_precs or ()
+            if record.name in names
+        ]
+        index = prefix_index(self.target_prefix)
+        linked = {record.name for record in records}
+        records.extend(
+            record for name in sorted(names - linked) if (record := index.get(name))
+        )
+        validate_plugin_records(records)
+
+    def verify(self) -> NotAPluginError | None:
+        self._verified = True
+        try:
+            self._check()
+        except NotAPluginError as err:
+            return err
+        return None
+
+    def execute(self) -> None:
+        # not verified when the safety_checks setting is disabled: conda then
+        # rolls back what it unlinked before stopping at this error
+        if not self._verified:
+            self._check()
+
+    def reverse(self) -> None:
+        pass
+
+    def cleanup(self) -> None:
+        pass
@@ -5,9 +5,12 @@ import sys
 from typing import TYPE_CHECKING
 
 import pytest
+from conda.base.context import context
 from conda.plugins.hookspec import CondaSpecs
 from conda.plugins.manager import CondaPluginManager
 
+from conda_self import plugin as conda_self_plugin
+
 if TYPE_CHECKING:
     from collections.abc import Iterator
     from pathlib import Path
@@ -38,6 +41,23 @@ def plugin_manager(mocker) -> CondaPluginManager:
     return pm
 
 
+@pytest.fixture()
+def clear_plugins_context_cache():
+    try:
+        del context.plugins
+    except AttributeError:
+        pass
+
+
+@pytest.fixture()
+def self_plugin_manager(
+    plugin_manager: CondaPluginManager, clear_plugins_context_cache
+):
+    """Load the conda-self plugin module (including conda_settings)."""
+    plugin_manager.load_plugins(conda_self_plugin)
+    yield plugin_manager
+
+
 @pytest.fixture(scope="session")
 def _session_env(
     session_tmp_env: TmpEnvFixture,
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.base.context import context
+from conda.exceptions import CondaValueError, DryRunExit
+
+from conda_self import install
+from conda_self.apply import (
+    PluginChanges,
+    apply_changes,
+    read_changes_file,
+    validate_changes,
+)
+from conda_self.constants import SELF_IN_PROCESS_SETTING
+from conda_self.exceptions import NotAPluginError, PluginRemoveError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest import MonkeyPatch
+
+
+@pytest.mark.parametrize(
+    "filename, content",
+    [
+        ("changes.yaml", "install: [conda-index]\nremove:\n  - conda-foo\n"),
+        (
+            "changes.json",
+            json.dumps({"install": ["conda-index"], "remove": ["conda-foo"]}),
+        ),
+    ],
+    ids=["yaml", "json"],
+)
+def test_read_changes_file(tmp_path: Path, filename: str, content: str):
+    path = tmp_path / filename
+    path.write_text(content)
+    assert read_changes_file(path) == PluginChanges(
+        install=("conda-index",), remove=("conda-foo",)
+    )
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["- conda-index\n", "install: conda-index\n", "upgrade: [conda-index]\n"],
+    ids=["not-a-mapping", "not-a-list", "unknown-key"],
+)
+def test_read_changes_file_invalid(tmp_path: Path, content: str):
+    path = tmp_path / "changes.yaml"
+    path.write_text(content)
+    with pytest.raises(CondaValueError):
+        read_changes_file(path)
+
+
+def test_merge():
+    changes = PluginChanges(install=("a", "b")).merge(
+        PluginChanges(install=("b", "c"), update=("conda",))
+    )
+    assert changes == PluginChanges(install=("a", "b", "c"), update=("conda",))
+    assert not PluginChanges()
+
+
+@pytest.fixture
+def rules(monkeypatch: MonkeyPatch) -> None:
+    """Base has conda and conda-self permanent, and conda-foo as only plugin."""
+    monkeypatch.setattr(
+        "conda_self.query.permanent_dependencies",
+        lambda add_plugins=False: {"conda", "conda-self", "python"},
+    )
+    monkeypatch.setattr(
+        "conda_self.validate.conda_plugin_packages", lambda: {"conda-foo"}
+    )
+
+
+@pytest.mark.parametrize(
+    "changes, error",
+    [
+        (PluginChanges(), CondaValueError),
+        (PluginChanges(install=("conda-forge::conda-index",)), CondaValueError),
+        (
+            PluginChanges(install=("conda-foo >=2",), remove=("conda-foo",)),
+            CondaValueError,
+        ),
+        (PluginChanges(remove=("python",)), PluginRemoveError),
+        (PluginChanges(update=("numpy",)), CondaValueError),
+    ],
+    ids=["empty", "channel", "conflict", "permanent", "update-not-a-plugin"],
+)
+def test_validate_changes_rejects(rules, changes: PluginChanges, error: type):
+    with pytest.raises(error):
+        validate_changes(changes)
+
+
+def test_validate_changes(rules):
+    validate_changes(
+        PluginChanges(
+            install=("conda-index",), remove=("conda-bar",), update=("conda-foo",)
+        )
+    )
+    validate_changes(PluginChanges(update=("conda",)))
+
+
+@pytest.fixture
+def transaction(monkeypatch: MonkeyPatch, tmp_path: Path) -> SimpleNamespace:
+    """Solve to a transaction linking the extracted packages in ``tmp_path``.
+
+    Runs in-process; set ``isolated`` to have the solution touch conda, and
+    ``nothing_to_do`` to have it change nothing.
+    """
+    state = SimpleNamespace(
+        solves=[], executed=False, isolated=False, nothing_to_do=False
+    )
+
+    class FakeTxn:
+        @property
+        def nothing_to_do(self):
+            return state.nothing_to_do
+
+        @property
+        def prefix_setups(self):
+            name = "conda" if state.isolated else "conda-foo"
+            records = () if state.nothing_to_do else (SimpleNamespace(name=name),)
+            return {"base": SimpleNamespace(unlink_precs=(), link_precs=records)}
+
+        def print_transaction_summary(self):
+            pass
+
+        def download_and_extract(self):
+            pass
+
+        def execute(self):
+            state.executed = True
+
+    def fake_solve(specs_to_add=(), specs_to_remove=(), **kwargs):
+        state.solves.append((list(specs_to_add), list(specs_to_remove)))
+        return FakeTxn()
+
+    def fake_extracted_records(txn, names):
+        return [
+            SimpleNamespace(
+                name=name,
+                extracted_package_dir=str(tmp_path / name),
+                files=None,
+            )
+            for name in names
+        ]
+
+    monkeypatch.setattr(context.plugins, SELF_IN_PROCESS_SETTING, True, raising=False)
+    monkeypatch.setattr(install, "on_win", False)
+    monkeypatch.setattr("conda_self.install.solve_in_protected_env", fake_solve)
+    monkeypatch.setattr("conda_self.install.extracted_records", fake_extracted_records)
+    monkeypatch.setattr("conda_self.install.invalidate_prefix_index", lambda _: None)
+    monkeypatch.setattr(context, "quiet", True, raising=False)
+    return state
+
+
+def extracted_package(root: Path, name: str, entry_points: str) -> None:
+    dist_info = root / name / "site-packages" / f"{name}-1.0.dist-info"
+    dist_info.mkdir(parents=True)
+    (dist_info / "entry_points.txt").write_text(entry_points)
+    (root / name / "info").mkdir()
+    (root / name / "info" / "files").write_text(
+        f"site-packages/{name}-1.0.dist-info/entry_points.txt\n"
+    )
+
+
+@pytest.fixture
+def subprocesses(monkeypatch: MonkeyPatch) -> list[list[str]]:
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return 0
+
+    monkeypatch.setattr(install, "_run", fake_run)
+    monkeypatch.setattr("conda_self.install.invalidate_prefix_index", lambda _: None)
+    monkeypatch.setattr("conda_self.install._installed_records", lambda names: [])
+    return calls
+
+
+def test_apply_changes(rules, transaction: SimpleNamespace, tmp_path: Path):
+    extracted_package(tmp_path, "conda-index", "[conda]\nindex = conda_index\n")
+    extracted_package(tmp_path, "conda-foo", "[conda]\nfoo = conda_foo\n")
+    changes = PluginChanges(
+        install=("conda-index",), remove=("conda-bar",), update=("conda-foo",)
+    )
+
+    assert apply_changes(changes, yes=True) == 0
+    assert transaction.solves == [(["conda-index", "conda-foo"], ["conda-bar"])]
+    assert transaction.executed
+
+
+def test_apply_changes_rejects_non_plugin_before_linking(
+    rules, transaction: SimpleNamespace, tmp_path: Path
+):
+    extracted_package(tmp_path, "conda-index", "[conda]\nindex = conda_index\n")
+    extracted_package(tmp_path, "requests", "[console_scripts]\nx = y:z\n")
+    changes = PluginChanges(install=("conda-index", "requests"))
+
+    with pytest.raises(NotAPluginError, match="requests"):
+        apply_changes(changes, yes=True)
+    assert not transaction.executed
+
+
+def test_apply_changes_rejects_update_to_non_plugin(
+    rules, transaction: SimpleNamespace, tmp_path: Path
+):
+    # the new build of conda-foo does not register conda entry points anymore
+    extracted_package(tmp_path, "conda-foo", "[console_scripts]\nfoo = foo:main\n")
+
+    with pytest.raises(NotAPluginError, match="conda-foo"):
+        apply_changes(PluginChanges(update=("conda-foo",)), yes=True)
+    assert not transaction.executed
+
+
+def test_apply_changes_dry_run(rules, transaction: SimpleNamespace):
+    with pytest.raises(DryRunExit):
+        apply_changes(PluginChanges(update=("conda-foo",)), dry_run=True)
+    assert len(transaction.solves) == 1
+    assert not transaction.executed
+
+
+def test_apply_changes_nothing_to_do_validates(
+    rules, transaction: SimpleNamespace, monkeypatch: MonkeyPatch
+):
+    transaction.nothing_to_do = True
+    # conda-foo is installed already, but is not a plugin anymore
+    monkeypatch.setattr(
+        "conda_self.install._installed_records",
+        lambda names: [SimpleNamespace(name=name) for name in names],
+    )
+
+    def fake_validate_plugin_records(records):
+        raise NotAPluginError([record.name for record in records])
+
+    monkeypatch.setattr(
+        "conda_self.validate.validate_plugin_records", fake_validate_plugin_records
+    )
+
+    with pytest.raises(NotAPluginError, match="conda-foo"):
+        apply_changes(PluginChanges(update=("conda-foo",)), yes=True)
+    assert not transaction.executed
+
+
+def test_apply_changes_falls_back_to_subprocess(
+    rules, transaction: SimpleNamespace, subprocesses: list[list[str]]
+):
+    transaction.isolated = True
+    changes = PluginChanges(install=("conda-index",), update=("conda-foo",))
+
+    assert apply_changes(changes, yes=True) == 0
+    assert len(transaction.solves) == 1
+    assert not transaction.executed
+    (install_cmd,) = subprocesses
+    assert install_cmd[3] == "install"
+    assert install_cmd[-2:] == ["conda-index", "conda-foo"]
+
+
+def test_apply_changes_refuses_to_split(
+    rules, transaction: SimpleNamespace, subprocesses: list[list[str]]
+):
+    transaction.isolated = True
+    changes = PluginChanges(install=("conda-index",), remove=("conda-bar",))
+
+    with pytest.raises(CondaValueError, match="single transaction"):
+        apply_changes(changes, yes=True)
+    assert not transaction.executed
+    assert subprocesses == []
+
+
+def test_apply_changes_json(
+    rules, transaction: SimpleNamespace, subprocesses: list[list[str]]
+):
+    assert apply_changes(PluginChanges(remove=("conda-bar",)), yes=True, json=True) == 0
+    assert transaction.solves == []
+    (remove_cmd,) = subprocesses
+    assert remove_cmd[3] == "remove"
+    assert "--json" in remove_cmd
+
+    changes = PluginChanges(install=("conda-index",), remove=("conda-bar",))
+    with pytest.raises(CondaValueError, match="single transaction"):
+        apply_changes(changes, yes=True, json=True)
+
+
+def test_apply_changes_subprocess_dry_run(
+    rules, monkeypatch: MonkeyPatch, subprocesses: list[list[str]]
+):
+    monkeypatch.setattr(context.plugins, SELF_IN_PROCESS_SETTING, False, raising=False)
+    changes = PluginChanges(install=("conda-index",), update=("conda-foo",))
+
+    with pytest.raises(DryRunExit):
+        apply_changes(changes, dry_run=True)
+    (install_cmd,) = subprocesses
+    assert "--dry-run" in install_cmd
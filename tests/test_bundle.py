@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import tarfile
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.base.context import context, reset_context
+from conda.core.package_cache_data import PackageCacheData
+from conda.models.records import PackageRecord, PrefixRecord
+
+from conda_self.bundle import (
+    apply_bundle,
+    create_bundle,
+    explicit_lines,
+    read_manifest,
+)
+from conda_self.constants import BUNDLE_EXPLICIT, BUNDLE_MANIFEST, BUNDLE_PKGS_DIR
+from conda_self.exceptions import BundleError
+from conda_self.explicit import iter_explicit
+from conda_self.prefix_index import invalidate_prefix_index
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+    from pytest import MonkeyPatch
+
+NAME = "conda-self-test-pkg"
+FILENAME = f"{NAME}-1.0-0.tar.bz2"
+
+
+def make_tarball(path: Path) -> dict:
+    """Write a tiny noarch package to ``path``; return its index.json."""
+    index = {
+        "name": NAME,
+        "version": "1.0",
+        "build": "0",
+        "build_number": 0,
+        "subdir": "noarch",
+        "depends": [],
+    }
+    members = {
+        "info/index.json": json.dumps(index).encode(),
+        "info/files": b"share/conda-self-test-pkg.txt\n",
+        "share/conda-self-test-pkg.txt": b"hello from a bundle\n",
+    }
+    with tarfile.open(path, "w:bz2") as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return index
+
+
+@pytest.fixture
+def use_pkgs_dir(monkeypatch: MonkeyPatch) -> Iterator[Callable[[Path], None]]:
+    """Switch the package cache to a directory."""
+
+    def use(pkgs_dir: Path) -> None:
+        monkeypatch.setenv("CONDA_PKGS_DIRS", str(pkgs_dir))
+        reset_context()
+        PackageCacheData._cache_.clear()
+
+    yield use
+    monkeypatch.undo()
+    reset_context()
+    PackageCacheData._cache_.clear()
+
+
+@pytest.fixture
+def source(tmp_path: Path, use_pkgs_dir) -> Path:
+    """A prefix with one package installed from the package cache ``pkgs-a``."""
+    pkgs_dir = tmp_path / "pkgs-a"
+    pkgs_dir.mkdir()
+    tarball = pkgs_dir / FILENAME
+    index = make_tarball(tarball)
+    md5 = hashlib.md5(tarball.read_bytes()).hexdigest()
+    url = f"https://conda.example.com/channel/noarch/{FILENAME}"
+    (pkgs_dir / "urls.txt").write_text(f"{url}\n")  # as after a download
+    record = PrefixRecord(
+        **index,
+        fn=FILENAME,
+        url=url,
+        channel="https://conda.example.com/channel/noarch",
+        md5=md5,
+        size=tarball.stat().st_size,
+        files=["share/conda-self-test-pkg.txt"],
+    )
+    prefix = tmp_path / "source"
+    (prefix / "conda-meta").mkdir(parents=True)
+    (prefix / "conda-meta" / f"{NAME}-1.0-0.json").write_text(json.dumps(record.dump()))
+    (prefix / "conda-meta" / "history").touch()
+    invalidate_prefix_index(prefix)
+    use_pkgs_dir(pkgs_dir)
+    return prefix
+
+
+def test_explicit_lines_checksums():
+    url = "https://conda.example.com/channel/noarch/pkg-1.0-0.conda"
+    records = [
+        PrefixRecord(
+            name="pkg", version="1.0", build="0", build_number=0, url=url, **checksums
+        )
+        for checksums in ({"md5": "a" * 32}, {"sha256": "b" * 64}, {})
+    ]
+
+    lines = explicit_lines(records, "noarch")[3:]
+    assert lines == [f"{url}#{'a' * 32}", f"{url}#sha256:{'b' * 64}", url]
+    assert [(p.md5, p.sha256) for p in iter_explicit(lines)] == [
+        ("a" * 32, None),
+        (None, "b" * 64),
+        (None, None),
+    ]
+
+
+def test_create_bundle(source: Path, tmp_path: Path):
+    bundle = tmp_path / "base.bundle"
+    manifest = create_bundle(bundle, prefix=source)
+
+    assert [package["name"] for package in manifest["packages"]] == [NAME]
+    with tarfile.open(bundle) as tar:
+        assert read_manifest(tar) == json.loads(json.dumps(manifest))
+        assert f"{BUNDLE_PKGS_DIR}/{FILENAME}" in tar.getnames()
+        explicit = tar.extractfile(BUNDLE_EXPLICIT).read().decode()  # type: ignore[union-attr]
+    package = manifest["packages"][0]
+    assert "@EXPLICIT" in explicit.splitlines()
+    assert f"{package['url']}#{package['md5']}" in explicit.splitlines()
+    assert (
+        package["sha256"]
+        == hashlib.sha256((tmp_path / "pkgs-a" / FILENAME).read_bytes()).hexdigest()
+    )
+    assert not bundle.with_name("base.bundle.partial").exists()
+
+
+def rewrite_manifest(bundle: Path, **changes) -> None:
+    with tarfile.open(bundle) as tar:
+        members = {
+            member.name: tar.extractfile(member).read()  # type: ignore[union-attr]
+            for member in tar.getmembers()
+        }
+    manifest = json.loads(members[BUNDLE_MANIFEST])
+    for key, value in changes.items():
+        if key == "sha256":
+            manifest["packages"][0]["sha256"] = value
+        else:
+            manifest[key] = value
+    members[BUNDLE_MANIFEST] = json.dumps(manifest).encode()
+    with tarfile.open(bundle, "w") as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [{"platform": "win-arm64"}, {"version": 99}, {"sha256": "0" * 64}],
+    ids=["platform", "version", "sha256"],
+)
+def test_apply_bundle_rejects(
+    source: Path, tmp_path: Path, use_pkgs_dir, changes: dict
+):
+    bundle = tmp_path / "base.bundle"
+    create_bundle(bundle, prefix=source)
+    rewrite_manifest(bundle, **changes)
+    pkgs_dir = tmp_path / "pkgs-b"
+    use_pkgs_dir(pkgs_dir)
+
+    with pytest.raises(BundleError):
+        apply_bundle(bundle, prefix=str(tmp_path / "target"))
+    assert not list(pkgs_dir.glob(f"{NAME}*"))
+
+
+def test_bundle_end_to_end(
+    source: Path, tmp_path: Path, monkeypatch: MonkeyPatch, use_pkgs_dir
+):
+    bundle = tmp_path / "base.bundle"
+    create_bundle(bundle, prefix=source)
+
+    # another host: empty package cache, no network
+    pkgs_dir = tmp_path / "pkgs-b"
+    use_pkgs_dir(pkgs_dir)
+    monkeypatch.setattr(context, "offline", True, raising=False)
+    target = tmp_path / "target"
+    (target / "conda-meta").mkdir(parents=True)
+    (target / "conda-meta" / "history").touch()
+
+    apply_bundle(bundle, prefix=str(target))
+
+    assert (target / "share" / "conda-self-test-pkg.txt").read_text() == (
+        "hello from a bundle\n"
+    )
+    (installed,) = target.glob(f"conda-meta/{NAME}-1.0-0.json")
+    record = json.loads(installed.read_text())
+    assert record["url"].startswith("https://conda.example.com/")
+    repodata_record = pkgs_dir / f"{NAME}-1.0-0" / "info" / "repodata_record.json"
+    assert PackageRecord(**json.loads(repodata_record.read_text())).url == record["url"]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from conda_self.cache import (
+    cache_key,
+    cache_path,
+    conda_meta_fingerprint,
+    read_cache,
+    site_packages_dirs,
+    write_cache,
+)
+from conda_self.constants import CACHE_DIR
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def prefix(tmp_path: Path) -> Path:
+    conda_meta = tmp_path / "conda-meta"
+    conda_meta.mkdir()
+    (conda_meta / "history").write_text("==> 2026-01-01 <==\n")
+    (conda_meta / "conda-26.1.1-py_0.json").write_text("{}")
+    return tmp_path
+
+
+def test_cache_path(prefix: Path):
+    assert cache_path(prefix, "x.json") == prefix / CACHE_DIR / "x.json"
+
+
+def test_site_packages_dirs(tmp_path: Path):
+    unix = tmp_path / "lib" / "python3.12" / "site-packages"
+    unix.mkdir(parents=True)
+    (tmp_path / "lib" / "pkgconfig").mkdir()
+    windows = tmp_path / "Lib" / "site-packages"
+    windows.mkdir(parents=True)
+
+    assert set(site_packages_dirs(tmp_path)) == {unix, windows}
+
+
+def test_fingerprint_is_stable(prefix: Path):
+    assert conda_meta_fingerprint(prefix) == conda_meta_fingerprint(prefix)
+
+
+@pytest.mark.parametrize(
+    "change",
+    ("add-record", "remove-record", "touch-record", "append-history", "pip"),
+)
+def test_fingerprint_changes(prefix: Path, change: str):
+    site_packages = prefix / "lib" / "python3.12" / "site-packages"
+    site_packages.mkdir(parents=True)
+    before = conda_meta_fingerprint(prefix)
+
+    conda_meta = prefix / "conda-meta"
+    record = conda_meta / "conda-26.1.1-py_0.json"
+    if change == "add-record":
+        (conda_meta / "numpy-2.0.0-py_0.json").write_text("{}")
+    elif change == "remove-record":
+        record.unlink()
+    elif change == "touch-record":
+        stat = record.stat()
+        os.utime(record, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    elif change == "append-history":
+        with (conda_meta / "history").open("a") as fh:
+            fh.write("+conda-forge/noarch::numpy-2.0.0-py_0\n")
+    elif change == "pip":
+        (site_packages / "requests-2.0.dist-info").mkdir()
+        stat = site_packages.stat()
+        os.utime(site_packages, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert conda_meta_fingerprint(prefix) != before
+
+
+def test_fingerprint_ignores_other_files(prefix: Path):
+    before = conda_meta_fingerprint(prefix)
+    (prefix / "conda-meta" / "frozen").write_text("{}")
+    (prefix / "conda-meta" / "initial-state.explicit.txt").write_text("@EXPLICIT\n")
+    write_cache(cache_path(prefix, "x.json"), "key", [])
+
+    assert conda_meta_fingerprint(prefix) == before
+
+
+def test_cache_key():
+    assert cache_key("a", ["b"], True) == cache_key("a", ["b"], True)
+    assert cache_key("a", ["b"], True) != cache_key("a", ["b"], False)
+
+
+def test_read_write_cache(prefix: Path):
+    path = cache_path(prefix, "x.json")
+    assert read_cache(path, "key") is None
+
+    write_cache(path, "key", ["conda", "python"])
+
+    assert read_cache(path, "key") == ["conda", "python"]
+    assert read_cache(path, "other-key") is None
+    assert [p.name for p in path.parent.iterdir()] == ["x.json"]
+
+
+@pytest.mark.parametrize("content", ("", "not json", "[]", json.dumps({"key": 1})))
+def test_read_corrupt_cache(prefix: Path, content: str):
+    path = cache_path(prefix, "x.json")
+    path.parent.mkdir()
+    path.write_text(content)
+
+    assert read_cache(path, "key") is None
+
+
+def test_write_cache_unwritable(tmp_path: Path):
+    """Failing to write a cache is not an error."""
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+
+    write_cache(blocker / "x.json", "key", [])
+
+    assert read_cache(blocker / "x.json", "key") is None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import sys
 from contextlib import redirect_stdout
 from typing import TYPE_CHECKING
@@ -78,16 +79,13 @@ def stub_transaction(monkeypatch: MonkeyPatch):
     Returns a dict that, after ``reset()`` runs, is populated with the kwargs
     that would have been passed to ``PrefixSetup`` (``unlink_precs`` /
     ``link_precs`` in particular). Tests seed ``captured["installed"]`` with
-    a list of ``FakeRecord`` instances to drive ``PrefixData.iter_records``.
+    a list of ``FakeRecord`` instances to drive ``PrefixIndex.records``.
     """
     captured: dict = {}
 
-    class StubPrefixData:
-        def __init__(self, *args, **kwargs):
-            pass
-
-        def iter_records(self):
-            return iter(captured.get("installed", []))
+    class StubPrefixIndex:
+        def records(self):
+            return tuple(captured.get("installed", []))
 
     def stub_prefix_setup(**kwargs):
         captured.update(kwargs)
@@ -103,7 +101,8 @@ def stub_transaction(monkeypatch: MonkeyPatch):
         def execute(self):
             pass
 
-    monkeypatch.setattr("conda_self.reset.PrefixData", StubPrefixData)
+    monkeypatch.setattr("conda_self.reset.prefix_index", lambda _: StubPrefixIndex())
+    monkeypatch.setattr("conda_self.reset.invalidate_prefix_index", lambda _: None)
     monkeypatch.setattr("conda_self.reset.PrefixSetup", stub_prefix_setup)
     monkeypatch.setattr("conda_self.reset.UnlinkLinkTransaction", StubTxn)
     return captured
@@ -233,6 +232,35 @@ def test_fallback_ordering(
         assert expected_names <= call["uninstallable_packages"]
 
 
+def test_reset_plan(
+    conda_cli: CondaCLIFixture,
+    fake_reset_env: Path,
+    reset_calls: list,
+    monkeypatch: MonkeyPatch,
+):
+    from conda_self.reset_plan import PackageCost, ResetPlan
+
+    plan_calls = []
+
+    def fake_plan_reset(**kwargs):
+        plan_calls.append(kwargs)
+        return ResetPlan(str(fake_reset_env), [PackageCost("pip", "24.0", "0", 3)], [])
+
+    monkeypatch.setattr("conda_self.reset_plan.plan_reset", fake_plan_reset)
+    (fake_reset_env / "conda-meta" / RESET_FILE_INSTALLER).write_text(
+        INSTALLER_SNAPSHOT_CONTENT
+    )
+
+    out, _, _ = conda_cli("self", "reset", "--plan", "--json")
+
+    assert reset_calls == []
+    assert plan_calls[0]["uninstallable_packages"] >= {"mamba", "conda"}
+    document = json.loads(out)
+    assert document["snapshot"] == "installer-updated"
+    assert document["unlink"]["count"] == 1
+    assert document["unlink"]["files"] == 3
+
+
 @pytest.mark.parametrize(
     "snapshot, display_name",
     [
@@ -240,6 +268,7 @@ def test_fallback_ordering(
         (Snapshot.INSTALLER_EXACT, "installer-provided (exact)"),
         (Snapshot.INSTALLER_UPDATED, "installer-provided (with updates)"),
         (Snapshot.BASE_PROTECTION, "base-protection"),
+        (Snapshot.SAVED, "saved (conda self snapshot)"),
     ],
     ids=[s.value for s in Snapshot],
 )
@@ -255,7 +284,8 @@ def test_snapshot_display_name(snapshot: Snapshot, display_name: str):
         (Snapshot.INSTALLER_UPDATED, RESET_FILE_INSTALLER),
         (Snapshot.BASE_PROTECTION, RESET_FILE_BASE_PROTECTION),
     ],
-    ids=[s.value for s in Snapshot],
+    # Snapshot.SAVED is in the snapshot store, see tests/test_snapshot.py
+    ids=[s.value for s in Snapshot if s is not Snapshot.SAVED],
 )
 def test_snapshot_file_path(
     snapshot: Snapshot,
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import json
 from typing import TYPE_CHECKING
 
 import pytest
 from conda.exceptions import CondaValueError
 
+from conda_self.constants import UPDATES_AVAILABLE_EXIT_CODE
 from conda_self.testing import conda_cli_subprocess
 
 if TYPE_CHECKING:
@@ -61,3 +63,39 @@ def test_update(
     )
     assert "Updating" in result.stdout
     assert expected in result.stdout
+
+
+def test_update_prefetch(monkeypatch: MonkeyPatch, base_env: Path, conda_channel: str):
+    monkeypatch.setenv("CONDA_CHANNELS", conda_channel)
+
+    result = conda_cli_subprocess(
+        base_env,
+        "self",
+        "update",
+        "--prefetch",
+        "--low-priority",
+        "--dry-run",
+        capture_output=True,
+        text=True,
+    )
+    assert "Prefetching updates of conda (installed:" in result.stdout
+
+
+def test_update_check(monkeypatch: MonkeyPatch, base_env: Path, conda_channel: str):
+    monkeypatch.setenv("CONDA_CHANNELS", conda_channel)
+
+    result = conda_cli_subprocess(
+        base_env,
+        "self",
+        "update",
+        "--check",
+        "--json",
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    report = json.loads(result.stdout)
+    assert result.returncode == (
+        UPDATES_AVAILABLE_EXIT_CODE if report["updates_available"] else 0
+    )
+    assert "conda" in report["packages"]
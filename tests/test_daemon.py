@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from argparse import Namespace
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.base.context import context
+
+from conda_self import daemon
+from conda_self.cache import cache_path
+from conda_self.constants import (
+    BASE_LOCK,
+    DAEMON_LOCK,
+    DAEMON_SOCKET,
+    SELF_IN_PROCESS_SETTING,
+)
+from conda_self.daemon import (
+    _flock,
+    base_lock,
+    forward_to_daemon,
+    run_request,
+    serve,
+)
+from conda_self.exceptions import DaemonError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from pytest import MonkeyPatch
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="Unix domain sockets")
+
+
+@pytest.fixture
+def prefix(tmp_path: Path, monkeypatch: MonkeyPatch) -> Path:
+    monkeypatch.setattr(sys, "prefix", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def in_process(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(context.plugins, SELF_IN_PROCESS_SETTING, True, raising=False)
+
+
+@pytest.fixture
+def loaded(monkeypatch: MonkeyPatch) -> set:
+    """The packages the daemon reports as loaded; tests change them."""
+    packages = {("conda", "1.0", "0")}
+    monkeypatch.setattr(daemon, "_loaded_packages", lambda prefix: frozenset(packages))
+    return packages
+
+
+@pytest.fixture
+def running_daemon(
+    prefix: Path, monkeypatch: MonkeyPatch, loaded: set
+) -> Iterator[list]:
+    """A daemon answering with the requests it receives."""
+    requests = []
+
+    def fake_run_request(request):
+        requests.append(request)
+        return {"returncode": 3, "stdout": "out\n", "stderr": "err\n"}
+
+    monkeypatch.setattr(daemon, "run_request", fake_run_request)
+    thread = threading.Thread(target=serve, args=(prefix, 0.5))
+    thread.start()
+    socket = cache_path(prefix, DAEMON_SOCKET)
+    while thread.is_alive() and not socket.exists():
+        time.sleep(0.01)
+    yield requests
+    thread.join()
+    assert not socket.exists()
+
+
+def test_base_lock_is_exclusive(prefix: Path):
+    with base_lock(prefix):
+        with pytest.raises(DaemonError):
+            with _flock(cache_path(prefix, BASE_LOCK), blocking=False):
+                pass
+    with _flock(cache_path(prefix, BASE_LOCK), blocking=False):
+        pass
+
+
+def test_base_lock_read_only_prefix(prefix: Path, monkeypatch: MonkeyPatch):
+    def read_only(*args, **kwargs):
+        raise PermissionError
+
+    monkeypatch.setattr("pathlib.Path.mkdir", read_only)
+    with base_lock(prefix):
+        pass
+
+
+def test_single_daemon(prefix: Path):
+    with _flock(cache_path(prefix, DAEMON_LOCK)):
+        with pytest.raises(DaemonError):
+            serve(prefix, idle_timeout=0)
+
+
+def test_forward_to_daemon(
+    running_daemon: list,
+    in_process: None,
+    monkeypatch: MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+):
+    monkeypatch.setattr(sys, "argv", ["conda", "self", "install", "--yes", "x"])
+    args = Namespace(subcommand="install", yes=True, dry_run=False)
+
+    assert forward_to_daemon(args) == 3
+    assert capsys.readouterr() == ("out\n", "err\n")
+    assert running_daemon[0]["argv"] == ["install", "--yes", "x"]
+    assert running_daemon[0]["cwd"] == os.getcwd()
+
+
+@pytest.mark.parametrize(
+    "argv, args",
+    [
+        (
+            ["conda", "self", "install", "x"],
+            Namespace(subcommand="install", yes=False, dry_run=False),
+        ),
+        (["conda", "self", "serve"], Namespace(subcommand="serve")),
+        (["python"], Namespace(subcommand="install", yes=True, dry_run=False)),
+        (
+            ["conda", "self", "install", "--yes", "conda"],
+            Namespace(subcommand="install", yes=True, specs=["conda"]),
+        ),
+        (
+            ["conda", "self", "update", "--yes"],
+            Namespace(subcommand="update", yes=True, plugin=None),
+        ),
+        (
+            ["conda", "self", "apply", "--yes", "--update", "conda"],
+            Namespace(
+                subcommand="apply",
+                yes=True,
+                install=[],
+                remove=[],
+                update=["conda"],
+                file=None,
+            ),
+        ),
+    ],
+    ids=["interactive", "serve", "no-argv", "isolated", "update-conda", "apply"],
+)
+def test_not_forwarded(
+    running_daemon: list,
+    in_process: None,
+    monkeypatch: MonkeyPatch,
+    argv: list,
+    args: Namespace,
+):
+    monkeypatch.setattr(sys, "argv", argv)
+    assert forward_to_daemon(args) is None
+    assert running_daemon == []
+
+
+def test_forward_apply_file(
+    running_daemon: list, in_process: None, monkeypatch: MonkeyPatch, tmp_path: Path
+):
+    changes = tmp_path / "changes.json"
+    monkeypatch.setattr(sys, "argv", ["conda", "self", "apply", "--yes", "--file=x"])
+    args = Namespace(
+        subcommand="apply", yes=True, install=[], remove=[], update=[], file=changes
+    )
+
+    changes.write_text('{"update": ["conda"]}')
+    assert forward_to_daemon(args) is None
+    changes.write_text('{"update": ["conda-foo"]}')
+    assert forward_to_daemon(args) == 3
+    assert len(running_daemon) == 1
+
+
+def test_forward_to_stuck_daemon(prefix: Path, monkeypatch: MonkeyPatch):
+    import socket
+
+    monkeypatch.setattr(daemon, "DAEMON_START_TIMEOUT", 0.2)
+    monkeypatch.setattr(sys, "argv", ["conda", "self", "reset", "--yes"])
+    path = cache_path(prefix, DAEMON_SOCKET)
+    path.parent.mkdir()
+    # listening, but never accepting
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen()
+        start = time.monotonic()
+        assert forward_to_daemon(Namespace(subcommand="reset", yes=True)) is None
+        assert time.monotonic() - start < 5
+
+
+def test_daemon_drops_expired_requests(running_daemon: list, prefix: Path):
+    import json
+    import socket
+
+    request = {"argv": ["reset"], "cwd": str(prefix), "deadline": time.time()}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(cache_path(prefix, DAEMON_SOCKET)))
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as fh:
+            assert json.loads(fh.read()) == {"returncode": None}
+    assert running_daemon == []
+
+
+def test_not_forwarded_subprocess(running_daemon: list, monkeypatch: MonkeyPatch):
+    # without self_in_process, the daemon would only start a conda subprocess
+    monkeypatch.setattr(context.plugins, SELF_IN_PROCESS_SETTING, False, raising=False)
+    monkeypatch.setattr(sys, "argv", ["conda", "self", "install", "--yes", "x"])
+    args = Namespace(subcommand="install", yes=True, specs=["x"])
+    assert forward_to_daemon(args) is None
+
+    # reset always runs in-process
+    monkeypatch.setattr(sys, "argv", ["conda", "self", "reset", "--yes"])
+    assert forward_to_daemon(Namespace(subcommand="reset", yes=True)) == 3
+    assert [request["argv"] for request in running_daemon] == [["reset", "--yes"]]
+
+
+def test_forward_other_user(
+    running_daemon: list, in_process: None, monkeypatch: MonkeyPatch
+):
+    monkeypatch.setattr(daemon, "_peer_uid", lambda sock: os.getuid() + 1)
+    monkeypatch.setattr(sys, "argv", ["conda", "self", "reset", "--yes"])
+    assert forward_to_daemon(Namespace(subcommand="reset", yes=True)) is None
+    assert running_daemon == []
+
+
+def test_peer_uid(running_daemon: list):
+    import socket
+
+    left, right = socket.socketpair(socket.AF_UNIX)
+    with left, right:
+        assert daemon._peer_uid(left) in (os.getuid(), None)
+
+
+def test_forward_without_daemon(prefix: Path, monkeypatch: MonkeyPatch):
+    monkeypatch.setattr(sys, "argv", ["conda", "self", "update", "--yes"])
+    # a socket left behind by a daemon that died
+    cache_path(prefix, DAEMON_SOCKET).parent.mkdir()
+    cache_path(prefix, DAEMON_SOCKET).touch()
+    assert forward_to_daemon(Namespace(subcommand="update", yes=True)) is None
+
+
+def test_run_request(prefix: Path, monkeypatch: MonkeyPatch, tmp_path: Path):
+    calls = []
+
+    def fake_main_subshell(*args):
+        calls.append((args, os.getcwd()))
+        print("hello")
+        os.system("echo from a child >&2")
+        return 2
+
+    monkeypatch.setattr(
+        import_module("conda.cli.main"), "main_subshell", fake_main_subshell
+    )
+    request = {
+        "argv": ["update", "--yes"],
+        "cwd": str(tmp_path),
+        "environ": daemon._conda_environ(),
+    }
+
+    assert run_request(request) == {
+        "returncode": 2,
+        "stdout": "hello\n",
+        "stderr": "from a child\n",
+    }
+    assert calls == [(("self", "update", "--yes"), str(tmp_path))]
+
+
+def test_run_request_environ_mismatch(prefix: Path):
+    request = {"argv": ["update"], "cwd": str(prefix), "environ": {"CONDA_X": "1"}}
+    assert run_request(request) == {"returncode": None}
+
+
+@pytest.fixture
+def fake_main_subshell(monkeypatch: MonkeyPatch) -> list:
+    calls: list = []
+    monkeypatch.setattr(
+        import_module("conda.cli.main"),
+        "main_subshell",
+        lambda *args: calls.append(args),
+    )
+    return calls
+
+
+def request(prefix: Path) -> dict:
+    return {"argv": ["update"], "cwd": str(prefix), "environ": daemon._conda_environ()}
+
+
+def test_run_request_reloads_plugins(
+    prefix: Path, monkeypatch: MonkeyPatch, loaded: set, fake_main_subshell: list
+):
+    reloads = []
+    monkeypatch.setattr(
+        "conda_self.validate.reload_plugin_packages", lambda: reloads.append(1)
+    )
+    monkeypatch.setattr(daemon, "_loaded", frozenset(loaded))
+    monkeypatch.setattr(daemon, "_stale", False)
+    fingerprints = iter(["a", "b", "b"])
+    monkeypatch.setattr(
+        daemon, "conda_meta_fingerprint", lambda prefix: next(fingerprints)
+    )
+    monkeypatch.setattr(daemon, "_last_fingerprint", "a")
+
+    # the request installed a plugin that is not one of the loaded packages
+    assert run_request(request(prefix))["returncode"] == 0
+    assert reloads == [1]
+    assert not daemon._stale
+
+    # base changed outside of the daemon, and so did conda
+    loaded.add(("conda", "2.0", "0"))
+    monkeypatch.setattr(daemon, "_last_fingerprint", "a")
+    assert run_request(request(prefix)) == {"returncode": None}
+    assert reloads == [1, 1]
+    assert daemon._stale
+    assert len(fake_main_subshell) == 1
+
+
+def test_daemon_exits_after_updating_itself(
+    prefix: Path, monkeypatch: MonkeyPatch, loaded: set
+):
+    def updating_run_request(request):
+        monkeypatch.setattr(daemon, "_stale", True)
+        return {"returncode": 0, "stdout": "", "stderr": ""}
+
+    monkeypatch.setattr(daemon, "run_request", updating_run_request)
+    monkeypatch.setattr(sys, "argv", ["conda", "self", "reset", "--yes"])
+    thread = threading.Thread(target=serve, args=(prefix, 30))
+    thread.start()
+    socket = cache_path(prefix, DAEMON_SOCKET)
+    while thread.is_alive() and not socket.exists():
+        time.sleep(0.01)
+
+    assert forward_to_daemon(Namespace(subcommand="reset", yes=True)) == 0
+    thread.join(timeout=5)
+    assert not thread.is_alive()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.exceptions import ParseError
+from conda.misc import _match_specs_from_explicit
+from conda.models.channel import Channel
+from conda.models.match_spec import MatchSpec
+
+from conda_self.cache import cache_path
+from conda_self.constants import EXPLICIT_CACHE
+from conda_self.explicit import iter_explicit, parse_explicit_line, read_explicit
+
+if TYPE_CHECKING:
+    from pytest import MonkeyPatch
+
+MD5 = "0123456789abcdef0123456789abcdef"
+SHA256 = "0123456789abcdef" * 4
+
+CONDA_FORGE = "https://conda.anaconda.org/conda-forge"
+LINES = [
+    f"{CONDA_FORGE}/noarch/conda-libmamba-solver-25.4.0-pyhd8ed1ab_0.conda#{MD5}",
+    f"https://repo.anaconda.com/pkgs/main/linux-64/python-3.12.1-h1_0.tar.bz2#{SHA256}",
+    f"{CONDA_FORGE}/osx-arm64/libcxx-17.0.6-h5f092b4_0.conda#sha256:{SHA256}",
+    "https://conda.anaconda.org/t/tk-123/conda-forge/linux-64/_openmp_mutex-4.5-2_gnu.conda",
+    "https://mirror.example.com/conda/private/win-64/my-pkg-1!2.0.post1-py_3.conda",
+    "file:///opt/channel/noarch/local-pkg-0.1.dev0-0.conda",
+]
+
+
+@pytest.mark.parametrize("line", LINES)
+def test_parse_explicit_line_matches_matchspec(line: str):
+    package = parse_explicit_line(line)
+    spec = MatchSpec(line)
+
+    assert package.name == spec.name
+    assert package.version == str(spec.version)
+    assert package.build == spec.get("build")
+    assert package.subdir == spec.get("subdir")
+    assert package.filename == spec.get("fn")
+    assert package.url == spec.get("url")
+    channel = spec.get("channel")
+    assert Channel(package.channel).canonical_name == channel.canonical_name
+
+
+@pytest.mark.parametrize("line", LINES)
+def test_parse_explicit_line_checksums_match_conda(line: str):
+    package = parse_explicit_line(line)
+    (spec,) = _match_specs_from_explicit([line])
+
+    assert package.md5 == spec.get("md5")
+    assert package.sha256 == spec.get("sha256")
+    assert package.to_match_spec() == spec
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        f"{CONDA_FORGE}/noarch/pip-24.0.whl",
+        f"{CONDA_FORGE}/noarch/pip-24.0.conda",
+    ],
+    ids=["extension", "no-build"],
+)
+def test_parse_explicit_line_invalid(line: str):
+    with pytest.raises(ParseError):
+        parse_explicit_line(line)
+
+
+def test_iter_explicit_skips_comments():
+    lines = ["# platform: linux-64", "", "@EXPLICIT", LINES[0], "  ", LINES[1]]
+    assert [package.name for package in iter_explicit(lines)] == [
+        "conda-libmamba-solver",
+        "python",
+    ]
+
+
+def test_read_explicit_cache(tmp_path: Path):
+    path = tmp_path / "snapshot.explicit.txt"
+    path.write_text("@EXPLICIT\n" + "\n".join(LINES) + "\n")
+
+    packages = read_explicit(path, tmp_path)
+    assert len(packages) == len(LINES)
+    (cache_file,) = cache_path(tmp_path, EXPLICIT_CACHE).parent.glob("explicit-*")
+
+    # a cached result is used while the content is the same...
+    document = json.loads(cache_file.read_text())
+    document["data"][0][4] = "from-the-cache"
+    cache_file.write_text(json.dumps(document))
+    assert read_explicit(path, tmp_path)[0].name == "from-the-cache"
+    assert read_explicit(path, tmp_path)[1:] == packages[1:]
+
+    # ...and ignored once it changes
+    path.write_text("@EXPLICIT\n" + LINES[0] + "\n")
+    assert [p.name for p in read_explicit(path, tmp_path)] == ["conda-libmamba-solver"]
+    assert read_explicit(path, None) == read_explicit(path, tmp_path)
+
+
+def test_read_explicit_same_file_names(tmp_path: Path):
+    first = tmp_path / "a" / "environment.txt"
+    second = tmp_path / "b" / "environment.txt"
+    for path, line in ((first, LINES[0]), (second, LINES[1])):
+        path.parent.mkdir()
+        path.write_text(f"@EXPLICIT\n{line}\n")
+
+    for _ in range(2):
+        assert read_explicit(first, tmp_path) == list(iter_explicit(LINES[:1]))
+        assert read_explicit(second, tmp_path) == list(iter_explicit(LINES[1:2]))
+    cache_dir = cache_path(tmp_path, EXPLICIT_CACHE).parent
+    assert len(list(cache_dir.glob("explicit-*"))) == 2
+
+
+def test_read_explicit_streams(tmp_path: Path, monkeypatch: MonkeyPatch):
+    path = tmp_path / "snapshot.explicit.txt"
+    path.write_text("@EXPLICIT\n" + "\n".join(LINES) + "\n")
+
+    for method in ("read_bytes", "read_text"):
+
+        def whole_file(self, *args, _read=getattr(Path, method), **kwargs):
+            assert self != path, "the explicit file is read line by line"
+            return _read(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, method, whole_file)
+    assert len(read_explicit(path, tmp_path)) == len(LINES)
+    assert len(read_explicit(path, None)) == len(LINES)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from conda_self.fast_remove import (
+    fast_remove,
+    needs_transaction,
+    plan_removal,
+    remove_files,
+)
+from conda_self.prefix_index import invalidate_prefix_index, prefix_index
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+def install(prefix: Path, name: str, *files: str) -> None:
+    """Write the files of a package and its conda-meta record."""
+    for path in files:
+        (prefix / path).parent.mkdir(parents=True, exist_ok=True)
+        (prefix / path).write_text(name)
+    record = {
+        "name": name,
+        "version": "1.0",
+        "build": "0",
+        "build_number": 0,
+        "channel": "conda-forge",
+        "subdir": "noarch",
+        "fn": f"{name}-1.0-0.conda",
+        "depends": [],
+        "files": list(files),
+    }
+    (prefix / "conda-meta" / f"{name}-1.0-0.json").write_text(json.dumps(record))
+
+
+@pytest.fixture
+def prefix(tmp_path: Path) -> Iterator[Path]:
+    (tmp_path / "conda-meta").mkdir()
+    (tmp_path / "conda-meta" / "history").write_text(
+        "==> 2025-01-01 00:00:00 <==\n"
+        "+conda-forge/noarch::conda-1.0-0\n"
+        "+conda-forge/noarch::big-1.0-0\n"
+        "+conda-forge/noarch::small-1.0-0\n"
+    )
+    install(tmp_path, "conda", "lib/conda/__init__.py", "share/licenses/shared.txt")
+    install(
+        tmp_path,
+        "big",
+        *(f"lib/big/sub_{i % 5}/deep/module_{i}.py" for i in range(50)),
+        "share/licenses/shared.txt",
+    )
+    install(tmp_path, "small", "bin/small", "lib/big/sub_0/small.py")
+    yield tmp_path
+    invalidate_prefix_index(tmp_path)
+
+
+def records(prefix: Path, *names: str) -> list:
+    index = prefix_index(prefix)
+    return [index.get(name) for name in names]
+
+
+def test_plan_removal(prefix: Path):
+    plan = plan_removal(records(prefix, "big", "small"), keep=records(prefix, "conda"))
+
+    assert plan.file_count == 52
+    assert "licenses" not in plan.files.get("share/licenses", [])
+    assert "share/licenses" not in plan.files
+    # deepest first, so that parents are pruned after their children
+    depths = [directory.count("/") for directory in plan.directories]
+    assert depths == sorted(depths, reverse=True)
+    assert plan.directories[-1] in ("bin", "lib")
+
+
+def test_fast_remove(prefix: Path):
+    plan = fast_remove(
+        prefix, records(prefix, "big", "small"), keep=records(prefix, "conda")
+    )
+
+    assert plan.file_count == 52
+    assert not (prefix / "lib" / "big").exists()
+    assert not (prefix / "bin").exists()
+    assert (prefix / "lib" / "conda" / "__init__.py").exists()
+    assert (prefix / "share" / "licenses" / "shared.txt").read_text() == "big"
+    assert sorted(p.name for p in (prefix / "conda-meta").glob("*.json")) == [
+        "conda-1.0-0.json"
+    ]
+    assert [record.name for record in prefix_index(prefix).records()] == ["conda"]
+    history = (prefix / "conda-meta" / "history").read_text()
+    assert history.endswith(
+        "-conda-forge/noarch::big-1.0-0\n-conda-forge/noarch::small-1.0-0\n"
+    )
+
+
+def test_fast_remove_keeps_unowned_files(prefix: Path):
+    (prefix / "lib" / "big" / "sub_1" / "deep" / "cache.pyc").write_text("")
+    fast_remove(prefix, records(prefix, "big"))
+
+    assert (prefix / "lib" / "big" / "sub_1" / "deep" / "cache.pyc").exists()
+    assert not (prefix / "lib" / "big" / "sub_2").exists()
+
+
+def test_remove_files_missing(prefix: Path):
+    plan = plan_removal(records(prefix, "small"))
+    (prefix / "bin" / "small").unlink()
+    assert remove_files(prefix, plan, max_workers=2) == 1
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("bin/.small-pre-unlink.sh", True),
+        ("Scripts/.small-post-unlink.bat", True),
+        ("Menu/small.json", True),
+        ("bin/small", False),
+        ("share/Menu/small.json", False),
+    ],
+)
+def test_needs_transaction(prefix: Path, path: str, expected: bool):
+    install(prefix, "scripted", path)
+    assert needs_transaction(*records(prefix, "scripted")) is expected
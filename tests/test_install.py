@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import sys
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.base.context import context
+from conda.exceptions import PackagesNotFoundError
+
+from conda_self import install, plugin
+from conda_self.constants import (
+    PLUGINS_ONLY_ENV_VAR,
+    PROGRESS_ENV_VAR,
+    SELF_IN_PROCESS_SETTING,
+)
+from conda_self.exceptions import NotAPluginError
+from conda_self.install import (
+    in_process_enabled,
+    install_specs_in_protected_env,
+    uninstall_specs_in_protected_env,
+)
+from conda_self.validate import PluginCheckAction
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest import MonkeyPatch
+
+
+class FakeTxn:
+    def __init__(self, unlink=(), link=()):
+        self.prefix_setups = {
+            sys.prefix: SimpleNamespace(unlink_precs=unlink, link_precs=link)
+        }
+        self.nothing_to_do = not (unlink or link)
+        self.executed = False
+        self.downloaded = False
+
+    def print_transaction_summary(self):
+        pass
+
+    def download_and_extract(self):
+        self.downloaded = True
+
+    def execute(self):
+        self.executed = True
+
+
+@pytest.fixture
+def in_process(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(context.plugins, SELF_IN_PROCESS_SETTING, True, raising=False)
+    monkeypatch.setattr(install, "on_win", False)
+
+
+@pytest.fixture
+def subprocesses(monkeypatch: MonkeyPatch) -> list[list[str]]:
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return 0
+
+    monkeypatch.setattr(install, "_run", fake_run)
+    return calls
+
+
+@pytest.fixture
+def solver(monkeypatch: MonkeyPatch) -> SimpleNamespace:
+    """Record solver calls in ``calls``; set the solution with ``txn``."""
+    solver = SimpleNamespace(calls=[], txn=FakeTxn())
+
+    class FakeSolver:
+        def __init__(self, prefix, channels, subdirs, specs_to_add, specs_to_remove):
+            solver.calls.append(
+                {
+                    "add": [str(spec) for spec in specs_to_add],
+                    "remove": [str(spec) for spec in specs_to_remove],
+                }
+            )
+
+        def solve_for_transaction(self, **kwargs):
+            return solver.txn
+
+    monkeypatch.setattr(
+        context.plugin_manager, "get_cached_solver_backend", lambda name: FakeSolver
+    )
+    return solver
+
+
+@pytest.mark.parametrize(
+    "setting, specs, json, expected",
+    [
+        (False, ["conda-index"], False, False),
+        (True, ["conda-index"], False, True),
+        (True, ["conda-index"], True, False),
+        (True, ["conda-index", "conda >=25"], False, False),
+        (True, ["python=3.12"], False, False),
+    ],
+    ids=["disabled", "enabled", "json", "conda-spec", "python-spec"],
+)
+def test_in_process_enabled(monkeypatch: MonkeyPatch, setting, specs, json, expected):
+    monkeypatch.setattr(
+        context.plugins, SELF_IN_PROCESS_SETTING, setting, raising=False
+    )
+    monkeypatch.setattr(install, "on_win", False)
+    assert in_process_enabled(specs, json) is expected
+
+
+def test_install_in_process(in_process, solver, subprocesses):
+    txn = FakeTxn(link=[SimpleNamespace(name="conda-index")])
+    solver.txn = txn
+
+    assert install_specs_in_protected_env(["conda-index"], yes=True) == 0
+    assert txn.executed
+    assert solver.calls[0]["add"] == ["conda-index"]
+    assert subprocesses == []
+
+
+def test_install_in_process_dry_run(in_process, solver, subprocesses):
+    txn = FakeTxn(link=[SimpleNamespace(name="conda-index")])
+    solver.txn = txn
+
+    assert install_specs_in_protected_env(["conda-index"], dry_run=True) == 0
+    assert not txn.executed
+    assert subprocesses == []
+
+
+def test_install_falls_back_when_solution_is_isolated(in_process, solver, subprocesses):
+    # the plugin pulls in a newer conda: let a separate process replace it
+    txn = FakeTxn(
+        unlink=[SimpleNamespace(name="conda")],
+        link=[SimpleNamespace(name="conda"), SimpleNamespace(name="conda-index")],
+    )
+    solver.txn = txn
+
+    assert install_specs_in_protected_env(["conda-index"], yes=True) == 0
+    assert not txn.executed
+    assert len(subprocesses) == 1
+
+
+def test_install_subprocess_by_default(solver, subprocesses):
+    assert install_specs_in_protected_env(["conda-index"]) == 0
+    assert solver.calls == []
+    assert subprocesses[0][1:4] == ["-m", "conda", "install"]
+
+
+def test_remove_in_process(in_process, solver, subprocesses):
+    txn = FakeTxn(unlink=[SimpleNamespace(name="conda-index")])
+    solver.txn = txn
+
+    assert uninstall_specs_in_protected_env(["conda-index"]) == 0
+    assert txn.executed
+    assert solver.calls[0]["remove"] == ["conda-index"]
+    assert subprocesses == []
+
+
+def test_remove_in_process_not_installed(in_process, solver, subprocesses):
+    with pytest.raises(PackagesNotFoundError):
+        uninstall_specs_in_protected_env(["conda-index"])
+    assert subprocesses == []
+
+
+def plugin_record(root: Path, name: str, entry_points: str) -> SimpleNamespace:
+    """A package cache record of an extracted package with a dist-info."""
+    dist_info = root / name / "site-packages" / f"{name}-1.0.dist-info"
+    dist_info.mkdir(parents=True)
+    (dist_info / "entry_points.txt").write_text(entry_points)
+    return SimpleNamespace(
+        name=name,
+        extracted_package_dir=str(root / name),
+        files=[f"site-packages/{name}-1.0.dist-info/entry_points.txt"],
+    )
+
+
+@pytest.fixture
+def extracted(monkeypatch: MonkeyPatch, tmp_path: Path) -> dict:
+    """Package cache records returned by ``extracted_records``, by name."""
+    records: dict = {}
+    monkeypatch.setattr(
+        install,
+        "extracted_records",
+        lambda txn, names: [records[name] for name in names if name in records],
+    )
+    return records
+
+
+@pytest.fixture
+def installed(monkeypatch: MonkeyPatch) -> dict:
+    """Records of base, by name."""
+    records: dict = {}
+    monkeypatch.setattr(
+        install, "prefix_index", lambda prefix: SimpleNamespace(get=records.get)
+    )
+    return records
+
+
+def test_install_in_process_rejects_non_plugin_before_linking(
+    in_process, solver, subprocesses, extracted, tmp_path: Path
+):
+    extracted["requests"] = plugin_record(tmp_path, "requests", "[console_scripts]\n")
+    txn = FakeTxn(link=[SimpleNamespace(name="requests")])
+    solver.txn = txn
+
+    with pytest.raises(NotAPluginError):
+        install_specs_in_protected_env(["requests"], yes=True, plugins_only=True)
+    assert not txn.executed
+    assert subprocesses == []
+
+
+def test_install_in_process_validates_plugin(
+    in_process, solver, subprocesses, extracted, tmp_path: Path
+):
+    extracted["conda-index"] = plugin_record(
+        tmp_path, "conda-index", "[conda]\nindex = conda_index.plugin\n"
+    )
+    txn = FakeTxn(link=[SimpleNamespace(name="conda-index")])
+    solver.txn = txn
+
+    assert (
+        install_specs_in_protected_env(["conda-index"], yes=True, plugins_only=True)
+        == 0
+    )
+    assert txn.executed
+
+
+def test_install_subprocess_checks_plugins_in_child(
+    subprocesses, monkeypatch: MonkeyPatch
+):
+    envs = []
+
+    def fake_run(cmd, env=None, **kwargs):
+        subprocesses.append(cmd)
+        envs.append(env)
+        return 1  # the child failed with a NotAPluginError
+
+    monkeypatch.setattr(install, "_run", fake_run)
+
+    assert install_specs_in_protected_env(["requests", "six"], plugins_only=True) == 1
+    assert envs == [{PLUGINS_ONLY_ENV_VAR: "requests,six"}]
+    # nothing was linked: nothing to roll back
+    assert len(subprocesses) == 1
+
+
+def check_action(link_precs: list, prefix: Path) -> PluginCheckAction:
+    return PluginCheckAction(None, str(prefix), (), link_precs, (), (), ())
+
+
+def test_plugin_check_action(tmp_path: Path, monkeypatch: MonkeyPatch):
+    extracted = {
+        "conda-index": plugin_record(tmp_path, "conda-index", "[conda]\nx = y\n"),
+        "requests": plugin_record(tmp_path, "requests", "[console_scripts]\n"),
+    }
+    monkeypatch.setattr(
+        "conda.core.package_cache_data.PackageCacheData.get_entry_to_link",
+        lambda record: extracted[record.name],
+    )
+    installed = {"six": plugin_record(tmp_path, "six", "")}
+    monkeypatch.setattr(
+        "conda_self.prefix_index.prefix_index",
+        lambda prefix: SimpleNamespace(get=installed.get),
+    )
+    link_precs = [SimpleNamespace(name=name) for name in extracted]
+
+    # not run by conda-self: nothing to check
+    monkeypatch.delenv(PLUGINS_ONLY_ENV_VAR, raising=False)
+    assert check_action(link_precs, tmp_path).verify() is None
+
+    monkeypatch.setenv(PLUGINS_ONLY_ENV_VAR, "conda-index")
+    assert check_action(link_precs, tmp_path).verify() is None
+
+    # linked by the transaction, or already installed
+    for names in ("conda-index,requests", "conda-index,six"):
+        monkeypatch.setenv(PLUGINS_ONLY_ENV_VAR, names)
+        action = check_action(link_precs, tmp_path)
+        error = action.verify()
+        assert isinstance(error, NotAPluginError)
+        assert error.specs == [names.split(",")[1]]
+        assert action.verified
+
+
+def test_prefetch_in_process(
+    in_process, solver, subprocesses, monkeypatch: MonkeyPatch
+):
+    # nothing is linked: conda itself can be prefetched in-process, unprompted
+    txn = FakeTxn(
+        unlink=[SimpleNamespace(name="conda")], link=[SimpleNamespace(name="conda")]
+    )
+    solver.txn = txn
+    monkeypatch.setattr("conda.reporters.confirm_yn", pytest.fail)
+
+    assert install_specs_in_protected_env(["conda"], download_only=True) == 0
+    assert txn.downloaded
+    assert not txn.executed
+    assert subprocesses == []
+
+
+def test_prefetch_subprocess(solver, subprocesses):
+    assert install_specs_in_protected_env(["conda"], download_only=True) == 0
+    assert "--download-only" in subprocesses[0]
+    assert "--yes" in subprocesses[0]
+
+
+def test_low_priority_runs_subprocess(
+    in_process, solver, subprocesses, monkeypatch: MonkeyPatch
+):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(kwargs)
+        return 0
+
+    monkeypatch.setattr(install, "_run", fake_run)
+    assert (
+        install_specs_in_protected_env(
+            ["conda-index"], download_only=True, low_priority=True
+        )
+        == 0
+    )
+    assert solver.calls == []
+    assert calls[0]["low_priority"] is True
+
+
+@pytest.mark.parametrize(
+    "environ, expected",
+    [
+        ({}, []),
+        ({PLUGINS_ONLY_ENV_VAR: "conda-index"}, ["conda-self-plugins-only"]),
+        ({PROGRESS_ENV_VAR: "1"}, ["conda-self-progress"] * 4),
+    ],
+    ids=["other-conda", "plugins-only", "progress"],
+)
+def test_transaction_hooks_only_in_children(
+    monkeypatch: MonkeyPatch, environ: dict, expected: list
+):
+    for name in (PLUGINS_ONLY_ENV_VAR, PROGRESS_ENV_VAR):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+
+    hooks = (
+        plugin.conda_pre_solves,
+        plugin.conda_post_solves,
+        plugin.conda_pre_transaction_actions,
+        plugin.conda_post_transaction_actions,
+    )
+    assert [result.name for hook in hooks for result in hook()] == expected
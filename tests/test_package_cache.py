@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.base.context import context
+from conda.exceptions import DryRunExit
+
+from conda_self import package_cache
+from conda_self.explicit import iter_explicit, parse_explicit_line
+from conda_self.package_cache import PackageCacheIndex, resolve_explicit
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest import MonkeyPatch
+
+CHANNEL = "https://conda.example.com/channel/noarch"
+
+
+def cache_package(pkgs_dir: Path, name: str, content: bytes = b"tarball") -> str:
+    """Put an extracted package and its tarball in ``pkgs_dir``; return its md5."""
+    filename = f"{name}-1.0-0.tar.bz2"
+    (pkgs_dir / filename).write_bytes(content)
+    md5 = hashlib.md5(content).hexdigest()
+    record = {
+        "name": name,
+        "version": "1.0",
+        "build": "0",
+        "build_number": 0,
+        "subdir": "noarch",
+        "depends": [],
+        "fn": filename,
+        "url": f"{CHANNEL}/{filename}",
+        "md5": md5,
+        "channel": "https://conda.example.com/channel",
+    }
+    info = pkgs_dir / f"{name}-1.0-0" / "info"
+    info.mkdir(parents=True)
+    (info / "index.json").write_text(json.dumps(record))
+    (info / "repodata_record.json").write_text(json.dumps(record))
+    return md5
+
+
+@pytest.fixture
+def pkgs_dir(tmp_path: Path) -> Path:
+    pkgs_dir = tmp_path / "pkgs"
+    pkgs_dir.mkdir()
+    return pkgs_dir
+
+
+@pytest.fixture
+def fetches(monkeypatch: MonkeyPatch) -> list:
+    """File names of the specs fetched by ``ProgressiveFetchExtract`` (no-op)."""
+    fetches: list = []
+
+    class FakeProgressiveFetchExtract:
+        def __init__(self, specs):
+            self.specs = specs
+
+        def execute(self):
+            fetches.extend(spec.get("fn") for spec in self.specs)
+
+    monkeypatch.setattr(
+        "conda.core.package_cache_data.ProgressiveFetchExtract",
+        FakeProgressiveFetchExtract,
+    )
+    return fetches
+
+
+def test_lookup(pkgs_dir: Path):
+    md5 = cache_package(pkgs_dir, "a")
+    index = PackageCacheIndex.from_pkgs_dirs([str(pkgs_dir)])
+    mirror = "https://mirror.example.com/noarch/a-1.0-0.tar.bz2"
+
+    assert index.lookup(parse_explicit_line(f"{CHANNEL}/a-1.0-0.tar.bz2"))
+    # another URL: only accepted when the hash says it is the same package
+    assert index.lookup(parse_explicit_line(f"{mirror}#{md5}"))
+    assert index.lookup(parse_explicit_line(mirror)) is None
+    assert index.lookup(parse_explicit_line(f"{mirror}#{'0' * 32}")) is None
+
+
+def test_resolve_explicit_from_cache(pkgs_dir: Path, fetches: list):
+    lines = [
+        "@EXPLICIT",
+        *(
+            f"{CHANNEL}/{name}-1.0-0.tar.bz2#{cache_package(pkgs_dir, name)}"
+            for name in ("a", "b", "c")
+        ),
+    ]
+    index = PackageCacheIndex.from_pkgs_dirs([str(pkgs_dir)])
+
+    records = resolve_explicit(iter_explicit(lines), index)
+    assert [record.name for record in records] == ["a", "b", "c"]
+    assert fetches == []
+
+
+def test_resolve_explicit_fetches_mismatches_only(
+    pkgs_dir: Path, fetches: list, monkeypatch: MonkeyPatch
+):
+    md5 = cache_package(pkgs_dir, "a")
+    cache_package(pkgs_dir, "b")
+    (pkgs_dir / "b-1.0-0.tar.bz2").write_bytes(b"corrupted")
+    lines = [
+        f"{CHANNEL}/a-1.0-0.tar.bz2#{md5}",
+        f"{CHANNEL}/b-1.0-0.tar.bz2",
+        f"{CHANNEL}/d-1.0-0.tar.bz2",
+    ]
+    index = PackageCacheIndex.from_pkgs_dirs([str(pkgs_dir)])
+    # whatever was fetched, the package cache has a record for it
+    monkeypatch.setattr(
+        "conda.core.package_cache_data.PackageCacheData.query_all",
+        lambda spec: iter(index.by_md5[md5]),
+    )
+
+    resolve_explicit(iter_explicit(lines), index)
+    assert fetches == ["b-1.0-0.tar.bz2", "d-1.0-0.tar.bz2"]
+
+
+def test_resolve_explicit_dry_run(
+    pkgs_dir: Path, fetches: list, monkeypatch: MonkeyPatch
+):
+    monkeypatch.setattr(context, "dry_run", True, raising=False)
+    monkeypatch.setattr(package_cache, "verify_tarballs", pytest.fail)
+    with pytest.raises(DryRunExit):
+        resolve_explicit(iter_explicit([f"{CHANNEL}/a-1.0-0.tar.bz2"]))
+    assert fetches == []
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import dataclass, field
 
 import pytest
 from conda.models.records import PrefixRecord
 
+from conda_self import package_info
 from conda_self.exceptions import NoDistInfoDirFound
-from conda_self.package_info import PackageInfo
+from conda_self.package_info import (
+    CaseSensitiveConfigParser,
+    PackageInfo,
+    find_dist_info_dirs,
+    iter_paths_json,
+    read_entry_points,
+)
 
 
 @dataclass
@@ -196,3 +204,352 @@ def test_entry_points_non_conda(tmp_path):
     ep = PackageInfo(dist_info).entry_points()
     assert "conda" not in ep
     assert "console_scripts" in ep
+
+
+def test_scan_records(tmp_path):
+    records = []
+    for i in range(20):
+        dist_info = tmp_path / f"pkg{i}" / "site-packages" / f"pkg{i}-1.0.dist-info"
+        dist_info.mkdir(parents=True)
+        if i % 2:
+            (dist_info / "entry_points.txt").write_text(f"[conda]\np{i} = pkg{i}\n")
+        records.append(
+            FakeCacheRecord(
+                name=f"pkg{i}",
+                extracted_package_dir=str(tmp_path / f"pkg{i}"),
+                files=[f"site-packages/pkg{i}-1.0.dist-info/METADATA"],
+            )
+        )
+    (tmp_path / "empty").mkdir()
+    records.insert(5, FakeCacheRecord("empty", str(tmp_path / "empty")))
+
+    scans = PackageInfo.scan_records(records, max_workers=4)
+
+    assert [scan.record for scan in scans] == records
+    assert isinstance(scans[5].error, NoDistInfoDirFound)
+    assert scans[5].package_infos == []
+    for scan in scans[:5] + scans[6:]:
+        assert scan.error is None
+        assert len(scan.package_infos) == 1
+        i = int(scan.record.name[3:])
+        assert scan.entry_points == ({"conda": {f"p{i}": f"pkg{i}"}} if i % 2 else {})
+
+
+@pytest.mark.parametrize("max_workers", (1, None))
+def test_scan_records_matches_scan_record(tmp_path, cache_record, max_workers):
+    dist_info = tmp_path / "pkg-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "entry_points.txt").write_text("[conda]\nplugin = pkg.plugin\n")
+    record = cache_record()
+
+    (scan,) = PackageInfo.scan_records([record], max_workers=max_workers)
+
+    assert scan.record is record
+    assert [info.dist_info_path for info in scan.package_infos] == [dist_info]
+    assert scan.entry_points == {"conda": {"plugin": "pkg.plugin"}}
+
+
+ENTRY_POINTS_SAMPLES = {
+    "single": "[conda]\nplugin = pkg.plugin\n",
+    "multiple": (
+        "[console_scripts]\n"
+        "pkg = pkg.cli:main\n"
+        "Pkg-Upper = pkg.cli:upper [extra]\n"
+        "\n"
+        "[conda]\n"
+        "plugin=pkg.plugin\n"
+        "[pytest11]\n"
+        "pkg = pkg.pytest_plugin\n"
+    ),
+    "comments": (
+        "# a comment\n"
+        "; another comment\n"
+        "[conda]\n"
+        "  # indented comment\n"
+        "plugin = pkg.plugin  \n"
+        "\n"
+        "\n"
+    ),
+    "continuation": "[conda]\nplugin = pkg.plugin\n  more\nother = x\n",
+    "empty-group": "[conda]\n[console_scripts]\nx = y\n",
+    "empty": "",
+}
+
+
+@pytest.mark.parametrize(
+    "content", ENTRY_POINTS_SAMPLES.values(), ids=ENTRY_POINTS_SAMPLES.keys()
+)
+def test_read_entry_points_parity_with_configparser(tmp_path, content):
+    path = tmp_path / "entry_points.txt"
+    path.write_text(content)
+
+    config = CaseSensitiveConfigParser()
+    config.read(path)
+    expected = {section: dict(config[section]) for section in config.sections()}
+
+    assert read_entry_points(path) == expected
+    for group in (*expected, "missing"):
+        assert read_entry_points(path, group) == (
+            {group: expected[group]} if group in expected else {}
+        )
+
+
+def test_read_entry_points_stops_after_group(tmp_path):
+    path = tmp_path / "entry_points.txt"
+    path.write_bytes(
+        b"[conda]\nplugin = pkg.plugin\n[console_scripts]\nbroken = \xff\xfe\n"
+    )
+
+    assert read_entry_points(path, "conda") == {"conda": {"plugin": "pkg.plugin"}}
+    with pytest.raises(UnicodeDecodeError):
+        read_entry_points(path)
+
+
+def test_read_entry_points_missing_file(tmp_path):
+    assert read_entry_points(tmp_path / "entry_points.txt") == {}
+    assert read_entry_points(tmp_path / "entry_points.txt", "conda") == {}
+
+
+def test_entry_point_group(tmp_path):
+    dist_info = tmp_path / "pkg-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "entry_points.txt").write_text(ENTRY_POINTS_SAMPLES["multiple"])
+    info = PackageInfo(dist_info)
+
+    assert info.entry_point_group("conda") == {"plugin": "pkg.plugin"}
+    assert info.entry_point_group("missing") is None
+
+
+@pytest.fixture
+def entry_points_reads(monkeypatch):
+    """Count the parses of ``entry_points.txt`` files, starting from a cold LRU."""
+    package_info._cached_entry_points.cache_clear()
+    calls = []
+
+    def counting_read_entry_points(path, group=None):
+        calls.append((path, group))
+        return read_entry_points(path, group)
+
+    monkeypatch.setattr(package_info, "read_entry_points", counting_read_entry_points)
+    yield calls
+    package_info._cached_entry_points.cache_clear()
+
+
+def test_package_info_has_slots(tmp_path):
+    info = PackageInfo(tmp_path)
+    assert not hasattr(info, "__dict__")
+    with pytest.raises(AttributeError):
+        info.unexpected = True  # type: ignore[attr-defined]
+
+
+def test_entry_points_memoized(tmp_path, entry_points_reads):
+    dist_info = tmp_path / "pkg-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "entry_points.txt").write_text(ENTRY_POINTS_SAMPLES["multiple"])
+
+    info = PackageInfo(dist_info)
+    assert info.entry_points() is info.entry_points()
+    assert info.entry_point_group("conda") == {"plugin": "pkg.plugin"}
+    # a second instance for the same file hits the process-wide LRU
+    other = PackageInfo(dist_info)
+    assert other.entry_points() == info.entry_points()
+    assert other.entry_points() is not info.entry_points()
+    assert len(entry_points_reads) == 1
+
+
+def test_entry_points_lru_invalidated_on_change(tmp_path, entry_points_reads):
+    dist_info = tmp_path / "pkg-1.0.dist-info"
+    dist_info.mkdir()
+    path = dist_info / "entry_points.txt"
+    path.write_text("[conda]\nplugin = pkg.plugin\n")
+    assert PackageInfo(dist_info).entry_point_group("conda") == {"plugin": "pkg.plugin"}
+
+    path.write_text("[console_scripts]\npkg = pkg.cli:main\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert PackageInfo(dist_info).entry_point_group("conda") is None
+    assert len(entry_points_reads) == 2
+
+
+def test_entry_points_cached_copies(tmp_path, entry_points_reads):
+    dist_info = tmp_path / "pkg-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "entry_points.txt").write_text("[conda]\nplugin = pkg.plugin\n")
+
+    PackageInfo(dist_info).entry_points()["conda"]["plugin"] = "tampered"
+    assert PackageInfo(dist_info).entry_points() == {"conda": {"plugin": "pkg.plugin"}}
+
+
+@pytest.mark.parametrize("max_workers", (1, None))
+def test_from_records(tmp_path, max_workers):
+    records = []
+    for name in ("alpha", "beta"):
+        dist_info = tmp_path / name / "site-packages" / f"{name}-1.0.dist-info"
+        dist_info.mkdir(parents=True)
+        records.append(
+            FakeCacheRecord(
+                name=name,
+                extracted_package_dir=str(tmp_path / name),
+                files=[f"site-packages/{name}-1.0.dist-info/METADATA"],
+            )
+        )
+    (tmp_path / "gamma").mkdir()
+    records.append(
+        FakeCacheRecord(
+            name="gamma", extracted_package_dir=str(tmp_path / "gamma"), files=[]
+        )
+    )
+
+    found = PackageInfo.from_records(records, max_workers=max_workers)
+
+    assert list(found) == ["alpha", "beta", "gamma"]
+    assert [info.dist_info_path.name for info in found["alpha"]] == [
+        "alpha-1.0.dist-info"
+    ]
+    assert found["gamma"] == []
+
+
+def _paths_json(paths: list[str], **extra) -> dict:
+    return {
+        **extra,
+        "paths": [
+            {"_path": p, "path_type": "hardlink", "sha256": "x", "size_in_bytes": 1}
+            for p in paths
+        ],
+    }
+
+
+PATHS = [
+    "lib/python3.12/site-packages/pkg-1.0.dist-info/METADATA",
+    'lib/python3.12/site-packages/pkg/da"ta\\file.txt',
+    "share/ünïcode/ファイル.txt",
+    *(f"lib/python3.12/site-packages/pkg/module_{i}.py" for i in range(200)),
+]
+
+
+@pytest.mark.parametrize("chunk_size", (1, 7, 64, 64 * 1024))
+@pytest.mark.parametrize("indent", (None, 2))
+@pytest.mark.parametrize(
+    "document",
+    (
+        _paths_json(PATHS, paths_version=1),
+        {**_paths_json(PATHS), "paths_version": 12345},
+        _paths_json(PATHS, extra={"nested": [1, {"_path": "x"}], "n": None}),
+        _paths_json([]),
+        {"paths_version": 1},
+        {},
+    ),
+    ids=("version-first", "version-last", "nested", "empty", "no-paths", "empty-doc"),
+)
+def test_iter_paths_json(tmp_path, chunk_size, indent, document):
+    path = tmp_path / "paths.json"
+    path.write_text(json.dumps(document, indent=indent), encoding="utf-8")
+
+    expected = [entry["_path"] for entry in document.get("paths", [])]
+    assert list(iter_paths_json(path, chunk_size=chunk_size)) == expected
+
+
+def test_iter_paths_json_stops_after_paths(tmp_path):
+    path = tmp_path / "paths.json"
+    path.write_text(json.dumps(_paths_json(["a", "b"]))[:-1] + ', "x": garbage')
+
+    assert list(iter_paths_json(path, chunk_size=4)) == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    "content", ("", "[]", '{"paths": [{"_path": "a"}', '{"paths": {}}')
+)
+def test_iter_paths_json_malformed(tmp_path, content):
+    path = tmp_path / "paths.json"
+    path.write_text(content)
+
+    with pytest.raises(ValueError):
+        list(iter_paths_json(path, chunk_size=4))
+
+
+@pytest.mark.parametrize("manifest", ["info_files", "paths_json"])
+def test_iter_manifest_is_lazy(tmp_path, manifest):
+    info_dir = tmp_path / "info"
+    info_dir.mkdir()
+    if manifest == "paths_json":
+        (info_dir / "paths.json").write_text(json.dumps(_paths_json(PATHS)))
+    else:
+        (info_dir / "files").write_text("\n".join(PATHS) + "\n")
+
+    paths = PackageInfo.iter_manifest(str(tmp_path))
+
+    assert next(paths) == PATHS[0]
+    assert list(paths) == PATHS[1:]
+    assert PackageInfo.read_manifest(str(tmp_path)) == PATHS
+
+
+@pytest.fixture
+def scandir_calls(monkeypatch):
+    """Record the directories listed with ``os.scandir``."""
+    calls = []
+    scandir = os.scandir
+
+    def counting_scandir(path):
+        calls.append(os.path.relpath(path))
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    return calls
+
+
+def _deep_tree(root, width: int = 20, depth: int = 5):
+    """A data tree with ``width`` ** ``depth``-ish directories, none dist-info."""
+    for i in range(width):
+        (root / "share" / "data" / f"d{i}" / "a" / "b" / "c").mkdir(parents=True)
+
+
+@pytest.mark.parametrize(
+    "dist_info_relpath",
+    [
+        "pkg-1.0.dist-info",
+        "site-packages/pkg-1.0.dist-info",
+        "Lib/site-packages/pkg-1.0.dist-info",
+        "lib/python3.12/site-packages/pkg-1.0.dist-info",
+    ],
+)
+def test_find_dist_info_dirs_known_layouts(tmp_path, scandir_calls, dist_info_relpath):
+    (tmp_path / dist_info_relpath).mkdir(parents=True)
+    _deep_tree(tmp_path)
+
+    assert find_dist_info_dirs(str(tmp_path)) == {os.path.normpath(dist_info_relpath)}
+    # only the known layouts are listed, never the data tree
+    assert len(scandir_calls) <= 5
+    assert not any("share" in call for call in scandir_calls)
+
+
+def test_find_dist_info_dirs_bounded_walk(tmp_path, scandir_calls):
+    (tmp_path / "a" / "b" / "pkg-1.0.dist-info").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "c" / "d" / "e" / "f" / "deep-1.0.dist-info").mkdir(
+        parents=True
+    )
+
+    assert find_dist_info_dirs(str(tmp_path), max_depth=3) == {
+        os.path.join("a", "b", "pkg-1.0.dist-info")
+    }
+    assert not any(call.endswith("e") for call in scandir_calls)
+
+    assert find_dist_info_dirs(str(tmp_path), max_depth=None) == {
+        os.path.join("a", "b", "pkg-1.0.dist-info"),
+        os.path.join("a", "b", "c", "d", "e", "f", "deep-1.0.dist-info"),
+    }
+
+
+def test_find_dist_info_dirs_skips_files_and_dist_info_contents(tmp_path):
+    (tmp_path / "fake.dist-info").write_text("not a directory")
+    nested = tmp_path / "x" / "pkg-1.0.dist-info" / "inner-1.0.dist-info"
+    nested.mkdir(parents=True)
+
+    assert find_dist_info_dirs(str(tmp_path)) == {
+        os.path.join("x", "pkg-1.0.dist-info")
+    }
+
+
+def test_find_dist_info_dirs_none(tmp_path):
+    _deep_tree(tmp_path)
+
+    assert find_dist_info_dirs(str(tmp_path)) == set()
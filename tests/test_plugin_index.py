@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.models.records import PrefixRecord
+
+from conda_self import plugin_index
+from conda_self.cache import cache_path, read_cache
+from conda_self.constants import PLUGIN_INDEX_CACHE
+from conda_self.package_info import PackageInfo
+from conda_self.plugin_index import (
+    conda_plugins,
+    record_key,
+    site_packages_plugins,
+    update_index,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest import MonkeyPatch
+
+SITE_PACKAGES = "lib/python3.12/site-packages"
+
+
+@pytest.fixture
+def prefix(tmp_path: Path, monkeypatch: MonkeyPatch) -> Path:
+    monkeypatch.setattr(sys, "prefix", str(tmp_path))
+    return tmp_path
+
+
+def make_record(
+    prefix: Path,
+    name: str,
+    entry_points: str | None = None,
+    build: str = "0",
+    sha256: str | None = "abc",
+) -> PrefixRecord:
+    files = [f"{SITE_PACKAGES}/{name}/__init__.py"]
+    if entry_points is not None:
+        dist_info = prefix / SITE_PACKAGES / f"{name}-1.0.dist-info"
+        dist_info.mkdir(parents=True)
+        (dist_info / "entry_points.txt").write_text(entry_points)
+        files.append(f"{SITE_PACKAGES}/{name}-1.0.dist-info/entry_points.txt")
+    return PrefixRecord(
+        name=name,
+        version="1.0",
+        build=build,
+        build_number=0,
+        sha256=sha256,
+        files=files,
+    )
+
+
+@pytest.fixture
+def records(prefix: Path) -> list[PrefixRecord]:
+    return [
+        make_record(prefix, "conda-libmamba-solver", "[conda]\nsolver = cls.p\n"),
+        make_record(prefix, "requests", "[console_scripts]\nx = y:z\n"),
+        make_record(prefix, "openssl"),
+    ]
+
+
+def test_record_key(prefix: Path):
+    assert record_key(make_record(prefix, "a", sha256="123")) == "a/0/123"
+    assert record_key(make_record(prefix, "b", sha256=None)) == "b/0/1.0"
+
+
+def test_update_index(prefix: Path, records: list[PrefixRecord]):
+    entries = update_index(records, prefix)
+
+    assert entries == {
+        "conda-libmamba-solver": {
+            "dist_info": True,
+            "conda": {"solver": "cls.p"},
+        },
+        "requests": {"dist_info": True, "conda": {}},
+        "openssl": {"dist_info": False, "conda": {}},
+    }
+    assert conda_plugins(records, prefix) == {"conda-libmamba-solver"}
+
+
+def test_update_index_is_incremental(
+    prefix: Path, records: list[PrefixRecord], monkeypatch: MonkeyPatch
+):
+    update_index(records, prefix)
+
+    inspected = []
+    scan_record = PackageInfo.scan_record
+
+    def counting_scan_record(cls, record, group=None):
+        inspected.append(record.name)
+        return scan_record(record, group)
+
+    monkeypatch.setattr(PackageInfo, "scan_record", classmethod(counting_scan_record))
+
+    assert conda_plugins(records, prefix) == {"conda-libmamba-solver"}
+    assert inspected == []
+
+    # a rebuilt package is inspected again, the others are not
+    rebuilt = make_record(prefix, "anaconda-anon-usage", "[conda]\nx = y\n", "1")
+    records = [*records, rebuilt]
+    assert conda_plugins(records, prefix) == {
+        "conda-libmamba-solver",
+        "anaconda-anon-usage",
+    }
+    assert inspected == ["anaconda-anon-usage"]
+
+
+def test_update_index_drops_removed_records(prefix: Path, records: list[PrefixRecord]):
+    update_index(records, prefix)
+    update_index(records[1:], prefix)
+
+    stored = read_cache(
+        cache_path(prefix, PLUGIN_INDEX_CACHE),
+        plugin_index.cache_key(PLUGIN_INDEX_CACHE),
+    )
+    assert stored is not None
+    assert sorted(stored) == sorted(record_key(r) for r in records[1:])
+
+
+def make_dist_info(prefix: Path, name: str, entry_points: str | None = None) -> Path:
+    dist_info = prefix / SITE_PACKAGES / f"{name}-1.0.dist-info"
+    dist_info.mkdir(parents=True)
+    if entry_points is not None:
+        (dist_info / "entry_points.txt").write_text(entry_points)
+    return dist_info
+
+
+@pytest.fixture
+def parsed(monkeypatch: MonkeyPatch) -> list[str]:
+    """Names of the dist-info directories whose entry points get parsed."""
+    calls = []
+    entry_point_group = PackageInfo.entry_point_group
+
+    def counting_entry_point_group(self, group):
+        calls.append(self.dist_info_path.name)
+        return entry_point_group(self, group)
+
+    monkeypatch.setattr(PackageInfo, "entry_point_group", counting_entry_point_group)
+    return calls
+
+
+def test_site_packages_plugins(prefix: Path, parsed: list[str]):
+    make_dist_info(prefix, "conda_libmamba_solver", "[conda]\nsolver = cls.p\n")
+    make_dist_info(prefix, "requests", "[console_scripts]\nx = y:z\n")
+    make_dist_info(prefix, "six")
+    (prefix / SITE_PACKAGES / "six.py").touch()
+
+    assert site_packages_plugins(prefix) == {
+        "conda_libmamba_solver": {"solver": "cls.p"}
+    }
+    assert sorted(parsed) == [
+        "conda_libmamba_solver-1.0.dist-info",
+        "requests-1.0.dist-info",
+        "six-1.0.dist-info",
+    ]
+
+
+def test_site_packages_plugins_is_incremental(prefix: Path, parsed: list[str]):
+    make_dist_info(prefix, "conda_libmamba_solver", "[conda]\nsolver = cls.p\n")
+    make_dist_info(prefix, "requests")
+    site_packages_plugins(prefix)
+    parsed.clear()
+
+    # unchanged directory mtime: nothing is parsed again
+    assert site_packages_plugins(prefix) == {
+        "conda_libmamba_solver": {"solver": "cls.p"}
+    }
+    assert parsed == []
+
+    # only the new distribution is parsed after an install
+    site_packages = prefix / SITE_PACKAGES
+    mtime_ns = site_packages.stat().st_mtime_ns
+    make_dist_info(prefix, "anaconda_anon_usage", "[conda]\nx = y\n")
+    os.utime(site_packages, ns=(mtime_ns, mtime_ns + 1_000_000))
+    assert site_packages_plugins(prefix) == {
+        "conda_libmamba_solver": {"solver": "cls.p"},
+        "anaconda_anon_usage": {"x": "y"},
+    }
+    assert parsed == ["anaconda_anon_usage-1.0.dist-info"]
+
+
+def test_site_packages_plugins_reinstalled(prefix: Path, parsed: list[str]):
+    dist_info = make_dist_info(prefix, "conda_libmamba_solver", "[conda]\nx = y\n")
+    make_dist_info(prefix, "requests")
+    site_packages_plugins(prefix)
+    parsed.clear()
+
+    # same version reinstalled (e.g. --force-reinstall) with other entry points
+    site_packages = prefix / SITE_PACKAGES
+    mtime_ns = site_packages.stat().st_mtime_ns
+    shutil.rmtree(dist_info)
+    make_dist_info(prefix, "conda_libmamba_solver", "[conda]\nsolver = cls.p\n")
+    os.utime(site_packages, ns=(mtime_ns, mtime_ns + 1_000_000))
+    assert site_packages_plugins(prefix) == {
+        "conda_libmamba_solver": {"solver": "cls.p"}
+    }
+    assert parsed == ["conda_libmamba_solver-1.0.dist-info"]
+
+
+def test_site_packages_plugins_egg_info(prefix: Path):
+    egg_info = prefix / SITE_PACKAGES / "conda_legacy-1.0-py3.12.egg-info"
+    egg_info.mkdir(parents=True)
+    (egg_info / "entry_points.txt").write_text("[conda]\nx = y\n")
+    (prefix / SITE_PACKAGES / "single_file-1.0-py3.12.egg-info").write_text("")
+
+    assert site_packages_plugins(prefix) == {"conda_legacy": {"x": "y"}}
+
+
+def test_site_packages_plugins_drops_removed(prefix: Path):
+    dist_info = make_dist_info(prefix, "anaconda_anon_usage", "[conda]\nx = y\n")
+    assert site_packages_plugins(prefix) == {"anaconda_anon_usage": {"x": "y"}}
+
+    site_packages = prefix / SITE_PACKAGES
+    mtime_ns = site_packages.stat().st_mtime_ns
+    shutil.rmtree(dist_info)
+    os.utime(site_packages, ns=(mtime_ns, mtime_ns + 1_000_000))
+    assert site_packages_plugins(prefix) == {}
+
+
+def test_site_packages_plugins_no_python(prefix: Path):
+    assert site_packages_plugins(prefix) == {}
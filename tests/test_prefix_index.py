@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.base.constants import PREFIX_FROZEN_FILE
+from conda.base.context import context
+from conda.core.prefix_data import PrefixData
+
+from conda_self.prefix_index import (
+    PrefixIndex,
+    invalidate_prefix_index,
+    prefix_index,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from conda.testing.fixtures import CondaCLIFixture
+    from pytest import MonkeyPatch
+
+
+def write_record(prefix: Path, name: str, *depends: str) -> None:
+    record = {
+        "name": name,
+        "version": "1.0",
+        "build": "0",
+        "build_number": 0,
+        "depends": list(depends),
+    }
+    (prefix / "conda-meta" / f"{name}-1.0-0.json").write_text(json.dumps(record))
+
+
+@pytest.fixture
+def prefix(tmp_path: Path, monkeypatch: MonkeyPatch) -> Iterator[Path]:
+    """A base prefix with a few conda-meta records."""
+    (tmp_path / "conda-meta").mkdir()
+    write_record(tmp_path, "conda", "python")
+    write_record(tmp_path, "conda-self", "conda")
+    write_record(tmp_path, "python")
+    write_record(tmp_path, "numpy", "python")
+    monkeypatch.setattr(sys, "prefix", str(tmp_path))
+    invalidate_prefix_index(tmp_path)
+    yield tmp_path
+    invalidate_prefix_index(tmp_path)
+
+
+@pytest.fixture
+def conda_meta_reads(monkeypatch: MonkeyPatch) -> list[Path]:
+    """Prefixes whose conda-meta directory gets read."""
+    reads = []
+    load = PrefixData.load
+
+    def counting_load(self):
+        reads.append(self.prefix_path)
+        return load(self)
+
+    monkeypatch.setattr(PrefixData, "load", counting_load)
+    return reads
+
+
+@pytest.fixture
+def stub_transaction(monkeypatch: MonkeyPatch) -> list:
+    """Replace the transaction of ``reset`` and collect the records it removes."""
+    unlinked = []
+
+    class StubTxn:
+        def __init__(self, stp):
+            unlinked.extend(stp.unlink_precs)
+
+        def print_transaction_summary(self):
+            pass
+
+        def execute(self):
+            pass
+
+    monkeypatch.setattr("conda_self.reset.UnlinkLinkTransaction", StubTxn)
+    return unlinked
+
+
+def test_prefix_index_is_shared(prefix: Path):
+    assert prefix_index() is prefix_index(prefix)
+    assert prefix_index(str(prefix)) is prefix_index(prefix)
+    assert isinstance(prefix_index(), PrefixIndex)
+
+
+def test_records_read_conda_meta_once(prefix: Path, conda_meta_reads: list):
+    index = prefix_index()
+    assert sorted(record.name for record in index.records()) == [
+        "conda",
+        "conda-self",
+        "numpy",
+        "python",
+    ]
+    assert {r.name for r in index.records(interoperability=True)} >= {"conda"}
+    assert index.get("numpy") is not None
+    assert index.get("missing") is None
+    # conda shares the same PrefixData
+    assert PrefixData(prefix, interoperability=False).get("numpy") is not None
+    assert conda_meta_reads == [prefix]
+
+
+def test_invalidate(prefix: Path, conda_meta_reads: list):
+    assert prefix_index().get("scipy") is None
+    write_record(prefix, "scipy", "numpy")
+    assert prefix_index().get("scipy") is None
+
+    invalidate_prefix_index()
+    assert prefix_index().get("scipy") is not None
+    assert len(conda_meta_reads) == 2
+
+
+def test_is_frozen(prefix: Path):
+    assert not prefix_index().is_frozen
+    (prefix / PREFIX_FROZEN_FILE).touch()
+    assert prefix_index().is_frozen
+
+
+def test_reset_reads_conda_meta_once(
+    prefix: Path,
+    conda_meta_reads: list,
+    stub_transaction: list,
+    self_plugin_manager,
+):
+    from conda_self.query import permanent_dependencies
+    from conda_self.reset import reset
+
+    keep = permanent_dependencies(add_plugins=True)
+    reset(uninstallable_packages=keep)
+
+    assert [record.name for record in stub_transaction] == ["numpy"]
+    assert conda_meta_reads == [prefix]
+
+    # the transaction invalidates the index
+    prefix_index().records()
+    assert conda_meta_reads == [prefix, prefix]
+
+
+def test_update_reads_conda_meta_once(
+    prefix: Path,
+    conda_meta_reads: list,
+    conda_cli: CondaCLIFixture,
+    monkeypatch: MonkeyPatch,
+):
+    monkeypatch.setattr(type(context), "root_prefix", str(prefix))
+    monkeypatch.setattr(
+        "conda_self.install.install_specs_in_protected_env", lambda **kwargs: 0
+    )
+    conda_cli("self", "update", "--yes")
+
+    assert conda_meta_reads == [prefix]
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.exceptions import CondaValueError
+
+from conda_self import install
+from conda_self.constants import PROGRESS_ENV_VAR
+from conda_self.progress import (
+    MARKER_KEY,
+    EventStream,
+    iter_records,
+    progress_writer,
+    report,
+    run_with_progress,
+)
+
+if TYPE_CHECKING:
+    from pytest import CaptureFixture, MonkeyPatch
+
+
+class ChunkedReader(io.BytesIO):
+    """A stream returning at most ``size`` bytes per read."""
+
+    def __init__(self, data: bytes, size: int):
+        super().__init__(data)
+        self.size = size
+
+    def read1(self, n: int | None = -1) -> bytes:
+        return super().read1(self.size)
+
+
+def marker(name: str, **fields) -> bytes:
+    return json.dumps({MARKER_KEY: name, **fields}).encode() + b"\n\0"
+
+
+FETCH = (
+    b'{"fetch":"numpy-2.0.0         | 7.0 MB    | ",'
+    b'"finished":false,"maxval":1,"progress":0.5}\n\0'
+)
+FINAL = json.dumps(
+    {
+        "actions": {
+            "FETCH": [
+                {
+                    "name": "numpy",
+                    "version": "2.0.0",
+                    "build": "py312_0",
+                    "channel": "conda-forge",
+                    "size": 7000000,
+                }
+            ],
+            "LINK": [],
+        },
+        "success": True,
+    }
+).encode()
+OUTPUT = (
+    marker("solve_started")
+    + marker("solve_started")
+    + marker("solve_finished", link=1, unlink=0)
+    + FETCH
+    + marker("link_started")
+    + marker("link_finished")
+    + FINAL
+    + b"\n"
+)
+
+
+@pytest.mark.parametrize("size", [1, 7, 1 << 16])
+def test_iter_records(size: int):
+    records = list(iter_records(ChunkedReader(b"not json\n\0" + OUTPUT, size)))
+    assert records[0] == "not json"
+    assert records[1] == {MARKER_KEY: "solve_started"}
+    assert isinstance(records[-1], dict)
+    assert records[-1]["success"] is True
+    assert len(records) == 8
+
+
+def events_of(output: bytes, returncode: int = 0, dry_run: bool = False) -> list:
+    events: list = []
+    stream = EventStream(events.append, dry_run=dry_run)
+    for record in iter_records(ChunkedReader(output, 1 << 16)):
+        assert isinstance(record, dict)
+        stream.feed(record)
+    stream.close(returncode)
+    assert all(isinstance(event.pop("time"), float) for event in events)
+    return events
+
+
+def test_event_stream():
+    assert events_of(OUTPUT) == [
+        {"event": "phase_started", "phase": "solve"},
+        {"event": "phase_finished", "phase": "solve", "link": 1, "unlink": 0},
+        {"event": "phase_started", "phase": "fetch"},
+        {"event": "fetch_progress", "package": "numpy-2.0.0", "progress": 0.5},
+        {"event": "phase_finished", "phase": "fetch"},
+        {"event": "phase_started", "phase": "link"},
+        {"event": "phase_finished", "phase": "link"},
+        {
+            "event": "fetched",
+            "package": "numpy-2.0.0-py312_0",
+            "channel": "conda-forge",
+            "bytes": 7000000,
+        },
+        {"event": "finished", "returncode": 0, "success": True, "bytes": 7000000},
+    ]
+
+
+def test_event_stream_dry_run():
+    output = marker("solve_started") + marker("solve_finished", link=1) + FINAL
+    assert [event["event"] for event in events_of(output, dry_run=True)] == [
+        "phase_started",
+        "phase_finished",
+        "finished",
+    ]
+
+
+def test_event_stream_error():
+    output = (
+        marker("solve_started")
+        + json.dumps(
+            {"exception_name": "PackagesNotFoundError", "message": "not found"}
+        ).encode()
+    )
+    events = events_of(output, returncode=1)
+    assert events[-2] == {"event": "phase_finished", "phase": "solve"}
+    assert events[-1] == {
+        "event": "finished",
+        "returncode": 1,
+        "success": False,
+        "bytes": 0,
+        "error": "PackagesNotFoundError",
+    }
+
+
+def test_report(monkeypatch: MonkeyPatch, capsys: CaptureFixture):
+    monkeypatch.delenv(PROGRESS_ENV_VAR, raising=False)
+    report("link_started")
+    assert capsys.readouterr().out == ""
+
+    monkeypatch.setenv(PROGRESS_ENV_VAR, "1")
+    report("link_started")
+    assert capsys.readouterr().out == marker("link_started").decode()
+
+
+CHILD = f"""
+import json, os, sys
+assert os.environ[{PROGRESS_ENV_VAR!r}]
+sys.stdout.buffer.write({OUTPUT!r})
+"""
+
+
+@pytest.mark.parametrize("use_json", [True, False], ids=["json", "no-json"])
+def test_run_with_progress(capfd: CaptureFixture, use_json: bool):
+    events: list = []
+    cmd = [sys.executable, "-c", CHILD, "install"]
+
+    assert run_with_progress(cmd, events.append, json=use_json) == 0
+    assert events[0]["event"] == "started"
+    assert events[0]["args"] == ["install"]
+    assert events[-1]["event"] == "finished"
+    out = capfd.readouterr().out
+    # conda's own records, passed through as written; never the markers
+    assert out == ((FETCH + FINAL + b"\n").decode() if use_json else "")
+
+
+def test_progress_writer():
+    read_fd, write_fd = os.pipe()
+    try:
+        write = progress_writer(write_fd)
+        write({"event": "started"})
+        write({"event": "finished"})
+        os.close(write_fd)
+        with os.fdopen(read_fd) as fh:
+            lines = fh.read().splitlines()
+    finally:
+        for fd in (read_fd, write_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+    assert [json.loads(line) for line in lines] == [
+        {"event": "started"},
+        {"event": "finished"},
+    ]
+
+
+def test_progress_writer_invalid_fd():
+    read_fd, write_fd = os.pipe()
+    os.close(read_fd)
+    os.close(write_fd)
+    with pytest.raises(CondaValueError):
+        progress_writer(write_fd)
+
+
+def test_run_json_without_progress(monkeypatch: MonkeyPatch):
+    calls = []
+
+    def fake_run_with_progress(*args, **kwargs):
+        calls.append(args)
+        return 0
+
+    monkeypatch.setattr("conda_self.progress.run_with_progress", fake_run_with_progress)
+    cmd = [sys.executable, "-c", "print('{}')", "install", "--json"]
+    assert install._run(cmd, json=True) == 0
+    assert calls == []
+
+
+def test_install_with_progress_runs_conda_json(monkeypatch: MonkeyPatch):
+    calls = []
+
+    def fake_run_with_progress(cmd, callback, json=False, **kwargs):
+        calls.append((cmd, json))
+        return 0
+
+    monkeypatch.setattr("conda_self.progress.run_with_progress", fake_run_with_progress)
+    monkeypatch.setattr(install, "in_process_enabled", lambda specs, json: not json)
+    monkeypatch.setattr(install, "invalidate_prefix_index", lambda prefix: None)
+
+    def events(event):
+        pass
+
+    assert install.install_specs_in_protected_env(["conda"], progress=events) == 0
+    assert install.uninstall_specs_in_protected_env(["numpy"], progress=events) == 0
+    assert [(cmd[3], cmd[-1], json) for cmd, json in calls] == [
+        ("install", "--json", False),
+        ("remove", "--json", False),
+    ]
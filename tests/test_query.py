@@ -1,12 +1,22 @@
+import json
+import random
+import sys
+
 import pytest
 from conda.base.context import context, reset_context
 from conda.common.configuration import YamlRawParameter
 from conda.common.serialize import yaml
-from conda.plugins.manager import CondaPluginManager
+from conda.models.match_spec import MatchSpec
+from conda.models.prefix_graph import PrefixGraph
+from conda.models.records import PrefixRecord
 
-from conda_self import plugin as conda_self_plugin
 from conda_self.constants import PERMANENT_PACKAGES, SELF_PERMANENT_PACKAGES_SETTING
-from conda_self.query import permanent_dependencies
+from conda_self.prefix_index import invalidate_prefix_index
+from conda_self.query import (
+    DependencyGraph,
+    depends_name,
+    permanent_dependencies,
+)
 
 CONDARC_PERMANENT_PACKAGES = f"""\
 plugins:
@@ -20,23 +30,6 @@ def test_permanent_dependencies():
     assert set(PERMANENT_PACKAGES).issubset(must_keep)
 
 
-@pytest.fixture()
-def clear_plugins_context_cache():
-    try:
-        del context.plugins
-    except AttributeError:
-        pass
-
-
-@pytest.fixture()
-def self_plugin_manager(
-    plugin_manager: CondaPluginManager, clear_plugins_context_cache
-):
-    """Load the conda-self plugin module (including conda_settings)."""
-    plugin_manager.load_plugins(conda_self_plugin)
-    yield plugin_manager
-
-
 @pytest.fixture()
 def permanent_packages_condarc(self_plugin_manager):
     """Load a .condarc that sets self_permanent_packages to ['python']."""
@@ -70,3 +63,208 @@ def test_permanent_dependencies_without_setting():
     must_keep = permanent_dependencies()
 
     assert set(PERMANENT_PACKAGES).issubset(must_keep)
+
+
+def _record(name: str, *depends: str) -> PrefixRecord:
+    return PrefixRecord(
+        name=name,
+        version="1.0",
+        build="0",
+        build_number=0,
+        depends=list(depends),
+    )
+
+
+@pytest.fixture
+def prefix_records() -> list[PrefixRecord]:
+    return [
+        _record("conda", "python >=3.10", "requests", "ruamel.yaml"),
+        _record("conda-self", "conda >=1", "python"),
+        _record("conda-libmamba-solver", "conda", "libmambapy"),
+        _record("libmambapy", "python", "openssl"),
+        _record("requests", "python", "urllib3"),
+        _record("ruamel.yaml", "python"),
+        _record("urllib3", "python"),
+        _record("python", "openssl", "libzlib"),
+        _record("openssl"),
+        _record("libzlib"),
+        _record("numpy", "python"),
+    ]
+
+
+def test_dependency_graph_closure_matches_prefix_graph(prefix_records):
+    prefix_graph = PrefixGraph(prefix_records)
+    graph = DependencyGraph.from_prefix_graph(prefix_graph)
+
+    roots = ["conda", "conda-self", "conda-libmamba-solver"]
+    expected = set(roots)
+    for record in prefix_graph.records:
+        if record.name in roots:
+            expected.update(rec.name for rec in prefix_graph.all_ancestors(record))
+
+    assert graph.closure(roots) == expected
+    assert "numpy" not in graph.closure(roots)
+
+
+def test_dependency_graph_closure_ignores_missing_roots(prefix_records):
+    graph = DependencyGraph.from_prefix_graph(PrefixGraph(prefix_records))
+
+    assert graph.closure(["not-installed"]) == set()
+    assert graph.closure(["openssl", "not-installed"]) == {"openssl"}
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    (
+        ("openssl", {"conda", "conda-self", "conda-libmamba-solver"}),
+        ("libmambapy", {"conda-libmamba-solver"}),
+        ("conda", {"conda", "conda-self", "conda-libmamba-solver"}),
+        ("numpy", set()),
+        ("not-installed", set()),
+    ),
+)
+def test_dependency_graph_required_by(prefix_records, name, expected):
+    graph = DependencyGraph.from_prefix_graph(PrefixGraph(prefix_records))
+    roots = ["conda", "conda-self", "conda-libmamba-solver"]
+
+    assert graph.required_by(name, roots) == expected
+
+
+@pytest.mark.parametrize("size", (1_000, 10_000))
+def test_dependency_graph_large(size: int):
+    """A chain with a shared tail: every root reaches the whole tail once."""
+    names = [f"pkg-{i}" for i in range(size)]
+    parents = [[i + 1] if i + 1 < size else [] for i in range(size)]
+    graph = DependencyGraph(names, parents)
+
+    roots = names[: size // 2]
+    assert graph.closure(roots) == set(names)
+    assert graph.required_by(names[-1], roots) == set(roots)
+
+
+@pytest.mark.parametrize(
+    "spec,expected",
+    (
+        ("python", "python"),
+        ("python >=3.10,<3.11.0a0", "python"),
+        ("python_abi 3.10.* *_cp310", "python_abi"),
+        ("ruamel.yaml >=0.11.14,<0.19", "ruamel.yaml"),
+        ("numpy>=1.21", "numpy"),
+        ("numpy=1.21", "numpy"),
+        ("conda-forge::numpy", "numpy"),
+        ("numpy[version='>=1.21']", "numpy"),
+        ("__glibc >=2.17", "__glibc"),
+        ("", None),
+    ),
+)
+def test_depends_name(spec: str, expected: str | None):
+    assert depends_name(spec) == expected
+    if expected:
+        assert MatchSpec(spec).name == expected
+
+
+def _ancestor_sets(graph: DependencyGraph) -> dict[str, set[str]]:
+    return {name: graph.closure([name]) for name in graph.names}
+
+
+def test_from_records_parity_with_prefix_graph(prefix_records):
+    expected = DependencyGraph.from_prefix_graph(PrefixGraph(prefix_records))
+    graph = DependencyGraph.from_records(prefix_records)
+
+    assert set(graph.names) == set(expected.names)
+    assert _ancestor_sets(graph) == _ancestor_sets(expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_from_records_parity_random(seed: int):
+    rng = random.Random(seed)
+    names = [f"pkg-{i}" for i in range(150)]
+    records = [
+        _record(
+            name,
+            *(
+                f"{dep} >=1.0" if rng.random() < 0.5 else dep
+                for dep in rng.sample(names[:i], min(i, rng.randint(0, 5)))
+            ),
+            # dependencies on packages that are not installed are dropped
+            *(("__glibc >=2.17",) if rng.random() < 0.1 else ()),
+        )
+        for i, name in enumerate(names)
+    ]
+    rng.shuffle(records)
+
+    expected = DependencyGraph.from_prefix_graph(PrefixGraph(records))
+    graph = DependencyGraph.from_records(records)
+
+    assert _ancestor_sets(graph) == _ancestor_sets(expected)
+    for name in rng.sample(names, 10):
+        assert graph.required_by(name, names) == expected.required_by(name, names)
+
+
+def test_from_records_merges_duplicate_names():
+    graph = DependencyGraph.from_records(
+        [
+            _record("conda-self", "conda"),
+            _record("conda-self", "python"),
+            _record("conda"),
+            _record("python"),
+        ]
+    )
+
+    assert graph.names == ("conda-self", "conda", "python")
+    assert graph.closure(["conda-self"]) == {"conda-self", "conda", "python"}
+
+
+@pytest.fixture
+def fake_prefix(tmp_path, monkeypatch, self_plugin_manager):
+    """A base prefix made of conda-meta records only."""
+    conda_meta = tmp_path / "conda-meta"
+    conda_meta.mkdir()
+    monkeypatch.setattr(sys, "prefix", str(tmp_path))
+
+    def add(name: str, *depends: str) -> None:
+        record = {
+            "name": name,
+            "version": "1.0",
+            "build": "0",
+            "build_number": 0,
+            "depends": list(depends),
+        }
+        (conda_meta / f"{name}-1.0-0.json").write_text(json.dumps(record))
+        invalidate_prefix_index()
+
+    add("conda", "python")
+    add("conda-self", "conda")
+    add("python")
+    add("numpy", "python")
+    yield add
+    invalidate_prefix_index()
+
+
+def test_permanent_dependencies_cached(fake_prefix, monkeypatch):
+    assert permanent_dependencies() == {"conda", "conda-self", "python"}
+
+    def fail(*args, **kwargs):
+        raise AssertionError("prefix should not be scanned on a warm cache")
+
+    with monkeypatch.context() as m:
+        m.setattr("conda_self.prefix_index.PrefixData", fail)
+        assert permanent_dependencies() == {"conda", "conda-self", "python"}
+
+
+def test_permanent_dependencies_cache_invalidated(fake_prefix):
+    assert permanent_dependencies() == {"conda", "conda-self", "python"}
+
+    fake_prefix("conda-self", "conda", "numpy")
+
+    assert permanent_dependencies() == {"conda", "conda-self", "python", "numpy"}
+
+
+def test_permanent_dependencies_cache_per_setting(fake_prefix, monkeypatch):
+    assert permanent_dependencies() == {"conda", "conda-self", "python"}
+
+    monkeypatch.setattr(
+        context.plugins, SELF_PERMANENT_PACKAGES_SETTING, ("numpy",), raising=False
+    )
+
+    assert permanent_dependencies() == {"conda", "conda-self", "python", "numpy"}
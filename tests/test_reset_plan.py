@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from conda_self.package_cache import PackageCacheIndex
+from conda_self.prefix_index import invalidate_prefix_index
+from conda_self.reset_plan import plan_reset
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+CHANNEL = "https://conda.example.com/channel/noarch"
+
+
+def paths(name: str, count: int) -> list[dict]:
+    return [
+        {"_path": f"lib/{name}/{i}.py", "path_type": "hardlink", "size_in_bytes": 100}
+        for i in range(count)
+    ]
+
+
+def install(prefix: Path, name: str, version: str, count: int) -> None:
+    filename = f"{name}-{version}-0.tar.bz2"
+    record = {
+        "name": name,
+        "version": version,
+        "build": "0",
+        "build_number": 0,
+        "channel": "https://conda.example.com/channel",
+        "subdir": "noarch",
+        "fn": filename,
+        "url": f"{CHANNEL}/{filename}",
+        "depends": [],
+        "files": [path["_path"] for path in paths(name, count)],
+        "paths_data": {"paths_version": 1, "paths": paths(name, count)},
+    }
+    (prefix / "conda-meta" / f"{name}-{version}-0.json").write_text(json.dumps(record))
+
+
+def cache(pkgs_dir: Path, name: str, version: str, count: int) -> None:
+    filename = f"{name}-{version}-0.tar.bz2"
+    record = {
+        "name": name,
+        "version": version,
+        "build": "0",
+        "build_number": 0,
+        "subdir": "noarch",
+        "depends": [],
+        "fn": filename,
+        "url": f"{CHANNEL}/{filename}",
+        "channel": "https://conda.example.com/channel",
+    }
+    info = pkgs_dir / f"{name}-{version}-0" / "info"
+    info.mkdir(parents=True)
+    (info / "index.json").write_text(json.dumps(record))
+    (info / "repodata_record.json").write_text(json.dumps(record))
+    (info / "paths.json").write_text(
+        json.dumps({"paths_version": 1, "paths": paths(name, count)})
+    )
+
+
+@pytest.fixture
+def prefix(tmp_path: Path) -> Iterator[Path]:
+    prefix = tmp_path / "prefix"
+    (prefix / "conda-meta").mkdir(parents=True)
+    install(prefix, "conda", "1.0", 10)
+    install(prefix, "python", "3.12", 30)
+    install(prefix, "extra", "1.0", 5)
+    yield prefix
+    invalidate_prefix_index(prefix)
+
+
+def test_plan_reset_current(prefix: Path):
+    plan = plan_reset(prefix, {"conda", "python"})
+
+    assert [package.name for package in plan.unlink] == ["extra"]
+    assert plan.unlink[0].files == 5
+    assert plan.unlink[0].size == 500
+    assert plan.link == []
+    assert plan.to_json()["transaction_required"]
+    assert "Unlink:       1 packages,       5 files" in plan.summary()
+
+
+def test_plan_reset_fast(prefix: Path):
+    plan = plan_reset(prefix, {"conda"}, fast=True)
+
+    assert plan.fast_removals == 2
+    assert not plan.to_json()["transaction_required"]
+
+
+def test_plan_reset_snapshot(prefix: Path, tmp_path: Path):
+    pkgs_dir = tmp_path / "pkgs"
+    cache(pkgs_dir, "python", "3.13", 40)
+    snapshot = tmp_path / "snapshot.txt"
+    snapshot.write_text(
+        "@EXPLICIT\n"
+        f"{CHANNEL}/conda-1.0-0.tar.bz2\n"
+        f"{CHANNEL}/python-3.13-0.tar.bz2\n"
+        f"{CHANNEL}/new-1.0-0.tar.bz2\n"
+    )
+    index = PackageCacheIndex.from_pkgs_dirs([str(pkgs_dir)])
+
+    plan = plan_reset(prefix, snapshot=snapshot, index=index)
+
+    assert [package.name for package in plan.unlink] == ["extra", "python"]
+    assert [(p.name, p.files, p.size) for p in plan.link] == [
+        ("python", 40, 4_000),
+        ("new", None, None),
+    ]
+    assert [package.url for package in plan.downloads] == [
+        f"{CHANNEL}/new-1.0-0.tar.bz2"
+    ]
+    document = plan.to_json()
+    assert document["unlink"]["files"] == 35
+    assert document["link"]["bytes"] == 4_000
+    assert document["link"]["unknown"] == 1
+    assert document["download"]["count"] == 1
+    assert "(+1 of unknown size)" in plan.summary()
+
+
+def test_plan_reset_nothing_to_do(prefix: Path):
+    plan = plan_reset(prefix, {"conda", "python", "extra"})
+    assert plan.summary().endswith("Nothing to do.")
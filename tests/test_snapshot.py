@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from argparse import Namespace
+from typing import TYPE_CHECKING
+
+import pytest
+
+from conda_self.cli.main_reset import Snapshot
+from conda_self.cli.main_snapshot import execute_create
+from conda_self.constants import SNAPSHOT_EXPLICIT, SNAPSHOT_FILES_DIR
+from conda_self.exceptions import SnapshotError
+from conda_self.prefix_index import invalidate_prefix_index, prefix_index
+from conda_self.snapshot import (
+    create_snapshot,
+    read_snapshot,
+    restore_snapshot,
+    snapshot_path,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from pytest import MonkeyPatch
+
+CHANNEL = "https://conda.example.com/channel/noarch"
+
+
+def install(prefix: Path, name: str, *files: str, version: str = "1.0") -> None:
+    """Write the files of a package and its conda-meta record."""
+    content = f"{name} {version}"
+    for path in files:
+        (prefix / path).parent.mkdir(parents=True, exist_ok=True)
+        (prefix / path).write_text(content)
+    sha256 = hashlib.sha256(content.encode()).hexdigest()
+    fn = f"{name}-{version}-0.conda"
+    record = {
+        "name": name,
+        "version": version,
+        "build": "0",
+        "build_number": 0,
+        "channel": "https://conda.example.com/channel",
+        "subdir": "noarch",
+        "fn": fn,
+        "url": f"{CHANNEL}/{fn}",
+        "md5": "0123456789abcdef0123456789abcdef",
+        "depends": [],
+        "files": list(files),
+        "paths_data": {
+            "paths_version": 1,
+            "paths": [
+                {"_path": path, "path_type": "hardlink", "sha256": sha256}
+                for path in files
+            ],
+        },
+    }
+    (prefix / "conda-meta" / f"{name}-{version}-0.json").write_text(json.dumps(record))
+    invalidate_prefix_index(prefix)
+
+
+def uninstall(prefix: Path, name: str, version: str = "1.0") -> None:
+    record = prefix / "conda-meta" / f"{name}-{version}-0.json"
+    for path in json.loads(record.read_text())["files"]:
+        (prefix / path).unlink()
+    record.unlink()
+    invalidate_prefix_index(prefix)
+
+
+@pytest.fixture
+def prefix(tmp_path: Path) -> Iterator[Path]:
+    (tmp_path / "conda-meta").mkdir()
+    (tmp_path / "conda-meta" / "history").write_text(
+        "==> 2025-01-01 00:00:00 <==\n"
+        "+https://conda.example.com/channel/noarch::conda-1.0-0\n"
+        "+https://conda.example.com/channel/noarch::small-1.0-0\n"
+    )
+    install(tmp_path, "conda", "lib/conda/__init__.py", "lib/conda/core.py")
+    install(tmp_path, "small", "bin/small", "lib/small/data.txt")
+    os.symlink("small", tmp_path / "bin" / "small-link")
+    yield tmp_path
+    invalidate_prefix_index(tmp_path)
+
+
+def names(prefix: Path) -> list[str]:
+    return sorted(record.name for record in prefix_index(prefix).records())
+
+
+def test_create_snapshot(prefix: Path):
+    manifest = create_snapshot(prefix, method="hardlink")
+    path = snapshot_path(prefix)
+
+    assert manifest["method"] == "hardlink"
+    assert manifest["packages"] == 2
+    assert manifest["files"] == 4
+    files = path / SNAPSHOT_FILES_DIR
+    assert os.path.samefile(files / "bin" / "small", prefix / "bin" / "small")
+    assert not (files / "bin" / "small-link").exists()  # not a package file
+    _, records = read_snapshot(path)
+    assert [record.name for record in records] == ["conda", "small"]
+    explicit = (path / SNAPSHOT_EXPLICIT).read_text().splitlines()
+    assert explicit[-1] == f"{CHANNEL}/small-1.0-0.conda#{'0123456789abcdef' * 2}"
+
+
+def test_create_snapshot_auto(prefix: Path):
+    manifest = create_snapshot(prefix)
+
+    # hardlinks are never picked automatically
+    assert manifest["method"] in ("reflink", "copy")
+    files = snapshot_path(prefix) / SNAPSHOT_FILES_DIR
+    assert not os.path.samefile(files / "bin" / "small", prefix / "bin" / "small")
+
+
+def test_create_snapshot_replaces(prefix: Path):
+    create_snapshot(prefix, method="copy")
+    install(prefix, "extra", "lib/extra.py")
+    create_snapshot(prefix, method="copy")
+
+    _, records = read_snapshot(snapshot_path(prefix))
+    assert [record.name for record in records] == ["conda", "extra", "small"]
+    assert not snapshot_path(prefix).with_name("latest.old").exists()
+    assert not snapshot_path(prefix).with_name("latest.partial").exists()
+
+
+@pytest.mark.parametrize("method", ["hardlink", "copy"])
+def test_restore_snapshot(prefix: Path, method: str):
+    create_snapshot(prefix, method=method)
+    # replaced (not modified in place), removed, updated, installed
+    (prefix / "lib" / "conda" / "core.py").unlink()
+    (prefix / "lib" / "conda" / "core.py").write_text("changed")
+    (prefix / "lib" / "small" / "data.txt").unlink()
+    uninstall(prefix, "conda")
+    install(prefix, "conda", "lib/conda/__init__.py", "lib/conda/new.py", version="2.0")
+    install(prefix, "extra", "lib/extra/sub/module.py", "lib/conda/extra.py")
+
+    result = restore_snapshot(prefix)
+
+    assert result.fallback is None
+    # __init__.py of conda 2.0, core.py and data.txt; not bin/small
+    assert result.restored == 3
+    assert result.removed == 3
+    assert (prefix / "lib" / "conda" / "core.py").read_text() == "conda 1.0"
+    assert (prefix / "lib" / "conda" / "__init__.py").read_text() == "conda 1.0"
+    assert (prefix / "lib" / "small" / "data.txt").read_text() == "small 1.0"
+    assert not (prefix / "lib" / "conda" / "new.py").exists()
+    assert not (prefix / "lib" / "extra").exists()
+    assert names(prefix) == ["conda", "small"]
+    assert [r.version for r in prefix_index(prefix).records()] == ["1.0", "1.0"]
+    # the test installs bypass the history, so there is nothing to diff
+    assert (prefix / "conda-meta" / "history").read_text().count("==>") == 2
+
+
+def test_restore_snapshot_nothing_changed(prefix: Path):
+    create_snapshot(prefix, method="copy")
+    result = restore_snapshot(prefix)
+    assert (result.restored, result.removed) == (0, 0)
+
+
+def test_restore_snapshot_compares_stat(prefix: Path, monkeypatch: MonkeyPatch):
+    create_snapshot(prefix, method="copy")
+    data = prefix / "lib" / "small" / "data.txt"
+    data.write_text("small 1.0 modified")
+
+    def no_hashing(*args):
+        raise AssertionError("files are not hashed by default")
+
+    monkeypatch.setattr("conda.gateways.disk.read.compute_sum", no_hashing)
+    result = restore_snapshot(prefix)
+
+    assert (result.restored, result.removed) == (1, 0)
+    assert data.read_text() == "small 1.0"
+
+
+def test_restore_snapshot_verify(prefix: Path):
+    create_snapshot(prefix, method="copy")
+    # modified in place, keeping size and modification time
+    data = prefix / "lib" / "small" / "data.txt"
+    mtime_ns = data.stat().st_mtime_ns
+    data.write_text("small 9.9")
+    os.utime(data, ns=(mtime_ns, mtime_ns))
+
+    assert restore_snapshot(prefix).restored == 0
+    assert restore_snapshot(prefix, verify=True).restored == 1
+    assert data.read_text() == "small 1.0"
+
+
+def test_restore_snapshot_rollback(prefix: Path, monkeypatch: MonkeyPatch):
+    reset_calls = []
+    monkeypatch.setattr(
+        "conda_self.reset.reset", lambda **kwargs: reset_calls.append(kwargs)
+    )
+    create_snapshot(prefix, method="copy")
+    install(prefix, "extra", "lib/extra.py")
+
+    def failing_link_files(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr("conda_self.snapshot.link_files", failing_link_files)
+    result = restore_snapshot(prefix)
+
+    assert result.fallback == (
+        "restoring the files failed: [Errno 28] No space left on device"
+    )
+    assert reset_calls == [
+        {"prefix": str(prefix), "snapshot": snapshot_path(prefix) / SNAPSHOT_EXPLICIT}
+    ]
+    # the records were left alone for the transaction
+    assert names(prefix) == ["conda", "extra", "small"]
+
+
+def test_restore_snapshot_fallback(prefix: Path, monkeypatch: MonkeyPatch):
+    reset_calls = []
+    monkeypatch.setattr(
+        "conda_self.reset.reset", lambda **kwargs: reset_calls.append(kwargs)
+    )
+    create_snapshot(prefix, method="copy")
+    install(prefix, "scripted", "bin/.scripted-pre-unlink.sh")
+
+    result = restore_snapshot(prefix)
+
+    assert result.fallback == "packages to remove have unlink scripts or menus"
+    assert reset_calls == [
+        {"prefix": str(prefix), "snapshot": snapshot_path(prefix) / SNAPSHOT_EXPLICIT}
+    ]
+    assert (prefix / "bin" / ".scripted-pre-unlink.sh").exists()
+
+
+def test_restore_snapshot_incomplete(prefix: Path, monkeypatch: MonkeyPatch):
+    monkeypatch.setattr("conda_self.reset.reset", lambda **kwargs: None)
+    create_snapshot(prefix, method="copy")
+    shutil.rmtree(snapshot_path(prefix) / SNAPSHOT_FILES_DIR / "lib" / "small")
+
+    assert restore_snapshot(prefix).fallback == "1 files are missing from the snapshot"
+
+
+def test_restore_snapshot_missing(prefix: Path):
+    with pytest.raises(SnapshotError, match="No snapshot found"):
+        restore_snapshot(prefix)
+
+
+@pytest.mark.parametrize("name", ["", "..", "a/b"])
+def test_snapshot_path_invalid(prefix: Path, name: str):
+    with pytest.raises(SnapshotError, match="Invalid snapshot name"):
+        snapshot_path(prefix, name)
+
+
+@pytest.mark.parametrize(
+    "link, method, warned",
+    [("auto", "copy", True), ("auto", "reflink", False), ("copy", "copy", False)],
+)
+def test_create_warns_about_copies(
+    monkeypatch: MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    link: str,
+    method: str,
+    warned: bool,
+):
+    manifest = {"method": method, "packages": 1, "files": 1}
+    monkeypatch.setattr(
+        "conda_self.snapshot.create_snapshot", lambda **kwargs: manifest
+    )
+    execute_create(Namespace(name="latest", link=link))
+    assert ("Warning" in capsys.readouterr().err) == warned
+
+
+def test_saved_reset_snapshot(monkeypatch: MonkeyPatch, tmp_path: Path):
+    monkeypatch.setattr("sys.prefix", str(tmp_path))
+    assert Snapshot("saved").file_path == snapshot_path(tmp_path) / SNAPSHOT_EXPLICIT
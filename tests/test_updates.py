@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.base.context import context, reset_context
+from conda.core.subdir_data import SubdirData
+from conda.models.channel import Channel
+
+from conda_self.prefix_index import invalidate_prefix_index, prefix_index
+from conda_self.updates import (
+    UpdateCandidate,
+    check_updates,
+    extract_repodata,
+    updates_report,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from pytest import MonkeyPatch
+
+
+def package(name: str, version: str, build_number: int = 0) -> dict:
+    return {
+        "name": name,
+        "version": version,
+        "build": f"py_{build_number}",
+        "build_number": build_number,
+        "depends": [],
+        "subdir": "noarch",
+    }
+
+
+def write_repodata(channel: Path, *packages: dict) -> None:
+    for subdir in (context.subdir, "noarch"):
+        repodata = {
+            "info": {"subdir": subdir},
+            "packages": {
+                f"{p['name']}-{p['version']}-{p['build']}.tar.bz2": p
+                for p in packages
+                if p["subdir"] == subdir
+            },
+        }
+        (channel / subdir).mkdir(parents=True, exist_ok=True)
+        (channel / subdir / "repodata.json").write_text(json.dumps(repodata))
+
+
+@pytest.fixture
+def prefix(tmp_path: Path, monkeypatch: MonkeyPatch) -> Iterator[Path]:
+    """A prefix with conda 25.1.0 and conda-index 0.5.0, and a local channel."""
+    prefix = tmp_path / "prefix"
+    (prefix / "conda-meta").mkdir(parents=True)
+    for record in (package("conda", "25.1.0"), package("conda-index", "0.5.0")):
+        record["channel"] = "conda-forge"
+        fn = f"{record['name']}-{record['version']}-{record['build']}.json"
+        path = prefix / "conda-meta" / fn
+        path.write_text(json.dumps(record))
+
+    channel = tmp_path / "channel"
+    write_repodata(
+        channel,
+        package("conda", "25.1.0"),
+        package("conda", "25.1.0", 1),
+        package("conda", "25.9.0"),
+        package("conda", "24.11.0"),
+        package("conda-index", "0.5.0"),
+    )
+    monkeypatch.setenv("CONDA_PKGS_DIRS", str(tmp_path / "pkgs"))
+    reset_context()
+    SubdirData.clear_cached_local_channel_data(exclude_file=False)
+    yield prefix
+    invalidate_prefix_index(prefix)
+    monkeypatch.undo()
+    reset_context()
+    SubdirData.clear_cached_local_channel_data(exclude_file=False)
+
+
+@pytest.fixture
+def channels(tmp_path: Path) -> list[str]:
+    return [(tmp_path / "channel").as_uri()]
+
+
+def warm_index_cache(channels: list[str]) -> None:
+    SubdirData.clear_cached_local_channel_data(exclude_file=False)
+    list(SubdirData.query_all("conda", channels, context.subdirs))
+    SubdirData.clear_cached_local_channel_data(exclude_file=False)
+
+
+def test_check_updates(prefix: Path, channels: list[str]):
+    warm_index_cache(channels)
+
+    updates = check_updates(["conda", "conda-index", "conda-foo"], prefix, channels)
+    assert list(updates) == ["conda"]
+    assert [(c.version, c.build_number) for c in updates["conda"]] == [
+        ("25.9.0", 0),
+        ("25.1.0", 1),
+    ]
+
+    installed = prefix_index(prefix).get("conda")
+    assert installed is not None
+    report = updates_report(updates, {"conda": installed})
+    assert report["updates_available"]
+    assert report["packages"]["conda"]["installed"]["version"] == "25.1.0"
+    assert report["packages"]["conda"]["candidates"][0]["version"] == "25.9.0"
+
+
+def test_check_updates_reads_index_cache_only(
+    prefix: Path, channels: list[str], tmp_path: Path
+):
+    # nothing cached: the channel is not read
+    assert check_updates(["conda"], prefix, channels) == {}
+    assert not context.use_index_cache
+
+    warm_index_cache(channels)
+    write_repodata(tmp_path / "channel", package("conda-index", "0.6.0"))
+    updates = check_updates(["conda", "conda-index"], prefix, channels)
+    assert list(updates) == ["conda"]
+    assert isinstance(updates["conda"][0], UpdateCandidate)
+
+
+def test_check_updates_reuses_extracts(
+    prefix: Path, channels: list[str], monkeypatch: MonkeyPatch
+):
+    warm_index_cache(channels)
+    extracted = []
+
+    def counting_extract_repodata(path, names):
+        extracted.append(path)
+        return extract_repodata(path, names)
+
+    monkeypatch.setattr(
+        "conda_self.updates.extract_repodata", counting_extract_repodata
+    )
+    first = check_updates(["conda"], prefix, channels)
+    assert len(extracted) == 2  # the platform subdir and noarch
+    extracted.clear()
+
+    # unchanged repodata: the entries are read from the cache
+    assert check_updates(["conda"], prefix, channels) == first
+    assert extracted == []
+
+    # a refreshed index cache is extracted again
+    noarch = SubdirData(Channel(f"{channels[0]}/noarch")).cache_path_json
+    mtime_ns = noarch.stat().st_mtime_ns
+    os.utime(noarch, ns=(mtime_ns, mtime_ns + 1_000_000))
+    assert check_updates(["conda"], prefix, channels) == first
+    assert extracted == [str(noarch)]
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+import sys
+from subprocess import PIPE, Popen
+from typing import TYPE_CHECKING
+
+import pytest
+from conda.base.context import context
+
+from conda_self.constants import LOW_PRIORITY_NICENESS, SELF_METRICS_LOG_SETTING
+from conda_self.progress import run_with_progress
+from conda_self.usage import ResourceUsage, UsageMeter, log_usage, lower_priority
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest import CaptureFixture, MonkeyPatch
+
+CHILD = """
+import sys
+data = bytearray(32 * 1024 * 1024)  # some RSS
+total = sum(range(2_000_000))  # some CPU
+with open(sys.argv[1], "wb") as fh:
+    fh.write(bytes(data))
+print('{"success": true}')
+"""
+
+
+def test_usage_meter(tmp_path: Path):
+    meter = UsageMeter()
+    process = Popen([sys.executable, "-c", CHILD, str(tmp_path / "out")])
+    assert meter.wait(process) == 0
+
+    usage = meter.usage
+    assert usage is not None
+    assert usage.wall_time > 0
+    if sys.platform != "win32":
+        assert usage.user_time is not None
+        assert usage.user_time + (usage.system_time or 0) > 0
+        assert usage.max_rss is not None
+        assert usage.max_rss > 32 * 1024 * 1024
+        assert usage.block_output is not None
+    if sys.platform == "linux" and usage.write_bytes is not None:
+        assert usage.read_bytes is not None
+
+
+def test_run_with_progress_reports_usage(tmp_path: Path, capfd: CaptureFixture):
+    events: list = []
+    meter = UsageMeter()
+    cmd = [sys.executable, "-c", CHILD, str(tmp_path / "out")]
+
+    assert run_with_progress(cmd, events.append, json=True, meter=meter) == 0
+    assert meter.usage is not None
+    # the output of the child is left as it is
+    assert json.loads(capfd.readouterr().out) == {"success": True}
+    assert events[-1]["resource_usage"] == meter.usage._asdict()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="no process priorities")
+def test_lower_priority():
+    import os
+
+    process = Popen([sys.executable, "-c", "import sys; sys.stdin.read()"], stdin=PIPE)
+    try:
+        lower_priority(process.pid)
+        niceness = os.getpriority(os.PRIO_PROCESS, process.pid)
+    finally:
+        process.communicate(b"")
+    assert niceness >= LOW_PRIORITY_NICENESS
+    lower_priority(process.pid)  # exited: does not raise
+
+
+USAGE = ResourceUsage(1.5, 1.0, 0.25, 1024, 8, 16, 4096, 8192)
+CMD = [sys.executable, "-m", "conda", "install", "--yes", "conda"]
+
+
+def test_log_usage(monkeypatch: MonkeyPatch, tmp_path: Path):
+    path = tmp_path / "logs" / "metrics.ndjson"
+    monkeypatch.setattr(
+        context.plugins, SELF_METRICS_LOG_SETTING, str(path), raising=False
+    )
+
+    log_usage(CMD, 0, USAGE)
+    log_usage(CMD, 1, USAGE._replace(wall_time=2.0))
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["wall_time"] for record in records] == [1.5, 2.0]
+    assert records[0]["command"] == "install"
+    assert records[0]["args"] == ["--yes", "conda"]
+    assert records[0]["returncode"] == 0
+    assert records[0]["write_bytes"] == 8192
+    assert "conda_version" in records[0]
+
+
+@pytest.mark.parametrize("setting", ["", None], ids=["empty", "unset"])
+def test_log_usage_disabled(monkeypatch: MonkeyPatch, tmp_path: Path, setting):
+    monkeypatch.setattr(
+        context.plugins, SELF_METRICS_LOG_SETTING, setting, raising=False
+    )
+    monkeypatch.chdir(tmp_path)
+    log_usage(CMD, 0, USAGE)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_log_usage_unwritable(monkeypatch: MonkeyPatch, tmp_path: Path):
+    (tmp_path / "file").touch()
+    monkeypatch.setattr(
+        context.plugins,
+        SELF_METRICS_LOG_SETTING,
+        str(tmp_path / "file" / "metrics.ndjson"),
+        raising=False,
+    )
+    log_usage(CMD, 0, USAGE)  # does not raise